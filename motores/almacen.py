@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén de métodos – Ojo de Zeus 2
+– sitios.json sigue siendo la foto completa (mismo formato de siempre); los cambios nuevos van a
+  un registro append-only al lado (sitios.json.log, una operación JSON por línea): add / del / upd.
+– Leer = foto + registro. Escribir = añadir UNA línea (con fsync), no reescribir cientos de KB.
+– Compactación: cada ALMACEN_COMPACTAR_OPS operaciones la foto se reescribe (tmp + os.replace, atómico)
+  y el registro queda con una sola línea "seq" que guarda el último metodo_id usado.
+– metodo_id estable y creciente: nunca se reutiliza aunque se borren métodos.
+– Candado de archivo (fcntl, sitios.json.lock): varios procesos pueden escribir sin perder cambios.
+  Sin fcntl (Windows) solo protege entre hilos del mismo proceso.
+
+Uso:
+  python3 -m motores.almacen compactar [sitios.json]
+  python3 -m motores.almacen exportar salida.json [sitios.json]
+"""
+
+import json, os, sys, threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl  # type: ignore
+    FCNTL_OK=True
+except Exception:
+    FCNTL_OK=False
+
+ALMACEN_COMPACTAR_OPS=100      # operaciones en el registro antes de reescribir la foto
+SUFIJO_LOG=".log"
+SUFIJO_LOCK=".lock"
+
+_LOCKS:Dict[str,threading.RLock]={}
+_LOCKS_LOCK=threading.Lock()
+
+def _lock_hilos(path:str)->threading.RLock:
+    with _LOCKS_LOCK:
+        lk=_LOCKS.get(path)
+        if lk is None: lk=_LOCKS[path]=threading.RLock()
+        return lk
+
+def rutas_de(path:str)->Tuple[str,str]:
+    """(foto, registro): los dos archivos cuyo contenido forma el almacén (para huellas/cachés)."""
+    return path, path+SUFIJO_LOG
+
+class Almacen:
+    def __init__(self, path:str="sitios.json"):
+        self.path=path; self.path_log=path+SUFIJO_LOG; self.path_lock=path+SUFIJO_LOCK
+
+    # ===== Candado =====
+    @contextmanager
+    def _candado(self, exclusivo:bool)->Iterator[None]:
+        with _lock_hilos(os.path.abspath(self.path)):
+            if not FCNTL_OK:
+                yield; return
+            try: f=open(self.path_lock, "a+")
+            except OSError:                   # directorio de solo lectura: solo lectura posible
+                yield; return
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusivo else fcntl.LOCK_SH)
+                yield
+            finally:
+                try: fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                finally: f.close()
+
+    # ===== Lectura =====
+    def _foto(self)->List[Dict[str,Any]]:
+        """Lanza ValueError si sitios.json existe pero no es una lista JSON válida."""
+        if not os.path.exists(self.path): return []
+        with open(self.path, "r", encoding="utf-8") as f: d=json.load(f)
+        if not isinstance(d, list): raise ValueError(f"{self.path} no es una lista de métodos")
+        return d
+
+    def _registro(self)->List[Dict[str,Any]]:
+        ops=[]
+        try:
+            with open(self.path_log, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try: op=json.loads(linea)
+                    except Exception: continue      # última línea cortada por un corte de luz
+                    if isinstance(op, dict): ops.append(op)
+        except FileNotFoundError:
+            pass
+        return ops
+
+    @staticmethod
+    def _aplicar(foto:List[Dict[str,Any]], ops:List[Dict[str,Any]])->Tuple[List[Dict[str,Any]], int]:
+        """Foto + operaciones → (métodos, último id usado). Reaplicar una operación no cambia nada."""
+        metodos:Dict[Any,Dict[str,Any]]={}
+        ultimo=0
+        for i,m in enumerate(foto):
+            if not isinstance(m, dict): continue
+            mid=m.get("metodo_id")
+            clave=mid if isinstance(mid, int) and mid not in metodos else ("sin_id", i)
+            metodos[clave]=m
+            if isinstance(mid, int): ultimo=max(ultimo, mid)
+        for op in ops:
+            tipo=op.get("op"); mid=op.get("id")
+            if tipo=="seq": ultimo=max(ultimo, int(op.get("ultimo",0)))
+            elif tipo=="add" and isinstance(op.get("metodo"), dict):
+                m=op["metodo"]; mid=m.get("metodo_id")
+                if isinstance(mid, int): metodos[mid]=m; ultimo=max(ultimo, mid)
+            elif tipo=="del": metodos.pop(mid, None)
+            elif tipo=="upd" and mid in metodos and isinstance(op.get("campos"), dict):
+                metodos[mid]={**metodos[mid], **op["campos"], "metodo_id":mid}
+        return list(metodos.values()), ultimo
+
+    def leer(self)->List[Dict[str,Any]]:
+        """Métodos actuales (foto + registro) en el formato de sitios.json. ValueError si la foto está rota."""
+        with self._candado(False):
+            return self._aplicar(self._foto(), self._registro())[0]
+
+    # ===== Escritura =====
+    def _anotar(self, ops:List[Dict[str,Any]])->None:
+        with open(self.path_log, "a", encoding="utf-8") as f:
+            for op in ops: f.write(json.dumps(op, ensure_ascii=False)+"\n")
+            f.flush(); os.fsync(f.fileno())
+
+    @staticmethod
+    def _escribir_atomico(path:str, contenido:str)->None:
+        tmp=f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(contenido); f.flush(); os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _compactar(self, metodos:List[Dict[str,Any]], ultimo:int)->None:
+        # primero la foto y luego el registro: si se corta en medio, reaplicar el registro viejo es inocuo
+        self._escribir_atomico(self.path, json.dumps(metodos, indent=4, ensure_ascii=False))
+        self._escribir_atomico(self.path_log, json.dumps({"op":"seq","ultimo":ultimo})+"\n")
+
+    def _cambiar(self, construir)->Any:
+        """Bajo candado exclusivo: estado actual → construir(metodos, ultimo) → (ops, resultado)."""
+        with self._candado(True):
+            registro=self._registro()
+            metodos, ultimo=self._aplicar(self._foto(), registro)
+            ops, resultado=construir(metodos, ultimo)
+            if ops:
+                self._anotar(ops)
+                if len(registro)+len(ops)>ALMACEN_COMPACTAR_OPS:
+                    final, ultimo_final=self._aplicar(metodos, ops)
+                    self._compactar(final, max(ultimo, ultimo_final))
+            return resultado
+
+    def agregar(self, nuevos:Iterable[Dict[str,Any]])->List[int]:
+        """Asigna metodo_id (último+1, +2…) a cada método nuevo, lo guarda y devuelve los ids."""
+        nuevos=list(nuevos)
+        def _c(_, ultimo:int):
+            ids=[]
+            for i,m in enumerate(nuevos, start=1):
+                m["metodo_id"]=ultimo+i; ids.append(ultimo+i)
+            return [{"op":"add","metodo":m} for m in nuevos], ids
+        return self._cambiar(_c)
+
+    def borrar(self, ids:Iterable[int])->int:
+        """Borra por metodo_id; devuelve cuántos existían."""
+        ids=list(ids)
+        def _c(metodos:List[Dict[str,Any]], _):
+            vivos={m.get("metodo_id") for m in metodos}
+            ops=[{"op":"del","id":i} for i in ids if i in vivos]
+            return ops, len(ops)
+        return self._cambiar(_c)
+
+    def actualizar(self, metodo_id:int, campos:Dict[str,Any])->bool:
+        """Cambia solo `campos` de un método (metodo_id no se puede cambiar)."""
+        campos={k:v for k,v in campos.items() if k!="metodo_id"}
+        def _c(metodos:List[Dict[str,Any]], _):
+            if not campos or not any(m.get("metodo_id")==metodo_id for m in metodos): return [], False
+            return [{"op":"upd","id":metodo_id,"campos":campos}], True
+        return self._cambiar(_c)
+
+    def asegurar_ids(self)->int:
+        """Da metodo_id a los métodos que no tienen (o lo tienen repetido: antes era len(data)+i). Devuelve cuántos."""
+        with self._candado(True):
+            metodos, ultimo=self._aplicar(self._foto(), self._registro())
+            vistos=set(); arreglados=0
+            for m in metodos:
+                mid=m.get("metodo_id")
+                if not isinstance(mid, int) or mid in vistos:
+                    ultimo+=1; m["metodo_id"]=ultimo; arreglados+=1
+                vistos.add(m["metodo_id"])
+            if arreglados: self._compactar(metodos, ultimo)
+            return arreglados
+
+    def reemplazar(self, metodos:List[Dict[str,Any]])->None:
+        """Reescribe todo (equivale al antiguo save_sitios); conserva el contador de ids."""
+        with self._candado(True):
+            _, ultimo=self._aplicar(self._foto(), self._registro())
+            ids=[m.get("metodo_id") for m in metodos if isinstance(m.get("metodo_id"), int)]
+            self._compactar(metodos, max([ultimo]+ids))
+
+    def compactar(self)->int:
+        """Vuelca el registro en sitios.json. Devuelve cuántos métodos quedan."""
+        with self._candado(True):
+            metodos, ultimo=self._aplicar(self._foto(), self._registro())
+            self._compactar(metodos, ultimo)
+            return len(metodos)
+
+    def exportar(self, destino:str)->int:
+        """Escribe el estado actual en formato sitios.json en `destino` (no toca el almacén)."""
+        metodos=self.leer()
+        self._escribir_atomico(destino, json.dumps(metodos, indent=4, ensure_ascii=False))
+        return len(metodos)
+
+def main(argv:Optional[List[str]]=None)->int:
+    args=list(sys.argv[1:] if argv is None else argv)
+    if args[:1]==["compactar"] and len(args)<=2:
+        n=Almacen(*(args[1:] or ["sitios.json"])).compactar()
+        print(f"sitios.json compactado: {n} método(s)."); return 0
+    if args[:1]==["exportar"] and 2<=len(args)<=3:
+        n=Almacen(*(args[2:] or ["sitios.json"])).exportar(args[1])
+        print(f"Exportados {n} método(s) a {args[1]}."); return 0
+    print(__doc__.split("Uso:")[1].rstrip()); return 2
+
+if __name__=="__main__": sys.exit(main())
@@ -1,17 +1,14 @@
-import json
-import os
+from motores.almacen import Almacen
 
 ARCHIVO_SITIOS = "sitios.json"
 
 def cargar_sitios():
-    if not os.path.exists(ARCHIVO_SITIOS):
-        return []
-    with open(ARCHIVO_SITIOS, "r", encoding="utf-8") as f:
-        return json.load(f)
+    almacen = Almacen(ARCHIVO_SITIOS)
+    almacen.asegurar_ids()   # los métodos viejos sin metodo_id (o repetido) reciben uno propio
+    return almacen.leer()
 
 def guardar_sitios(sitios):
-    with open(ARCHIVO_SITIOS, "w", encoding="utf-8") as f:
-        json.dump(sitios, f, indent=4, ensure_ascii=False)
+    Almacen(ARCHIVO_SITIOS).reemplazar(sitios)
 
 def obtener_nombres_base(sitios):
     nombres_base = set()
@@ -66,12 +63,12 @@ def borrar_metodos():
         print("❌ No se seleccionó ningún método válido.")
         return
 
+    # solo se anotan los borrados (por metodo_id); no se reescribe sitios.json
+    Almacen(ARCHIVO_SITIOS).borrar([item["metodo_id"] for item in a_eliminar])
     for item in a_eliminar:
-        sitios.remove(item)
         print(f"✅ Eliminado: {item['nombre']}")
 
-    guardar_sitios(sitios)
-    total_despues = len(sitios)
+    total_despues = len(cargar_sitios())
     print(f"\n💾 Cambios guardados en sitios.json.")
     print(f"📊 Métodos antes: {total_antes} | después: {total_despues}")
 
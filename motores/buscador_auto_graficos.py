@@ -3,14 +3,17 @@
 Buscador automático – Ojo de Zeus 2 (DUAL DRIVER + outcomes + extracción + heurística)
 – Ejecuta TODOS los métodos guardados en sitios.json (sin preguntar).
 – Navegador real si hay GUI: Firefox → fallback Chromium; si no, HTTP.
+  Solo se abre para las URLs con algún método que lo necesite (motores/planificador.py).
+– Los métodos de cada sitio van del más decisivo por unidad de coste al menos (motores/puntuacion.py);
+  en cuanto uno dice No existe, los que faltan se omiten.
 – Si la decisión por métodos queda Indeterminado, aplica una HEURÍSTICA de existencia
   (TikTok/Pinterest + genérica) usando el HTML más completo capturado.
 – Extrae info útil (título, canonical, descripción, OG, conteos) cuando decide Existe.
 """
 
-import os, re, json, time, random, platform, shutil
-from typing import Any, Dict, List, Optional, Tuple
-from dataclasses import dataclass
+import os, re, json, time, random
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
 
 # ===== Colores =====
 try:
@@ -28,13 +31,19 @@ except Exception:
 def log(evento:str, detalle:str): print(f"{CYAN}[{evento}]{RESET} {detalle}", flush=True)
 def log_exc(prefix:str, e:Exception): print(f"{RED}[ERROR]{RESET} {prefix}: {e}", flush=True)
 
-# ===== HTTP =====
-HTTP_BACKEND="httpx"
-try:
-    import httpx
-except Exception:
-    HTTP_BACKEND="requests"
-    import requests  # type: ignore
+# ===== HTTP (cliente compartido con pool, ver motores/red.py) =====
+from motores.red import Respuesta, Seguir, cliente_compartido
+from motores import cache_disco, metricas
+from motores.navegadores import PoolNavegadores, hay_pantalla, opciones_chromium, opciones_firefox, preparar, sin_ventana
+from motores.listo import REGLA_DEFECTO, Regla, esperar_listo, instalar_sonda, regla_de
+from motores.recursos import POLITICA_DEFECTO, Politica, aplicar, politica_de, preparar_sesion
+from motores.almacen import Almacen
+from motores.indice import MetodoCompilado, SitioCompilado, compilar_metodo, cargar_indice
+from motores.planificador import MODO_NAVEGADOR, resumen
+from motores.puntuacion import OMITIDO, Historial, anotar_sitio, clave_metodo, decidido, olas, omitir, unidades
+from motores.coincidencias import BuscadorClaves
+from motores.huellas import coincide, huella_dom, outcome_url, usuario_en
+from motores.extractor import DocumentoHTML, analizar_html, perfil_json_ld
 
 def rand_ua()->str:
     return random.choice([
@@ -49,33 +58,41 @@ CAPTCHA_MARKERS=["captcha","cf-challenge","hcaptcha","g-recaptcha","cloudflare",
 @dataclass
 class Resp:
     url:str; final_url:str; status:int; headers:Dict[str,str]; text:str; is_json:bool; json_obj:Any=None; via:str="http"; took_ms:int=0
-
-def fetch_http(url:str, timeout:float=16.0, follow_redirects:bool=True)->Resp:
+    truncado:bool=False    # cuerpo leído solo en parte (modo streaming)
+
+def fetch_http(url:str, timeout:float=16.0, follow_redirects:bool=True, max_bytes:Optional[int]=None, seguir:Optional[Seguir]=None,
+               forzar:bool=False)->Resp:
+    """
+    Con `max_bytes`/`seguir` lee en streaming y puede cortar el cuerpo antes (ver PlanLectura).
+    Usa la caché en disco (motores/cache_disco.py) salvo `forzar=True`.
+    """
     t0=int(time.time()*1000)
     headers={"User-Agent":rand_ua(),"Accept":"*/*","Accept-Language":"es-MX,es;q=0.9,en;q=0.8","Cache-Control":"no-cache","Pragma":"no-cache"}
-    final_url=url; status=0; resp_headers={}; text=""; is_json=False; jobj=None
+    final_url=url; status=0; resp_headers={}; text=""; is_json=False; jobj=None; truncado=False
     try:
-        if HTTP_BACKEND=="httpx":
-            with httpx.Client(headers=headers, follow_redirects=follow_redirects, timeout=timeout, verify=True) as c:
-                r=c.get(url); final_url=str(r.url); status=r.status_code; resp_headers={k.lower():v for k,v in r.headers.items()}; text=r.text or ""
-        else:
-            r=requests.get(url, headers=headers, allow_redirects=follow_redirects, timeout=timeout)
-            final_url=r.url; status=r.status_code; resp_headers={k.lower():v for k,v in r.headers.items()}; text=r.text or ""
+        ent=cache_disco.leer(url, forzar=forzar) if follow_redirects else None
+        if ent is not None:
+            r=Respuesta(ent.final_url, ent.status, ent.headers, ent.text)
+            if seguir and seguir(r.status, None): seguir(r.status, r.text)
+        elif max_bytes or seguir: r=cliente_compartido().get_stream(url, headers, timeout, follow_redirects, max_bytes, seguir)
+        else: r=cliente_compartido().get(url, headers, timeout, follow_redirects)
+        final_url=r.final_url; status=r.status; resp_headers=r.headers; text=r.text; truncado=r.truncado
         ct=resp_headers.get("content-type","").split(";")[0].strip().lower()
-        if ct in JSON_CT:
+        if ct in JSON_CT and not truncado:
             try: jobj=json.loads(text); is_json=True
             except Exception: is_json=False
+        if ent is None and follow_redirects: cache_disco.escribir(url, "http", final_url, status, resp_headers, text, truncado)
     except Exception as e:
         text=f"[HTTP_ERROR] {e}"; status=-1
+        if metricas.es_timeout(e): metricas.anotar("timeout", time.time()-t0/1000)
     took=int(time.time()*1000)-t0
-    return Resp(url, final_url, status, resp_headers, text, is_json, jobj, "http", took)
+    metricas.anotar("http.total", took/1000)
+    return Resp(url, final_url, status, resp_headers, text, is_json, jobj, "http", took, truncado)
 
 # ===== Selenium DUAL (Firefox → Chromium) =====
 SELENIUM_OK=False
 try:
     from selenium import webdriver
-    from selenium.common.exceptions import TimeoutException
-    from selenium.webdriver.support.ui import WebDriverWait
     SELENIUM_OK=True
 except Exception:
     SELENIUM_OK=False
@@ -97,29 +114,19 @@ def which_any(paths: List[str]) -> Optional[str]:
     return None
 
 def has_display()->bool:
-    if platform.system().lower()=="linux": return bool(os.environ.get("DISPLAY"))
-    return True
+    return hay_pantalla()
 
 SELENIUM_PAGELOAD_TIMEOUT=35
-DOM_READY_MAX_WAIT=12
-URL_STABILIZE_WINDOW_MS=700
-URL_STABILIZE_MAX_MS=8000
-POST_LOAD_SETTLE_MS=450
-
-def _wait_dom_complete(driver, max_wait_s:int)->None:
-    WebDriverWait(driver, max_wait_s).until(lambda d: d.execute_script("return document.readyState")=="complete")
-
-def _stabilize_url(driver, window_ms:int, max_ms:int)->str:
-    start=time.time()*1000; last=driver.current_url; stable_since=start
-    while True:
-        time.sleep(0.12); cur=driver.current_url; now=time.time()*1000
-        if cur!=last: last=cur; stable_since=now
-        if (now-stable_since)>=window_ms: return cur
-        if (now-start)>=max_ms: return cur
+# Cuándo está lista la página (red, DOM y URL quietos): ver motores/listo.py
 
 def get_webdriver()->Tuple[Optional[str], Optional["webdriver.Remote"]]:
-    if not (SELENIUM_OK and has_display()):
+    """Sin pantalla arranca sin ventana (headless); opciones comunes en motores/navegadores.py."""
+    if not SELENIUM_OK:
         return (None, None)
+    with metricas.etapa("selenium.arranque"):
+        return _arrancar_webdriver()
+
+def _arrancar_webdriver()->Tuple[Optional[str], Optional["webdriver.Remote"]]:
     # Firefox
     try:
         from selenium.webdriver.firefox.service import Service as FxService
@@ -127,10 +134,10 @@ def get_webdriver()->Tuple[Optional[str], Optional["webdriver.Remote"]]:
         gecko=which_any(DEFAULT_PATHS["geckodriver"])
         fxbin=which_any(DEFAULT_PATHS["firefox"])
         if gecko and fxbin:
-            opts=FxOptions(); opts.binary_location=fxbin
+            opts=opciones_firefox(FxOptions()); opts.binary_location=fxbin
             svc=FxService(executable_path=gecko)
-            drv=webdriver.Firefox(service=svc, options=opts)
-            log("NAVEGADOR", f"Firefox → {fxbin} + {gecko}")
+            drv=webdriver.Firefox(service=svc, options=opts); preparar("firefox", drv)
+            log("NAVEGADOR", f"Firefox{' (sin ventana)' if sin_ventana() else ''} → {fxbin} + {gecko}")
             return ("firefox", drv)
     except Exception as e:
         log("AVISO", f"Firefox no disponible ({e}). Probando Chromium…")
@@ -141,42 +148,52 @@ def get_webdriver()->Tuple[Optional[str], Optional["webdriver.Remote"]]:
         chd=which_any(DEFAULT_PATHS["chromedriver"])
         chbin=which_any(DEFAULT_PATHS["chromium"])
         if chd and chbin:
-            opts=ChOptions(); opts.binary_location=chbin
+            opts=opciones_chromium(ChOptions()); opts.binary_location=chbin
             svc=ChService(executable_path=chd)
-            drv=webdriver.Chrome(service=svc, options=opts)
-            log("NAVEGADOR", f"Chromium → {chbin} + {chd}")
+            drv=webdriver.Chrome(service=svc, options=opts); preparar("chromium", drv)
+            log("NAVEGADOR", f"Chromium{' (sin ventana)' if sin_ventana() else ''} → {chbin} + {chd}")
             return ("chromium", drv)
     except Exception as e:
         log("AVISO", f"Chromium no disponible ({e}).")
     return (None, None)
 
-def selenium_fetch(url:str)->Optional[Resp]:
-    name, drv = get_webdriver()
-    if not drv: return None
-    try:
-        print(f"{MAG}{BOLD}→ Abriendo navegador real ({name}) para: {url}{RESET}")
-        try: drv.set_page_load_timeout(SELENIUM_PAGELOAD_TIMEOUT)
-        except Exception: pass
-        t0=int(time.time()*1000)
-        drv.get(url)
-        try: _wait_dom_complete(drv, DOM_READY_MAX_WAIT)
-        except Exception: pass
-        final=_stabilize_url(drv, URL_STABILIZE_WINDOW_MS, URL_STABILIZE_MAX_MS)
-        time.sleep(POST_LOAD_SETTLE_MS/1000.0)
-        html=drv.page_source or ""; took=int(time.time()*1000)-t0
-        return Resp(url, final, 200, {"via":name}, html, False, None, name, took)
-    except Exception as e:
-        log_exc("selenium_fetch", e); return None
-    finally:
-        try: drv.quit()
-        except Exception: pass
+# Navegadores reutilizables (se arrancan una vez; ver motores/navegadores.py)
+POOL_NAVEGADORES=PoolNavegadores(lambda: get_webdriver())
+
+def selenium_fetch(url:str, forzar:bool=False, regla:Regla=REGLA_DEFECTO,
+                   politica:Politica=POLITICA_DEFECTO)->Optional[Resp]:
+    """
+    `regla`: cuándo dar la página por lista; `politica`: qué recursos no descargar
+    (las de su sitio en sitios.json, ver regla_de / politica_de).
+    """
+    ent=cache_disco.leer(url, cache_disco.MODOS_NAVEGADOR, forzar)
+    if ent is not None:
+        return Resp(url, ent.final_url, ent.status, ent.headers, ent.text, False, None, ent.modo, 0)
+    with POOL_NAVEGADORES.usar() as inst:
+        if inst is None: return None
+        name, drv = inst.nombre, inst.driver
+        try:
+            print(f"{MAG}{BOLD}→ Navegador real ({name}) para: {url}{RESET}")
+            try: drv.set_page_load_timeout(SELENIUM_PAGELOAD_TIMEOUT)
+            except Exception: pass
+            instalar_sonda(drv, name); aplicar(drv, name, url, politica)
+            t0=int(time.time()*1000)
+            with metricas.etapa("selenium.get"): drv.get(url)
+            t_listo=time.time()
+            with metricas.etapa("selenium.listo"): final, listo=esperar_listo(drv, regla)
+            if not listo: metricas.anotar("timeout", time.time()-t_listo)
+            html=drv.page_source or ""; took=int(time.time()*1000)-t0
+            metricas.anotar("selenium.total", took/1000)
+            cache_disco.escribir(url, name, final, 200, {"via":name}, html)
+            return Resp(url, final, 200, {"via":name}, html, False, None, name, took)
+        except Exception as e:
+            log_exc("selenium_fetch", e); return None
 
 # ===== sitios.json =====
 def cargar_sitios(path:str="sitios.json")->List[Dict[str,Any]]:
+    """sitios.json + cambios pendientes de su registro (motores/almacen.py)."""
     try:
-        with open(path,"r",encoding="utf-8") as f:
-            d=json.load(f)
-            if isinstance(d,list): return d
+        return Almacen(path).leer()
     except Exception as e:
         log_exc("cargar_sitios", e)
     return []
@@ -186,94 +203,217 @@ def _final_url_from_resp(r_http:Resp, r_sel:Optional[Resp])->str:
     if r_sel and r_sel.final_url: return r_sel.final_url
     return r_http.final_url
 
-def method_outcome_signature(metodo:str, params:Dict[str,Any], r_http:Resp, r_sel:Optional[Resp])->Optional[str]:
+def texto_respuesta(r_http:Resp, r_sel:Optional[Resp])->str:
+    return r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text
+
+# Métodos que miran el contenido (sus claves se buscan todas juntas, ver motores/coincidencias.py)
+METODOS_CONTENIDO=("status_code_y_texto","html_contains","captcha_detect","palabras_clave")
+
+def claves_de(mc:MetodoCompilado, status:Optional[int]=None)->Tuple[str,...]:
+    """Claves que necesita la firma del método. Con `status`, status_code_y_texto sin ese código no necesita ninguna."""
+    if mc.metodo=="captcha_detect": return tuple(CAPTCHA_MARKERS)
+    if mc.metodo=="status_code_y_texto" and status is not None and status!=mc.codigo: return ()
+    return mc.claves
+
+def buscador_para(metodos:Sequence[MetodoCompilado], status:Optional[int]=None)->BuscadorClaves:
+    return BuscadorClaves(k for mc in metodos if mc.metodo in METODOS_CONTENIDO for k in claves_de(mc, status))
+
+def firma_contenido(mc:MetodoCompilado, status:Optional[int], hits:Optional[BuscadorClaves])->Optional[str]:
+    """Firmas que solo dependen del status y de las claves vistas (las que PlanLectura ya puede calcular)."""
+    metodo=mc.metodo
+    if metodo=="status_code": return f"status={status}"
+    if hits is None: return None
+    if metodo=="status_code_y_texto":
+        hit=(status==mc.codigo) and all(hits.contiene(k) for k in mc.claves)
+        return f"status_text_hit={bool(hit)}"
+    elif metodo=="html_contains":
+        hit=all(hits.contiene(k) for k in mc.claves) if mc.claves else False
+        return f"html_hit={bool(hit)}"
+    elif metodo=="captcha_detect":
+        return f"captcha={'true' if any(hits.contiene(m) for m in CAPTCHA_MARKERS) else 'false'}"
+    elif metodo=="palabras_clave":
+        hit=any(hits.contiene(k) for k in mc.claves)
+        return f"kw_hit={bool(hit)}"
+    return None
+
+def firma_metodo(mc:MetodoCompilado, r_http:Resp, r_sel:Optional[Resp], hits:Optional[BuscadorClaves]=None)->Optional[str]:
+    """`hits`: claves ya buscadas en el contenido (una pasada compartida por todos los métodos de la respuesta)."""
     try:
-        if metodo=="status_code": return f"status={r_http.status}"
-        elif metodo in ("url_check","redirect_check"): return f"final_url={_final_url_from_resp(r_http, r_sel)}"
-        elif metodo=="status_code_y_texto":
-            code=params.get("codigo"); keys=[k.lower() for k in params.get("debe_contener",[])]
-            txt=(r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text).lower()
-            hit=(r_http.status==code) and all(k in txt for k in keys[:5])
-            return f"status_text_hit={bool(hit)}"
-        elif metodo=="html_contains":
-            keys=[k.lower() for k in params.get("claves",[])]
-            txt=(r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text).lower()
-            hit=all(k in txt for k in keys[:5]) if keys else False
-            return f"html_hit={bool(hit)}"
+        metodo=mc.metodo
+        if metodo in ("url_check","redirect_check"):
+            return outcome_url(_final_url_from_resp(r_http, r_sel), usuario_en(mc.url_base, r_http.url))
+        elif metodo=="huella_dom": return huella_dom(texto_respuesta(r_http, r_sel))
         elif metodo=="json_response_check":
             if r_http.is_json and isinstance(r_http.json_obj, dict):
-                keys=params.get("claves_presentes",[])
-                hit=all(k in r_http.json_obj for k in keys[:5])
+                hit=all(k in r_http.json_obj for k in mc.claves_json)
                 return f"json_hit={bool(hit)}"
             return "json_hit=False"
-        elif metodo=="captcha_detect":
-            txt=(r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text)
-            return f"captcha={'true' if any(m in txt.lower() for m in CAPTCHA_MARKERS) else 'false'}"
-        elif metodo=="palabras_clave":
-            keys=[k.lower() for k in params.get("claves",[])]
-            txt=(r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text).lower()
-            hit=any(k in txt for k in keys)
-            return f"kw_hit={bool(hit)}"
         elif metodo=="custom_selector_check":
             return f"dom_loaded={bool(r_sel)}"
+        if metodo in METODOS_CONTENIDO and hits is None:
+            hits=buscador_para([mc]); hits.alimentar(texto_respuesta(r_http, r_sel).lower())
+        return firma_contenido(mc, r_http.status, hits)
     except Exception:
         return None
-    return None
 
-def evaluar_metodo(url_base:str, usuario:str, metodo:str, params:Dict[str,Any], use_browser:bool)->Tuple[str, Dict[str,Any], Resp, Optional[Resp]]:
-    url=url_base.replace("{user}",usuario).replace("{usuario}",usuario)
-    r_sel=selenium_fetch(url) if use_browser else None
-    r_http=fetch_http(url)
-    outcome=method_outcome_signature(metodo, params, r_http, r_sel)
+class PlanLectura:
+    """
+    Modo streaming: sabe qué necesita cada método de una URL y dice cuándo dejar de leer el cuerpo.
+    Solo corta si el cuerpo que falta ya no puede cambiar nada: las firmas de todos los métodos están
+    decididas Y, en cada sitio que lee la URL, alguna dice "No existe" (entonces decidir_sitio no pasa
+    por la heurística ni por la extracción, que sí necesitan la página entera). Con "Existe" o
+    Indeterminado se lee todo. json_response_check y huella_dom necesitan siempre el cuerpo completo.
+    """
+    def __init__(self, metodos:Sequence[MetodoCompilado]):
+        self.metodos=tuple(metodos); self.hits:Optional[BuscadorClaves]=None; self.status:Optional[int]=None
+
+    def _firmas_decididas(self)->bool:
+        hits=self.hits
+        for mc in self.metodos:
+            m=mc.metodo
+            if m in ("json_response_check","huella_dom"): return False
+            if m not in METODOS_CONTENIDO: continue
+            claves=claves_de(mc, self.status)
+            if m=="status_code_y_texto" and self.status!=mc.codigo: continue
+            if m in ("captcha_detect","palabras_clave"):
+                if not any(hits.contiene(k) for k in claves): return False     # un solo hit decide
+            elif claves and not all(hits.contiene(k) for k in claves): return False
+        return True
+
+    def decidido(self)->bool:
+        if not self._firmas_decididas(): return False
+        no_existe:Dict[str,bool]={}
+        for mc in self.metodos:
+            o=firma_contenido(mc, self.status, self.hits)
+            no=o is not None and decidir_por_outcome(o, mc.outcomes_real, mc.outcomes_fake)=="No existe"
+            no_existe[mc.nombre]=no_existe.get(mc.nombre, False) or no
+        return bool(no_existe) and all(no_existe.values())
+
+    def seguir(self, status:int, trozo:Optional[str])->bool:
+        if trozo is None:
+            self.status=status; self.hits=buscador_para(self.metodos, status)
+        else:
+            self.hits.alimentar(trozo.lower())
+        return not self.decidido()
+
+def method_outcome_signature(metodo:str, params:Dict[str,Any], r_http:Resp, r_sel:Optional[Resp])->Optional[str]:
+    return firma_metodo(compilar_metodo({"metodo":metodo, "parametros":params}), r_http, r_sel)
+
+def expandir_url(url_base:str, usuario:str)->str:
+    return url_base.replace("{user}",usuario).replace("{usuario}",usuario)
+
+def url_base_valida(url_base:str)->bool:
+    return "{user}" in url_base or "{usuario}" in url_base
+
+# Respuestas de UN escaneo por URL expandida: varios métodos del mismo sitio comparten descarga.
+CacheEscaneo = Dict[str, Tuple[Resp, Optional[Resp]]]
+
+def obtener_respuestas(url:str, use_browser:bool, cache:Optional[CacheEscaneo]=None,
+                       regla:Regla=REGLA_DEFECTO, politica:Politica=POLITICA_DEFECTO)->Tuple[Resp, Optional[Resp]]:
+    previo=cache.get(url) if cache is not None else None
+    if previo is not None and (previo[1] is not None or not use_browser): return previo
+    r_sel=selenium_fetch(url, regla=regla, politica=politica) if use_browser else None
+    r_http=previo[0] if previo is not None else fetch_http(url)
+    if cache is not None: cache[url]=(r_http, r_sel)
+    return r_http, r_sel
+
+def resultado_metodo(mc:MetodoCompilado, r_http:Resp, r_sel:Optional[Resp], hits:Optional[BuscadorClaves]=None)->Tuple[str, Dict[str,Any], Resp, Optional[Resp]]:
+    outcome=firma_metodo(mc, r_http, r_sel, hits)
     meta={"final_url": _final_url_from_resp(r_http, r_sel), "status": r_http.status, "via": (r_sel.via if r_sel else "http")}
     return (outcome or "None"), meta, r_http, r_sel
 
-def decidir_por_outcome(outcome:str, outcomes_real:List[str], outcomes_fake:List[str])->str:
-    r = outcome in outcomes_real
-    f = outcome in outcomes_fake
+def evaluar_respuestas(metodos:Sequence[MetodoCompilado], r_http:Resp, r_sel:Optional[Resp],
+                       hits:Optional[BuscadorClaves]=None)->List[Tuple[str, Dict[str,Any], Resp, Optional[Resp]]]:
+    """
+    Todas las firmas de una misma respuesta a partir de UNA búsqueda de todas sus claves.
+    Con navegador, los métodos en modo "http" se evalúan igual sin él (como los aprendió el creador).
+    `hits`: búsqueda ya hecha mientras se leía el cuerpo HTTP (PlanLectura) sobre los métodos "http".
+    """
+    if r_sel is None: return _evaluar_grupo(metodos, r_http, None, hits)
+    grupos:Dict[bool,List[int]]={}
+    for i,mc in enumerate(metodos): grupos.setdefault(mc.modo==MODO_NAVEGADOR,[]).append(i)
+    out:List[Any]=[None]*len(metodos)
+    for nav, idxs in grupos.items():
+        evs=_evaluar_grupo([metodos[i] for i in idxs], r_http, r_sel if nav else None, None if nav else hits)
+        for i, ev in zip(idxs, evs): out[i]=ev
+    return out
+
+def _evaluar_grupo(metodos:Sequence[MetodoCompilado], r_http:Resp, r_sel:Optional[Resp],
+                   hits:Optional[BuscadorClaves])->List[Tuple[str, Dict[str,Any], Resp, Optional[Resp]]]:
+    if hits is None and any(mc.metodo in METODOS_CONTENIDO for mc in metodos):
+        with metricas.etapa("firma"):
+            hits=buscador_para(metodos, r_http.status)
+            if not hits.completo: hits.alimentar(texto_respuesta(r_http, r_sel).lower())
+    if not metricas.METRICAS_ACTIVAS: return [resultado_metodo(mc, r_http, r_sel, hits) for mc in metodos]
+    out=[]
+    for mc in metodos:
+        # la descarga se comparte: cada tipo de método que la usó carga con su tiempo
+        metricas.anotar_metodo(mc.metodo, "descarga", (r_http.took_ms+(r_sel.took_ms if r_sel else 0))/1000)
+        with metricas.etapa("firma", mc.metodo): out.append(resultado_metodo(mc, r_http, r_sel, hits))
+    return out
+
+def evaluar_metodo(url_base:str, usuario:str, metodo:str, params:Dict[str,Any], use_browser:bool, cache:Optional[CacheEscaneo]=None)->Tuple[str, Dict[str,Any], Resp, Optional[Resp]]:
+    mc=compilar_metodo({"url_base":url_base, "metodo":metodo, "parametros":params})
+    r_http, r_sel = obtener_respuestas(mc.url(usuario), use_browser and mc.modo==MODO_NAVEGADOR, cache)
+    return resultado_metodo(mc, r_http, r_sel)
+
+def agrupar_por_url(metodos:Sequence[MetodoCompilado], usuario:str)->Dict[str,List[int]]:
+    """URL expandida → posiciones de los métodos que la usan (los inválidos quedan fuera)."""
+    grupos:Dict[str,List[int]]={}
+    for i,mc in enumerate(metodos):
+        if mc.valida: grupos.setdefault(mc.url(usuario),[]).append(i)
+    return grupos
+
+def decidir_por_outcome(outcome:str, outcomes_real:Iterable[str], outcomes_fake:Iterable[str])->str:
+    """Outcomes normalizados (motores/huellas.py): URL con {user}, huellas dom a pocos bits."""
+    r = coincide(outcome, outcomes_real)
+    f = coincide(outcome, outcomes_fake)
     if r and not f: return "Existe"
     if f and not r: return "No existe"
     return "Indeterminado"
 
 # ===== extracción y heurística =====
-def _rg(pat:str, text:str, flags=re.I|re.S) -> Optional[str]:
-    m=re.search(pat, text, flags); return m.group(1).strip() if m else None
-def _rg_all(pat:str, text:str, flags=re.I|re.S) -> List[str]:
-    return [g.strip() for g in re.findall(pat, text, flags)]
-
-def extraer_info_relevante(html:str, final_url:str)->Dict[str,Any]:
+def extraer_info_relevante(html:str, final_url:str, doc:Optional[DocumentoHTML]=None)->Dict[str,Any]:
+    """`doc`: HTML ya analizado (analizar_html) para no recorrerlo otra vez."""
+    doc=doc or analizar_html(html)
     info:Dict[str,Any] = {"final_url":final_url}
-    ttl = _rg(r"<title[^>]*>(.*?)</title>", html)
-    if ttl: info["titulo"]=re.sub(r"\s+"," ", ttl)
-    canon = _rg(r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\']', html)
-    if canon: info["canonical"]=canon
-    desc = _rg(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', html)
-    if desc: info["descripcion"]=desc
-    og_title = _rg(r'<meta[^>]*property=["\']og:title["\'][^>]*content=["\']([^"\']+)["\']', html)
-    og_desc  = _rg(r'<meta[^>]*property=["\']og:description["\'][^>]*content=["\']([^"\']+)["\']', html)
-    og_image = _rg(r'<meta[^>]*property=["\']og:image["\'][^>]*content=["\']([^"\']+)["\']', html)
-    if og_title: info["og:title"]=og_title
-    if og_desc:  info["og:description"]=og_desc
-    if og_image: info["og:image"]=og_image
-
-    text_plain = re.sub(r"<[^>]+>"," ", html, flags=re.S)
-    text_plain = re.sub(r"\s+"," ", text_plain)
-
-    pats = {
-        "seguidores": r"(\d[\d\.,]*\s*(?:k|m|millones|mil)?)(?:\s+)?(?:seguidores|followers)",
-        "siguiendo":  r"(\d[\d\.,]*\s*(?:k|m|millones|mil)?)(?:\s+)?(?:siguiendo|following)",
-        "publicaciones": r"(\d[\d\.,]*\s*(?:k|m|millones|mil)?)(?:\s+)?(?:publicaciones|posts|pins)",
-        "likes": r"(\d[\d\.,]*\s*(?:k|m|millones|mil)?)(?:\s+)?(?:me gusta|likes)"
-    }
-    for k,pat in pats.items():
-        m=_rg(pat, text_plain, flags=re.I)
-        if m: info[k]=m
-
-    uname = _rg(r"@([A-Za-z0-9_.-]{3,})", text_plain)
-    if uname: info["usuario_detectado"]=uname
+    if doc.titulo: info["titulo"]=doc.titulo
+    if doc.canonical: info["canonical"]=doc.canonical
+    if doc.descripcion: info["descripcion"]=doc.descripcion
+    for k in ("og:title","og:description","og:image"):
+        if doc.og.get(k): info[k]=doc.og[k]
+    perfil=perfil_json_ld(doc)
+    if isinstance(perfil.get("name"), str) and perfil["name"].strip(): info["nombre"]=perfil["name"].strip()
+
+    text_plain = doc.texto
+    for k,(clave,pat) in PATRONES_METRICAS.items():
+        v=_buscar_metrica(text_plain, clave, pat)
+        if v: info[k]=v
+
+    m = PATRON_USUARIO.search(text_plain)
+    if m: info["usuario_detectado"]=m.group(1).strip()
     return info
 
-def heuristica_existe(user:str, final_url:str, html:str)->str:
+_NUM=r"(\d[\d\.,]*\s*(?:k|m|millones|mil)?)(?:\s+)?"
+# (palabra clave, patrón completo): se busca primero la palabra y el número solo justo antes de ella;
+# el patrón suelto reintentaba desde cada dígito del documento (lento en SPAs de varios MB)
+PATRONES_METRICAS = {k:(re.compile(kw, re.I), re.compile(_NUM+kw, re.I|re.S)) for k,kw in {
+    "seguidores": r"(?:seguidores|followers)",
+    "siguiendo":  r"(?:siguiendo|following)",
+    "publicaciones": r"(?:publicaciones|posts|pins)",
+    "likes": r"(?:me gusta|likes)",
+}.items()}
+PATRON_USUARIO = re.compile(r"@([A-Za-z0-9_.-]{3,})", re.I|re.S)
+VENTANA_METRICA=64      # caracteres antes de la palabra clave donde puede empezar el número
+
+def _buscar_metrica(texto:str, clave:"re.Pattern[str]", pat:"re.Pattern[str]")->Optional[str]:
+    """Igual que pat.search(texto) (primer número+palabra del documento) sin probar en cada dígito."""
+    for m in clave.finditer(texto):
+        r=pat.search(texto, max(0, m.start()-VENTANA_METRICA), m.end())
+        if r: return r.group(1).strip()
+    return None
+
+def heuristica_existe(user:str, final_url:str, html:str, doc:Optional[DocumentoHTML]=None)->str:
     u=user.lower()
     host = ""
     try:
@@ -281,32 +421,145 @@ def heuristica_existe(user:str, final_url:str, html:str)->str:
     except Exception:
         pass
 
-    # Normaliza texto
-    plain = re.sub(r"<[^>]+>"," ", html, flags=re.S)
-    plain = re.sub(r"\s+"," ", plain).lower()
+    # Texto ya normalizado por el extractor (una sola pasada compartida con extraer_info_relevante)
+    doc = doc or analizar_html(html)
+    plain = doc.texto_min
 
     # TikTok
     if "tiktok.com" in (host or ""):
         # Señales de perfil presente
-        if (f"@{u}" in plain) or ('uniqueid":"' in html.lower()) or ("og:url" in html.lower() and f"@{u}" in html.lower()):
+        html_l = html.lower()
+        if (f"@{u}" in plain) or ('uniqueid":"' in html_l) or ("og:url" in doc.og and f"@{u}" in html_l):
             return "Existe"
 
     # Pinterest
     if "pinterest.com" in (host or ""):
-        if 'property="og:type" content="profile"' in html.lower() or "profile" in plain:
+        if doc.og.get("og:type","").lower()=="profile" or "profile" in plain:
             # Si aparece el usuario en la URL final y hay título/OG, lo damos como existe
             if u in final_url.lower() or f"{u}" in plain:
                 return "Existe"
 
     # Genérica: si título, canonical y alguna métrica aparecen junto con el usuario
-    ttl = _rg(r"<title[^>]*>(.*?)</title>", html) or ""
+    ttl = doc.titulo
     if u in (ttl.lower()+plain):
         if any(k in plain for k in ["followers","seguidores","following","siguiendo","posts","publicaciones","likes","me gusta"]):
             return "Existe"
 
     return "Indeterminado"
 
+# ===== Decisión por sitio =====
+@dataclass
+class ResultadoSitio:
+    nombre:str; decision:str; heuristica:bool=False
+    resultados:List[Tuple[str,str,str,str]]=field(default_factory=list)
+    info:Dict[str,Any]=field(default_factory=dict)
+    # en paralelo a `resultados`: (status, took_ms, modo de descarga, metodo_id/clave); None si no se descargó
+    detalles:List[Tuple[Optional[int],Optional[int],str,str]]=field(default_factory=list)
+
+def decidir_sitio(nombre:str, user:str, metodos:Sequence[MetodoCompilado], evaluaciones:List[Any])->ResultadoSitio:
+    """
+    Agrega los métodos de un sitio. `evaluaciones` va en el mismo orden que `metodos`:
+    la tupla de evaluar_metodo, None si la URL base no tiene {user}, OMITIDO si el sitio ya estaba
+    decidido antes de llegar a él, o la excepción capturada.
+    """
+    any_exist=False; any_no=False
+    resultados=[]; detalles=[]
+    best_html=""; best_final="-"; best_len=0
+    for mc, ev in zip(metodos, evaluaciones):
+        metodo=mc.metodo
+        if isinstance(ev, tuple):
+            r_h, r_s = ev[2], ev[3]
+            detalles.append((r_h.status, r_h.took_ms+(r_s.took_ms if r_s else 0), ev[1].get("via","http"), clave_metodo(mc)))
+        else:
+            detalles.append((None, None, mc.modo, clave_metodo(mc)))
+        if ev is None:
+            resultados.append(("Indeterminado", metodo, "[URL base sin {user}/{usuario}]", mc.url_base)); continue
+        if isinstance(ev, str) and ev==OMITIDO:
+            resultados.append(("Indeterminado", metodo, OMITIDO, "-")); continue
+        if isinstance(ev, BaseException):
+            resultados.append(("Indeterminado", metodo, f"[error:{ev}]", "-")); continue
+        outcome, meta, r_http, r_sel = ev
+        decision = decidir_por_outcome(outcome, mc.outcomes_real, mc.outcomes_fake)
+        if decision=="Existe": any_exist=True
+        if decision=="No existe": any_no=True
+        resultados.append((decision, metodo, outcome, meta.get("final_url","-")))
+        cand_html = (r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text) or ""
+        if (r_sel is not None) or (len(cand_html) > best_len):
+            best_html = cand_html; best_final = meta.get("final_url","-"); best_len = len(cand_html)
+
+    # Decisión agregada por sitio (por outcomes)
+    if any_no:
+        final = "No existe"
+    elif any_exist:
+        final = "Existe"
+    else:
+        final = "Indeterminado"
+
+    # HEURÍSTICA si quedó Indeterminado y tenemos HTML bueno
+    # (el HTML se analiza una sola vez y lo comparten heurística y extracción)
+    heur_used=False; doc:Optional[DocumentoHTML]=None
+    if final=="Indeterminado" and best_html:
+        with metricas.etapa("analisis_html"): doc = analizar_html(best_html)
+        with metricas.etapa("heuristica"): heur = heuristica_existe(user, best_final, best_html, doc)
+        if heur != "Indeterminado":
+            final = heur
+            heur_used=True
+
+    info:Dict[str,Any] = {}
+    if final=="Existe" and best_html:
+        if doc is None:
+            with metricas.etapa("analisis_html"): doc = analizar_html(best_html)
+        with metricas.etapa("extraccion"): info = extraer_info_relevante(best_html, best_final, doc)
+    return ResultadoSitio(nombre, final, heur_used, resultados, info, detalles)
+
+def evaluar_sitio(sitio:SitioCompilado, user:str, use_browser:bool, historial:Optional[Historial]=None)->ResultadoSitio:
+    """
+    Camino secuencial (una descarga tras otra, de la más decisiva a la menos, parando en cuanto
+    el sitio queda decidido); el escáner concurrente vive en motores/escaner.py.
+    """
+    evaluaciones:List[Any]=[None]*len(sitio.metodos)
+    regla=regla_de(mc.datos for mc in sitio.metodos); politica=politica_de(mc.datos for mc in sitio.metodos)
+    cache:CacheEscaneo={}
+    with metricas.en_sitio(sitio.nombre), metricas.etapa("sitio"):
+        for ola in olas(unidades(sitio.metodos, agrupar_por_url(sitio.metodos, user), use_browser, historial)):
+            for u in ola:
+                if decidido(evaluaciones, sitio.metodos):
+                    omitir(evaluaciones, u.idxs); continue
+                try:
+                    r_http, r_sel = obtener_respuestas(u.url, u.navegador, cache, regla=regla, politica=politica)
+                    for i, ev in zip(u.idxs, evaluar_respuestas([sitio.metodos[i] for i in u.idxs], r_http, r_sel)): evaluaciones[i]=ev
+                except Exception as e:
+                    for i in u.idxs: evaluaciones[i]=e
+        res=decidir_sitio(sitio.nombre, user, sitio.metodos, evaluaciones)
+    anotar_sitio(historial, sitio.metodos, evaluaciones, res.resultados, res.decision)
+    return res
+
 # ===== UI =====
+def mostrar_sitio(res:ResultadoSitio)->Optional[str]:
+    """Imprime el bloque de un sitio; devuelve el bloque de extracción para el reporte (si existe)."""
+    print(f"\n{MAG}{BOLD}===============  {res.nombre}  ==============={RESET}\n")
+    if not res.resultados:
+        print(f"{YELLOW}Sin métodos para este sitio.{RESET}")
+        return None
+
+    # Mostrar resultados por método
+    for decision, metodo, outcome, final_url in res.resultados:
+        color = GREEN if decision=="Existe" else RED if decision=="No existe" else YELLOW
+        print(f"  → {color}{decision}{RESET}  | {metodo:22s} | outcome: {outcome} | final: {final_url}")
+
+    agg_color = GREEN if res.decision=="Existe" else RED if res.decision=="No existe" else YELLOW
+    extra_tag = f" {YELLOW}(heurística){RESET}" if res.heuristica else ""
+    print(f"\n📌 Decisión para {res.nombre}: {agg_color}{BOLD}{res.decision}{RESET}{extra_tag}")
+
+    # Extracción si existe
+    if res.info:
+        print(f"\n{BLUE}{BOLD}→ Extrayendo información relevante…{RESET}")
+        for k in ["final_url","canonical","titulo","descripcion","og:title","og:description","og:image","usuario_detectado","seguidores","siguiendo","publicaciones","likes"]:
+            if k in res.info:
+                print(f"   {CYAN}{k:18s}{RESET}: {res.info[k]}")
+        return f"[{res.nombre}] EXISTE\n" + "\n".join([f"{k}: {v}" for k,v in res.info.items()])
+    return None
+
 def run_terminal():
     print(f"{BOLD}🔍 Buscador (auto, con outcomes) — Ojo de Zeus 2{RESET}")
     print("=======================================================")
@@ -314,106 +567,63 @@ def run_terminal():
     if not user:
         print(f"{YELLOW}No ingresaste usuario/correo.{RESET}"); return
 
-    sitios=cargar_sitios()
-    if not sitios:
+    indice=cargar_indice()
+    if not indice.total_metodos:
         print(f"{RED}No encontré sitios.json o está vacío.{RESET}"); return
+    for sitio, metodo, motivo in indice.por_recrear():
+        print(f"{WARN} {sitio} · {metodo} no decide hasta volver a crearlo: {motivo}")
 
-    # Navegador real disponible
-    if SELENIUM_OK and has_display():
-        name, inst = get_webdriver()
-        if inst:
-            try: inst.quit()
-            except Exception: pass
+    # Navegador real disponible: la instancia que arranca aquí se queda en el pool para el escaneo
+    n_nav, n_sitios = resumen(indice.sitios)
+    if not n_nav:
+        use_browser=False
+        print(f"{OK} Ningún método necesita navegador. Usaré {BOLD}HTTP{RESET}.")
+    elif SELENIUM_OK:
+        preparar_sesion(indice)
+        name = POOL_NAVEGADORES.iniciar()
+        if name:
             use_browser=True
-            print(f"{OK} Entorno gráfico con navegador real disponible ({BOLD}{name}{RESET}).")
+            modo = "sin ventana (headless)" if sin_ventana() else "entorno gráfico"
+            print(f"{OK} Navegador real disponible ({BOLD}{name}{RESET}, {modo}); "
+                  f"solo para {n_nav} de {n_sitios} sitio(s).")
         else:
             use_browser=False
             print(f"{WARN} No se pudo iniciar Firefox ni Chromium. Usaré {BOLD}HTTP{RESET}.")
     else:
         use_browser=False
-        print(f"{WARN} Sin entorno gráfico/Selenium. Usaré {BOLD}HTTP{RESET}.")
-
-    # Agrupar por nombre de sitio
-    sitios_por_nombre:Dict[str,List[Dict[str,Any]]]={}
-    for s in sitios:
-        n=s.get("nombre","general")
-        sitios_por_nombre.setdefault(n,[]).append(s)
-
-    extracted_blocks: List[str] = []
-    for nombre, metodos in sitios_por_nombre.items():
-        print(f"\n{MAG}{BOLD}===============  {nombre}  ==============={RESET}\n")
-        if not metodos:
-            print(f"{YELLOW}Sin métodos para este sitio.{RESET}")
-            continue
-
-        any_exist=False; any_no=False
-        resultados=[]
-        best_html=""; best_final="-"; best_len=0
-
-        for m in metodos:
-            metodo=m.get("metodo","?")
-            params=m.get("parametros",{})
-            url_base=m.get("url_base","")
-            if "{user}" not in url_base and "{usuario}" not in url_base:
-                resultados.append(("Indeterminado", metodo, "[URL base sin {user}/{usuario}]", url_base))
-                continue
-            try:
-                outcome, meta, r_http, r_sel = evaluar_metodo(url_base, user, metodo, params, use_browser)
-                decision = decidir_por_outcome(outcome, m.get("outcomes_real",[]), m.get("outcomes_fake",[]))
-                if decision=="Existe": any_exist=True
-                if decision=="No existe": any_no=True
-                resultados.append((decision, metodo, outcome, meta.get("final_url","-")))
-                cand_html = (r_sel.text if (r_sel and len(r_sel.text)>len(r_http.text)) else r_http.text) or ""
-                if (r_sel is not None) or (len(cand_html) > best_len):
-                    best_html = cand_html; best_final = meta.get("final_url","-"); best_len = len(cand_html)
-            except Exception as e:
-                resultados.append(("Indeterminado", metodo, f"[error:{e}]", "-"))
-
-        # Mostrar resultados por método
-        for decision, metodo, outcome, final_url in resultados:
-            color = GREEN if decision=="Existe" else RED if decision=="No existe" else YELLOW
-            print(f"  → {color}{decision}{RESET}  | {metodo:22s} | outcome: {outcome} | final: {final_url}")
-
-        # Decisión agregada por sitio (por outcomes)
-        if any_no:
-            final = "No existe"
-        elif any_exist:
-            final = "Existe"
-        else:
-            final = "Indeterminado"
-
-        # HEURÍSTICA si quedó Indeterminado y tenemos HTML bueno
-        heur_used=False
-        if final=="Indeterminado" and best_html:
-            heur = heuristica_existe(user, best_final, best_html)
-            if heur != "Indeterminado":
-                final = heur
-                heur_used=True
-
-        agg_color = GREEN if final=="Existe" else RED if final=="No existe" else YELLOW
-        extra_tag = f" {YELLOW}(heurística){RESET}" if heur_used else ""
-        print(f"\n📌 Decisión para {nombre}: {agg_color}{BOLD}{final}{RESET}{extra_tag}")
-
-        # Extracción si existe
-        if final=="Existe" and best_html:
-            print(f"\n{BLUE}{BOLD}→ Extrayendo información relevante…{RESET}")
-            info = extraer_info_relevante(best_html, best_final)
-            for k in ["final_url","canonical","titulo","descripcion","og:title","og:description","og:image","usuario_detectado","seguidores","siguiendo","publicaciones","likes"]:
-                if k in info:
-                    print(f"   {CYAN}{k:18s}{RESET}: {info[k]}")
-            block = f"[{nombre}] EXISTE\n" + "\n".join([f"{k}: {v}" for k,v in info.items()])
-            extracted_blocks.append(block)
-
-    print("\n🔚 Búsqueda finalizada.")
+        print(f"{WARN} Sin Selenium. Usaré {BOLD}HTTP{RESET}.")
+
+    # Todos los sitios a la vez; cada bloque se imprime en cuanto su sitio termina
+    from motores.escaner import escanear_usuario
+    from motores.resultados import AlmacenResultados
+    extracted_blocks: List[str] = []; resultados: Dict[str,ResultadoSitio] = {}
+    bd=AlmacenResultados(); esc=bd.abrir_escaneo(user, "terminal")
+    def _al_terminar(res:ResultadoSitio)->None:
+        resultados[res.nombre]=res; bd.agregar(esc, res)
+        block=mostrar_sitio(res)
+        if block: extracted_blocks.append(block)
+    t0=time.time()
+    metricas.REGISTRO.vaciar(); metricas.activar()
+    historial=Historial.de()
+    try: escanear_usuario(user, indice, use_browser, al_terminar=_al_terminar, historial=historial)
+    finally:
+        POOL_NAVEGADORES.cerrar(); metricas.activar(False); historial.guardar()
+        bd.cerrar_escaneo(esc); bd.cerrar()
+
+    print(f"\n🔚 Búsqueda finalizada en {time.time()-t0:.1f}s.")
+    if input("\n⏱️  ¿Ver perfil de tiempos (sitios y etapas más lentos)? (s/N): ").strip().lower()=="s":
+        print("\n"+metricas.REGISTRO.informe())
     ans=input("\n¿Guardar reporte .txt? (s/n): ").strip().lower()
     if ans=="s":
         ts=time.strftime("%Y%m%d_%H%M%S"); fname=f"busqueda_{user}_{ts}.txt"
         with open(fname,"w",encoding="utf-8") as f:
             f.write(f"Reporte de búsqueda — {user}\nFecha: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            for nombre, metodos in sitios_por_nombre.items():
-                f.write(f"\n[{nombre}]\n")
-                for i,m in enumerate(metodos, start=1):
-                    f.write(f" - {i:02d} {m.get('metodo','?')}\n")
+            for sitio in indice:
+                res=resultados.get(sitio.nombre)
+                f.write(f"\n[{sitio.nombre}] {res.decision if res else '-'}\n")
+                for i,mc in enumerate(sitio.metodos, start=1):
+                    dec=res.resultados[i-1][0] if res and i<=len(res.resultados) else "-"
+                    f.write(f" - {i:02d} {mc.metodo}: {dec}\n")
             if extracted_blocks:
                 f.write("\n\n=== EXTRACCIONES ===\n")
                 for b in extracted_blocks:
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Caché de respuestas en disco – Ojo de Zeus 2
+– SQLite (cache_respuestas.sqlite) con clave URL + modo de descarga ("http", "firefox", "chromium").
+– Guarda URL final, status, headers y cuerpo comprimido (zlib); sirve igual al buscador y al creador.
+– Caducidad por entrada: CACHE_TTL_S por defecto o la de su host en CACHE_TTL_POR_HOST.
+– Tope de tamaño: al pasarlo se borran las entradas usadas hace más tiempo (LRU).
+– No guarda errores de red, 429/5xx ni cuerpos truncados.
+– `forzar=True` en fetch_* (o CACHE_FRESCO global, --fresco) descarga de nuevo y refresca la entrada.
+"""
+
+import atexit, json, sqlite3, threading, time, zlib
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+# ===== Ajustes =====
+CACHE_ACTIVA=True
+CACHE_FRESCO=False                    # True = no leer (descargar todo de nuevo) pero sí guardar lo nuevo
+CACHE_RUTA="cache_respuestas.sqlite"
+CACHE_TTL_S=6*3600                    # vida de una respuesta guardada
+CACHE_TTL_POR_HOST:Dict[str,float]={  # host → seg. (0 = no guardar ese host)
+    # "www.instagram.com": 3600,
+}
+CACHE_MAX_BYTES=256*1024*1024         # cuerpos comprimidos en total
+CACHE_PODAR_CADA=64                   # escrituras entre comprobaciones del tope
+
+MODOS_NAVEGADOR=("firefox","chromium")
+
+@dataclass
+class Entrada:
+    url:str; modo:str; final_url:str; status:int; headers:Dict[str,str]; text:str; creado:float
+
+def _host(url:str)->str:
+    try: return (urlsplit(url).hostname or "").lower()
+    except Exception: return ""
+
+def ttl_de(url:str)->float:
+    h=_host(url)
+    while h:
+        if h in CACHE_TTL_POR_HOST: return CACHE_TTL_POR_HOST[h]
+        h=h.partition(".")[2]             # sub.dominio.com → dominio.com → com
+    return CACHE_TTL_S
+
+def guardable(status:int, truncado:bool=False)->bool:
+    return status>=0 and status!=429 and status<500 and not truncado
+
+class CacheRespuestas:
+    """Una conexión por proceso protegida por candado (la usan hilos del creador y del escáner)."""
+    def __init__(self, ruta:str=CACHE_RUTA, max_bytes:int=CACHE_MAX_BYTES):
+        self.ruta=ruta; self.max_bytes=max_bytes
+        self._lock=threading.Lock(); self._escrituras=0
+        self._db=sqlite3.connect(ruta, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL"); self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS respuestas(
+            url TEXT NOT NULL, modo TEXT NOT NULL, final_url TEXT, status INTEGER, headers TEXT,
+            cuerpo BLOB, tam INTEGER, creado REAL, expira REAL, usado REAL, PRIMARY KEY(url, modo))""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS respuestas_usado ON respuestas(usado)")
+
+    def obtener(self, url:str, modos:Iterable[str]=("http",))->Optional[Entrada]:
+        """Primera entrada vigente de `url` entre `modos` (en ese orden)."""
+        ahora=time.time()
+        with self._lock:
+            for modo in modos:
+                fila=self._db.execute("SELECT final_url,status,headers,cuerpo,creado,expira FROM respuestas WHERE url=? AND modo=?",
+                                      (url, modo)).fetchone()
+                if not fila: continue
+                final_url, status, headers, cuerpo, creado, expira = fila
+                if expira<=ahora:
+                    self._db.execute("DELETE FROM respuestas WHERE url=? AND modo=?", (url, modo)); continue
+                try: text=zlib.decompress(cuerpo).decode("utf-8")
+                except Exception:
+                    self._db.execute("DELETE FROM respuestas WHERE url=? AND modo=?", (url, modo)); continue
+                self._db.execute("UPDATE respuestas SET usado=? WHERE url=? AND modo=?", (ahora, url, modo))
+                return Entrada(url, modo, final_url, status, json.loads(headers or "{}"), text, creado)
+        return None
+
+    def guardar(self, url:str, modo:str, final_url:str, status:int, headers:Dict[str,str], text:str)->None:
+        ttl=ttl_de(url)
+        if ttl<=0: return
+        cuerpo=zlib.compress(text.encode("utf-8"), 6); ahora=time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO respuestas VALUES(?,?,?,?,?,?,?,?,?,?)",
+                             (url, modo, final_url, status, json.dumps(headers, ensure_ascii=False), cuerpo, len(cuerpo),
+                              ahora, ahora+ttl, ahora))
+            self._escrituras+=1
+            if self._escrituras>=CACHE_PODAR_CADA:
+                self._escrituras=0; self._podar(ahora)
+
+    def _podar(self, ahora:float)->None:
+        """Quita las caducadas y, si sigue por encima del tope, las menos usadas hasta quedar al 90 %."""
+        self._db.execute("DELETE FROM respuestas WHERE expira<=?", (ahora,))
+        total=self._db.execute("SELECT COALESCE(SUM(tam),0) FROM respuestas").fetchone()[0]
+        if total<=self.max_bytes: return
+        sobra=total-int(self.max_bytes*0.9); borrar=[]
+        for url, modo, tam in self._db.execute("SELECT url,modo,tam FROM respuestas ORDER BY usado"):
+            borrar.append((url, modo)); sobra-=tam
+            if sobra<=0: break
+        self._db.executemany("DELETE FROM respuestas WHERE url=? AND modo=?", borrar)
+
+    def vaciar(self)->None:
+        with self._lock: self._db.execute("DELETE FROM respuestas")
+
+    def cerrar(self)->None:
+        with self._lock:
+            try: self._db.close()
+            except Exception: pass
+
+# ===== Caché única por proceso =====
+_CACHE:Optional[CacheRespuestas]=None
+_CACHE_LOCK=threading.Lock()
+_CACHE_ROTA=False      # no se pudo abrir (disco de solo lectura, etc.): seguir sin caché
+
+def cache_compartida()->Optional[CacheRespuestas]:
+    """None si la caché está desactivada o no se puede abrir."""
+    global _CACHE, _CACHE_ROTA
+    if not CACHE_ACTIVA or _CACHE_ROTA: return None
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None and not _CACHE_ROTA:
+                try: _CACHE=CacheRespuestas(CACHE_RUTA)
+                except Exception: _CACHE_ROTA=True
+    return _CACHE
+
+def configurar(activa:bool=True, fresco:bool=False)->None:
+    """--sin-cache → activa=False (ni lee ni escribe); --fresco → no lee pero guarda lo descargado."""
+    global CACHE_ACTIVA, CACHE_FRESCO
+    CACHE_ACTIVA=activa; CACHE_FRESCO=fresco
+
+def leer(url:str, modos:Iterable[str]=("http",), forzar:bool=False)->Optional[Entrada]:
+    """Lo que usan fetch_http/selenium_fetch: un fallo de la caché nunca tumba una descarga."""
+    c=None if (forzar or CACHE_FRESCO) else cache_compartida()
+    if c is None: return None
+    try: return c.obtener(url, modos)
+    except Exception: return None
+
+def escribir(url:str, modo:str, final_url:str, status:int, headers:Dict[str,str], text:str, truncado:bool=False)->None:
+    c=cache_compartida()
+    if c is None or not guardable(status, truncado): return
+    try: c.guardar(url, modo, final_url, status, headers, text)
+    except Exception: pass
+
+@atexit.register
+def _cerrar()->None:
+    if _CACHE is not None: _CACHE.cerrar()
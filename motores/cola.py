@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Cola de trabajo – Ojo de Zeus 2 (escaneo repartido entre procesos o máquinas)
+– El coordinador parte la lista de usuarios en tareas usuario × sitio (de sitios.json) y las reparte
+  en shards por usuario: las tareas de un mismo usuario caen juntas y un trabajador las hace con UNA
+  pasada del escáner (mismo pipeline que el lote: descargas, firmas, decidir_por_outcome, heurística).
+– La cola es un SQLite (cola.sqlite, WAL) que comparten coordinador y trabajadores en la misma
+  máquina o en un disco común; sirve de sustituto local de una cola de verdad.
+– Cada trabajador toma una tanda de usuarios con plazo (lease). Si muere o se cuelga, al vencer el plazo las
+  tareas vuelven a la cola; mientras escanea renueva el plazo cada plazo/3 (un usuario lento, con
+  navegador o frenado por 429, no se le vence a mitad ni pasa a otro trabajador).
+  Una tarea que falla o vence COLA_MAX_INTENTOS veces queda "fallida" (reintentar la devuelve).
+– Cada trabajador guarda además sus usuarios en resultados.sqlite (origen "cola"), como el lote;
+  con --sin-bd solo quedan en la cola (exportar).
+– Reanudable por construcción: encolar dos veces la misma lista no duplica nada y un trabajador
+  nuevo sigue donde lo dejaron los demás.
+
+Uso:
+  python3 -m motores.cola encolar usuarios.txt --shards 8
+  python3 -m motores.cola trabajar --shard 3          # en cada máquina/proceso (sin --shard: cualquiera)
+  python3 -m motores.cola estado
+  python3 -m motores.cola exportar resultados.jsonl
+  python3 -m motores.cola local usuarios.txt --trabajadores 4   # todo en esta máquina, para probar
+"""
+
+import argparse, asyncio, json, multiprocessing, os, socket, sqlite3, sys, threading, time, zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from motores.indice import cargar_indice
+from motores.resultados import AlmacenResultados, RESULTADOS_RUTA
+
+COLA_RUTA="cola.sqlite"
+COLA_SHARDS=8
+COLA_TANDA=2                    # usuarios por préstamo (con todas sus tareas)
+COLA_PLAZO_S=300.0              # segundos antes de que una tarea prestada vuelva a la cola
+COLA_MAX_INTENTOS=3
+COLA_ESPERA_S=2.0               # trabajador con --esperar: pausa cuando no hay nada pendiente
+
+PENDIENTE, EN_CURSO, HECHA, FALLIDA = "pendiente", "en_curso", "hecha", "fallida"
+
+def log(evento:str, detalle:str): print(f"[{evento}] {detalle}", file=sys.stderr, flush=True)
+
+def shard_de(usuario:str, shards:int)->int:
+    """Estable entre procesos y máquinas (hash() de Python cambia con cada arranque)."""
+    return zlib.crc32(usuario.encode("utf-8"))%max(1,shards)
+
+def nombre_trabajador()->str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+@dataclass(frozen=True)
+class Tarea:
+    id:int; usuario:str; sitio:str; shard:int; intentos:int
+
+class Cola:
+    """Una conexión por proceso; préstamos en transacciones IMMEDIATE (nunca dos trabajadores con la misma tarea)."""
+    def __init__(self, ruta:str=COLA_RUTA, max_intentos:int=COLA_MAX_INTENTOS):
+        self.ruta=ruta; self.max_intentos=max(1,max_intentos); self._lock=threading.Lock()
+        self._db=sqlite3.connect(ruta, timeout=60, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL"); self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS tareas(
+                id INTEGER PRIMARY KEY, usuario TEXT NOT NULL, sitio TEXT NOT NULL, shard INTEGER NOT NULL,
+                estado TEXT NOT NULL DEFAULT 'pendiente', intentos INTEGER NOT NULL DEFAULT 0,
+                trabajador TEXT, vence REAL, actualizada REAL, resultado TEXT, error TEXT,
+                UNIQUE(usuario, sitio));
+            CREATE INDEX IF NOT EXISTS tareas_estado ON tareas(estado, shard, id);
+            CREATE INDEX IF NOT EXISTS tareas_vence ON tareas(estado, vence);
+        """)
+
+    def _tx(self):
+        return _Transaccion(self._db, self._lock)
+
+    # ===== Coordinador =====
+    def encolar(self, usuarios:Iterable[str], sitios:Sequence[str], shards:int=COLA_SHARDS)->int:
+        """Tareas usuario × sitio nuevas (las que ya estaban no se tocan). Devuelve cuántas se añadieron."""
+        n=0
+        for tanda in _tandas(usuarios, 100):
+            filas=[(u, s, shard_de(u, shards)) for u in tanda for s in sitios]
+            with self._tx() as db:
+                antes=db.total_changes
+                db.executemany("INSERT OR IGNORE INTO tareas(usuario, sitio, shard) VALUES(?,?,?)", filas)
+                n+=db.total_changes-antes
+        return n
+
+    def reintentar(self)->int:
+        """Las fallidas vuelven a pendiente con los intentos a cero."""
+        with self._tx() as db:
+            return db.execute("UPDATE tareas SET estado=?, intentos=0, trabajador=NULL, vence=NULL WHERE estado=?",
+                              (PENDIENTE, FALLIDA)).rowcount
+
+    def estado(self)->Dict[str,int]:
+        with self._lock:
+            filas=self._db.execute("SELECT estado, COUNT(*) FROM tareas GROUP BY estado").fetchall()
+        return {e:0 for e in (PENDIENTE, EN_CURSO, HECHA, FALLIDA)} | dict(filas)
+
+    def por_shard(self)->List[Tuple[int,int,int]]:
+        """(shard, hechas, total)."""
+        with self._lock:
+            return self._db.execute("SELECT shard, SUM(estado='hecha'), COUNT(*) FROM tareas GROUP BY shard ORDER BY shard").fetchall()
+
+    def fallidas(self, limite:int=20)->List[Tuple[str,str,str]]:
+        with self._lock:
+            return self._db.execute("SELECT usuario, sitio, error FROM tareas WHERE estado=? ORDER BY id LIMIT ?",
+                                    (FALLIDA, limite)).fetchall()
+
+    def resultados(self)->Iterable[str]:
+        """JSON (una fila de lote por usuario × sitio) de las tareas hechas, en orden de encolado."""
+        with self._lock:
+            filas=self._db.execute("SELECT resultado FROM tareas WHERE estado=? ORDER BY id", (HECHA,)).fetchall()
+        for (r,) in filas: yield r
+
+    # ===== Trabajador =====
+    def tomar(self, trabajador:str, n:int=COLA_TANDA, plazo:float=COLA_PLAZO_S, shard:Optional[int]=None)->List[Tarea]:
+        """
+        Presta las tareas pendientes (o con el plazo vencido) de hasta `n` usuarios: un usuario entero va a un
+        solo trabajador y se escanea en una pasada. Las que agotaron los intentos pasan a fallidas.
+        """
+        ahora=time.time()
+        disponible=f"(estado=? OR (estado=? AND vence<?)){'' if shard is None else ' AND shard=?'}"
+        args:Tuple[Any,...]=(PENDIENTE, EN_CURSO, ahora)+(() if shard is None else (shard,))
+        with self._tx() as db:
+            db.execute("UPDATE tareas SET estado=?, error='plazo vencido', trabajador=NULL, vence=NULL "
+                       "WHERE estado=? AND vence<? AND intentos>=?", (FALLIDA, EN_CURSO, ahora, self.max_intentos))
+            # las tareas de un usuario se encolan seguidas: recorrer por id hasta juntar `n` usuarios es corto
+            usuarios:List[str]=[]
+            for (u,) in db.execute(f"SELECT usuario FROM tareas WHERE {disponible} ORDER BY id", args):
+                if u not in usuarios:
+                    usuarios.append(u)
+                    if len(usuarios)>=max(1,n): break
+            filas=[f for u in usuarios for f in db.execute(
+                f"SELECT id, usuario, sitio, shard, intentos FROM tareas WHERE {disponible} AND usuario=? ORDER BY id", args+(u,))]
+            db.executemany("UPDATE tareas SET estado=?, trabajador=?, vence=?, intentos=intentos+1, actualizada=? WHERE id=?",
+                           [(EN_CURSO, trabajador, ahora+plazo, ahora, f[0]) for f in filas])
+        return [Tarea(i, u, s, sh, it+1) for i,u,s,sh,it in filas]
+
+    def renovar(self, trabajador:str, ids:Sequence[int], plazo:float=COLA_PLAZO_S)->None:
+        if not ids: return
+        with self._tx() as db:
+            db.executemany("UPDATE tareas SET vence=? WHERE id=? AND estado=? AND trabajador=?",
+                           [(time.time()+plazo, i, EN_CURSO, trabajador) for i in ids])
+
+    def completar(self, hechas:Sequence[Tuple[int, Dict[str,Any]]])->None:
+        """(id, fila) en una transacción. Un resultado tardío (la tarea se volvió a prestar) también vale."""
+        if not hechas: return
+        with self._tx() as db:
+            db.executemany("UPDATE tareas SET estado=?, resultado=?, error=NULL, vence=NULL, actualizada=? WHERE id=? AND estado!=?",
+                           [(HECHA, json.dumps(f, ensure_ascii=False), time.time(), i, HECHA) for i,f in hechas])
+
+    def fallar(self, ids:Sequence[int], error:str)->None:
+        """Vuelven a pendiente, o a fallidas si ya agotaron los intentos."""
+        if not ids: return
+        with self._tx() as db:
+            db.executemany("UPDATE tareas SET estado=CASE WHEN intentos>=? THEN ? ELSE ? END, error=?, trabajador=NULL, "
+                           "vence=NULL, actualizada=? WHERE id=? AND estado=?",
+                           [(self.max_intentos, FALLIDA, PENDIENTE, error[:500], time.time(), i, EN_CURSO) for i in ids])
+
+    def cerrar(self)->None:
+        with self._lock: self._db.close()
+
+class _Transaccion:
+    def __init__(self, db:sqlite3.Connection, lock:threading.Lock):
+        self.db=db; self.lock=lock
+
+    def __enter__(self)->sqlite3.Connection:
+        self.lock.acquire()
+        try: self.db.execute("BEGIN IMMEDIATE")
+        except Exception:
+            self.lock.release(); raise
+        return self.db
+
+    def __exit__(self, tipo, *exc)->None:
+        try: self.db.execute("ROLLBACK" if tipo else "COMMIT")
+        finally: self.lock.release()
+
+def _tandas(it:Iterable[str], n:int)->Iterable[List[str]]:
+    tanda:List[str]=[]
+    for x in it:
+        tanda.append(x)
+        if len(tanda)>=n: yield tanda; tanda=[]
+    if tanda: yield tanda
+
+# ===== Bucle del trabajador =====
+async def _renovar(cola:Cola, trabajador:str, quedan:Set[int], plazo:float)->None:
+    """Mientras dura la tanda, cada plazo/3 alarga el plazo de lo que aún no terminó (un usuario lento no se re-presta)."""
+    while quedan:
+        await asyncio.sleep(max(0.05, plazo/3))
+        await asyncio.to_thread(cola.renovar, trabajador, list(quedan), plazo)
+
+async def trabajar(cola:Cola, indice:Any, escaner:Any, trabajador:str, tanda:int=COLA_TANDA, plazo:float=COLA_PLAZO_S,
+                   shard:Optional[int]=None, esperar:bool=False, bd:Optional[AlmacenResultados]=None)->Dict[str,int]:
+    """`bd`: además de la cola, cada usuario terminado queda en el historial de resultados (como en el lote)."""
+    from motores.lote import fila_jsonl
+    por_nombre={s.nombre:s for s in indice}
+    stats={"tareas":0, "usuarios":0, "fallidas":0}
+    escaner.abrir()
+    try:
+        while True:
+            tareas=await asyncio.to_thread(cola.tomar, trabajador, tanda, plazo, shard)
+            if not tareas:
+                if not esperar: break
+                await asyncio.sleep(COLA_ESPERA_S); continue
+            grupos:Dict[str,List[Tarea]]={}
+            for t in tareas: grupos.setdefault(t.usuario,[]).append(t)
+            quedan={t.id for t in tareas}
+            renovador=asyncio.create_task(_renovar(cola, trabajador, quedan, plazo))
+            try:
+                for usuario, ts in grupos.items():
+                    desconocidas=[t.id for t in ts if t.sitio not in por_nombre]
+                    if desconocidas: await asyncio.to_thread(cola.fallar, desconocidas, "el sitio ya no está en sitios.json")
+                    ids={t.sitio:t.id for t in ts if t.sitio in por_nombre}
+                    hechas:List[Tuple[int, Dict[str,Any]]]=[]
+                    t0=time.time()
+                    esc=await asyncio.to_thread(bd.abrir_escaneo, usuario, "cola") if bd else 0
+                    def _al_terminar(res:Any)->None:
+                        hechas.append((ids[res.nombre], fila_jsonl(usuario, res)))
+                        if bd: bd.agregar(esc, res)
+                    try:
+                        await escaner.escanear(usuario, [por_nombre[s] for s in ids], _al_terminar)
+                    except Exception as e:
+                        await asyncio.to_thread(cola.completar, hechas)
+                        await asyncio.to_thread(cola.fallar, [i for i in ids.values() if i not in dict(hechas)], f"{type(e).__name__}: {e}")
+                        stats["fallidas"]+=len(ids)-len(hechas); log("COLA", f"{usuario}: error ({e}); sus tareas vuelven a la cola")
+                    else:
+                        await asyncio.to_thread(cola.completar, hechas)
+                        log("COLA", f"{usuario}: {len(hechas)} sitio(s) en {time.time()-t0:.1f}s")
+                    finally:
+                        # también si falló: el escaneo queda cerrado con lo que llegó a guardar
+                        if bd: await asyncio.to_thread(bd.cerrar_escaneo, esc)
+                    stats["tareas"]+=len(hechas); stats["usuarios"]+=1
+                    quedan.difference_update(t.id for t in ts)
+            finally:
+                renovador.cancel()
+                try: await renovador
+                except asyncio.CancelledError: pass
+    finally:
+        await escaner.cerrar()
+    return stats
+
+# ===== CLI =====
+def _escaner(a:argparse.Namespace, indice:Any)->Tuple[Any, Any]:
+    from motores import cache_disco, limitador, navegadores, recursos
+    from motores.buscador_auto_graficos import SELENIUM_OK, POOL_NAVEGADORES
+    from motores.escaner import Escaner
+    from motores.planificador import resumen
+    from motores.puntuacion import Historial
+    cache_disco.configurar(activa=not a.sin_cache)
+    limitador.configurar(a.rps, limitador.LIMITE_RAFAGA)
+    navegadores.configurar(headless=True if a.headless else None, ligero=not a.completo)
+    n_nav, _ = resumen(indice.sitios)
+    if a.navegador: recursos.preparar_sesion(indice)
+    POOL_NAVEGADORES.redimensionar(a.navegadores)     # el semáforo del escáner y el pool, mismo tope
+    use_browser=bool(a.navegador and n_nav and SELENIUM_OK and POOL_NAVEGADORES.iniciar())
+    historial=Historial.de(a.sitios)
+    return Escaner(use_browser, a.concurrencia, a.por_host, a.navegadores, a.timeout, a.streaming, procesos=a.procesos,
+                   historial=historial, cortocircuito=not a.todos), historial
+
+def _trabajador(a:argparse.Namespace)->int:
+    from motores.buscador_auto_graficos import POOL_NAVEGADORES
+    indice=cargar_indice(a.sitios)
+    if not indice.total_metodos:
+        log("ERROR", f"No encontré {a.sitios} o está vacío."); return 2
+    cola=Cola(a.cola, a.intentos); escaner, historial = _escaner(a, indice)
+    bd=None if a.sin_bd else AlmacenResultados(a.bd)
+    nombre=a.id or nombre_trabajador()
+    try:
+        stats=asyncio.run(trabajar(cola, indice, escaner, nombre, a.tanda, a.plazo, a.shard, a.esperar, bd))
+    except KeyboardInterrupt:
+        log("COLA", "Interrumpido; lo prestado vuelve a la cola al vencer el plazo."); return 130
+    finally:
+        POOL_NAVEGADORES.cerrar(); historial.guardar(); cola.cerrar()
+        if bd: bd.cerrar()
+    log("COLA", f"{nombre}: {stats['tareas']} tarea(s) de {stats['usuarios']} usuario(s), {stats['fallidas']} devuelta(s).")
+    return 0
+
+def _imprimir_estado(cola:Cola)->None:
+    e=cola.estado(); total=sum(e.values())
+    print(f"{total} tarea(s): " + ", ".join(f"{k} {v}" for k,v in e.items()))
+    for shard, hechas, n in cola.por_shard(): print(f"  shard {shard:3d}: {hechas}/{n}")
+    for u, s, err in cola.fallidas(): print(f"  fallida: {u} · {s} · {err}")
+
+def _local(a:argparse.Namespace)->int:
+    """Coordinador y `trabajadores` procesos en esta máquina (spawn: mismo arranque que en otra máquina)."""
+    from motores.lote import avisar_recrear, leer_usuarios
+    indice=cargar_indice(a.sitios); avisar_recrear(indice)
+    cola=Cola(a.cola, a.intentos)
+    n=cola.encolar(leer_usuarios(a.usuarios), [s.nombre for s in indice], a.shards)
+    log("COLA", f"{n} tarea(s) nuevas; {a.trabajadores} trabajador(es).")
+    ctx=multiprocessing.get_context("spawn")
+    procs=[ctx.Process(target=_proceso_trabajador, args=(vars(a) | {"id": f"{nombre_trabajador()}#{i}", "esperar": False},))
+           for i in range(max(1,a.trabajadores))]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    _imprimir_estado(cola); cola.cerrar()
+    return 0
+
+def _proceso_trabajador(opciones:Dict[str,Any])->None:
+    sys.exit(_trabajador(argparse.Namespace(**opciones)))
+
+def main(argv:Optional[List[str]]=None)->int:
+    from motores import limitador
+    from motores.escaner import ESCANEO_CONCURRENCIA, ESCANEO_POR_HOST, ESCANEO_NAVEGADORES, ESCANEO_TIMEOUT
+    ap=argparse.ArgumentParser(prog="python3 -m motores.cola", description="Escaneo repartido con una cola en SQLite.")
+    ap.add_argument("--cola", default=COLA_RUTA, metavar="RUTA", help=f"archivo de la cola (por defecto {COLA_RUTA})")
+    ap.add_argument("--sitios", default="sitios.json")
+    ap.add_argument("--intentos", type=int, default=COLA_MAX_INTENTOS, help="intentos antes de dar una tarea por fallida")
+    sub=ap.add_subparsers(dest="orden", required=True)
+    p=sub.add_parser("encolar", help="crear las tareas usuario × sitio")
+    p.add_argument("usuarios", help="archivo con un usuario/correo por línea, o '-' para stdin")
+    p.add_argument("--shards", type=int, default=COLA_SHARDS)
+    sub.add_parser("estado", help="tareas por estado y por shard")
+    sub.add_parser("reintentar", help="devolver las fallidas a la cola")
+    p=sub.add_parser("exportar", help="resultados de las tareas hechas a JSON Lines"); p.add_argument("salida")
+    for nombre, ayuda in (("trabajar", "tomar tareas hasta vaciar la cola"), ("local", "encolar y correr varios trabajadores aquí")):
+        p=sub.add_parser(nombre, help=ayuda)
+        if nombre=="local":
+            p.add_argument("usuarios"); p.add_argument("--shards", type=int, default=COLA_SHARDS)
+            p.add_argument("--trabajadores", type=int, default=max(1, (os.cpu_count() or 2)//2))
+        else:
+            p.add_argument("--id", help="nombre del trabajador (por defecto host:pid)")
+            p.add_argument("--esperar", action="store_true", help="no salir cuando la cola se vacía")
+        p.add_argument("--shard", type=int, help="solo tareas de este shard")
+        p.add_argument("--tanda", type=int, default=COLA_TANDA, help="usuarios por préstamo")
+        p.add_argument("--plazo", type=float, default=COLA_PLAZO_S, help="segundos antes de devolver lo prestado a la cola")
+        p.add_argument("--navegador", action="store_true", help="usar navegador real donde haga falta")
+        p.add_argument("--headless", action="store_true", help="navegador sin ventana aunque haya GUI")
+        p.add_argument("--completo", action="store_true", help="cargar imágenes, fuentes y vídeo en el navegador (por defecto no)")
+        p.add_argument("--concurrencia", type=int, default=ESCANEO_CONCURRENCIA)
+        p.add_argument("--por-host", type=int, default=ESCANEO_POR_HOST)
+        p.add_argument("--navegadores", type=int, default=ESCANEO_NAVEGADORES)
+        p.add_argument("--timeout", type=float, default=ESCANEO_TIMEOUT)
+        p.add_argument("--streaming", action="store_true")
+        p.add_argument("--todos", action="store_true", help="evaluar todos los métodos aunque el sitio ya esté decidido")
+        p.add_argument("--procesos", type=int, default=0, help="pool de CPU por trabajador (por defecto 0: ya hay varios trabajadores)")
+        p.add_argument("--rps", type=float, default=limitador.LIMITE_RPS, help="peticiones/seg. por host y trabajador (0 = sin límite)")
+        p.add_argument("--sin-cache", action="store_true", help="no leer ni escribir la caché de respuestas en disco")
+        p.add_argument("--bd", default=RESULTADOS_RUTA, metavar="RUTA", help=f"base de resultados (por defecto {RESULTADOS_RUTA})")
+        p.add_argument("--sin-bd", action="store_true", help="no guardar los resultados en la base (solo en la cola)")
+    a=ap.parse_args(argv)
+
+    if a.orden=="trabajar": return _trabajador(a)
+    if a.orden=="local": return _local(a)
+    cola=Cola(a.cola, a.intentos)
+    try:
+        if a.orden=="encolar":
+            from motores.lote import avisar_recrear, leer_usuarios
+            indice=cargar_indice(a.sitios)
+            if not indice.total_metodos:
+                log("ERROR", f"No encontré {a.sitios} o está vacío."); return 2
+            avisar_recrear(indice)
+            n=cola.encolar(leer_usuarios(a.usuarios), [s.nombre for s in indice], a.shards)
+            log("COLA", f"{n} tarea(s) nuevas en {a.cola} ({len(indice)} sitio(s), {a.shards} shard(s)).")
+        elif a.orden=="estado":
+            _imprimir_estado(cola)
+        elif a.orden=="reintentar":
+            log("COLA", f"{cola.reintentar()} tarea(s) de vuelta a la cola.")
+        elif a.orden=="exportar":
+            n=0
+            with open(a.salida, "w", encoding="utf-8") as f:
+                for r in cola.resultados(): f.write(r+"\n"); n+=1
+            log("COLA", f"{n} fila(s) en {a.salida}.")
+        return 0
+    finally:
+        cola.cerrar()
+
+if __name__=="__main__": sys.exit(main())
@@ -2,24 +2,27 @@
 """
 Creador de sitios – Ojo de Zeus 2 (DUAL DRIVER)
 – Entrada por terminal (con ejemplos claros).
-– Navegador real si hay GUI: intenta Firefox → si falla, usa Chromium (fallback).
-– HTTP solo si no hay GUI.
+– Navegador real: intenta Firefox → si falla, usa Chromium (fallback); sin GUI, sin ventana (headless).
+– HTTP solo si no hay Selenium ni navegador.
 – Espera carga completa + estabiliza URL (evita falsos por SPA/redirect).
 – Tolerante a fallos; no se cierra.
+– Evalúa los usuarios reales y falsos en paralelo (con límite de cortesía por host).
 – Recolecta TODOS los resultados (outcomes) por método para reales y falsos.
-– Quita resultados que aparecen en ambos lados.
+– Marca cada método con "modo_fetch": "http" si sin el navegador da los mismos outcomes (el buscador
+  no abrirá el navegador para él), "navegador" si el DOM real cambia el resultado.
+– Outcomes normalizados (URL final con {user}, huella del DOM; ver motores/huellas.py).
+– Quita resultados que aparecen en ambos lados (huellas del DOM: también las casi iguales).
 – Muestra TODOS los métodos (Verde=BUENO, Rojo=MALO) con mini explicación.
 – Eliges cuáles guardar (incluye rojos si quieres probar).
 """
 
 import os
-import re
-import json
 import time
 import random
-import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional, Tuple, Set
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 # ===================== Colores y estilos =====================
 try:
@@ -41,20 +44,22 @@ def log_exc(prefix: str, e: Exception):
     print(f"{RED}[ERROR]{RESET} {prefix}: {e}", flush=True)
 
 # ===================== HTTP backend =====================
-HTTP_BACKEND = "httpx"
-try:
-    import httpx
-except Exception:
-    HTTP_BACKEND = "requests"
-    import requests  # type: ignore
+# Cliente único con pool/keep-alive compartido con el buscador (motores/red.py)
+from motores.red import Respuesta, cliente_compartido
+from motores import cache_disco, procesos
+from motores.navegadores import PoolNavegadores, hay_pantalla, opciones_chromium, opciones_firefox, preparar, sin_ventana
+from motores.listo import Regla, esperar_listo, instalar_sonda
+from motores.recursos import aplicar
+from motores.almacen import Almacen
+from motores.planificador import MODO_HTTP, elegir_modo
+from motores.huellas import huella_dom, outcome_url, solape
+from motores.minado import minar
 
 # ===================== Selenium (opcional) – DUAL DRIVER =====================
 SELENIUM_OK = False
 try:
     import shutil
     from selenium import webdriver
-    from selenium.common.exceptions import TimeoutException, WebDriverException
-    from selenium.webdriver.support.ui import WebDriverWait
     SELENIUM_OK = True
 except Exception:
     SELENIUM_OK = False
@@ -80,16 +85,18 @@ def which_any(paths: List[str]) -> Optional[str]:
     return None
 
 def has_display() -> bool:
-    if platform.system().lower() == "linux":
-        return bool(os.environ.get("DISPLAY"))
-    return True
+    return hay_pantalla()
 
 # ===================== Tiempos (exactitud) =====================
 SELENIUM_PAGELOAD_TIMEOUT = 45      # seg. para load del documento
-DOM_READY_MAX_WAIT       = 20       # seg. para document.readyState=="complete"
-URL_STABILIZE_WINDOW_MS  = 900      # ms de estabilidad continua de URL
-URL_STABILIZE_MAX_MS     = 12000    # ms totales para estabilizar
-POST_LOAD_SETTLE_MS      = 700      # ms extra para que termine de pintar la SPA
+# Página lista = red, DOM y URL quietos (motores/listo.py); más margen que el buscador:
+# aquí se aprenden los outcomes y una SPA a medio pintar los estropearía
+REGLA_LISTO = Regla(quieto_ms=600, max_ms=12000)
+
+# ===================== Paralelismo (usuarios de muestra) =====================
+CREADOR_TRABAJADORES     = 10       # usuarios reales/falsos evaluados a la vez
+CREADOR_POR_HOST         = 5        # cortesía: evaluaciones simultáneas contra el host del sitio
+CREADOR_NAVEGADORES      = 3        # ventanas de navegador real a la vez
 
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125 Safari/537.36",
@@ -139,7 +146,8 @@ class EvalRes:
     content_markers: Dict[str, Any] = field(default_factory=dict)
 
 # ===================== HTTP =====================
-def fetch_http(url: str, timeout: float = 18.0, follow_redirects: bool = True) -> Resp:
+def fetch_http(url: str, timeout: float = 18.0, follow_redirects: bool = True, forzar: bool = False) -> Resp:
+    """Usa la caché en disco (motores/cache_disco.py) salvo `forzar=True`."""
     t0 = int(time.time() * 1000)
     headers = {
         "User-Agent": rand_ua(),
@@ -150,21 +158,20 @@ def fetch_http(url: str, timeout: float = 18.0, follow_redirects: bool = True) -
     }
     final_url = url; status = 0; resp_headers: Dict[str, str] = {}; text = ""; is_json = False; jobj = None
     try:
-        if HTTP_BACKEND == "httpx":
-            with httpx.Client(headers=headers, follow_redirects=follow_redirects, timeout=timeout, verify=True) as c:
-                r = c.get(url)
-                final_url = str(r.url); status = r.status_code
-                resp_headers = {k.lower(): v for k, v in r.headers.items()}
-                text = r.text or ""
+        ent = cache_disco.leer(url, forzar=forzar) if follow_redirects else None
+        if ent is not None:
+            r = Respuesta(ent.final_url, ent.status, ent.headers, ent.text)
         else:
-            r = requests.get(url, headers=headers, allow_redirects=follow_redirects, timeout=timeout)
-            final_url = r.url; status = r.status_code
-            resp_headers = {k.lower(): v for k, v in r.headers.items()}
-            text = r.text or ""
+            r = cliente_compartido().get(url, headers, timeout, follow_redirects)
+        final_url = r.final_url; status = r.status
+        resp_headers = r.headers
+        text = r.text
         ct = resp_headers.get("content-type","").split(";")[0].strip().lower()
         if ct in JSON_CT:
             ok, obj = safe_json(text)
             is_json = ok; jobj = obj
+        if ent is None and follow_redirects:
+            cache_disco.escribir(url, "http", final_url, status, resp_headers, text)
     except Exception as e:
         text = f"[HTTP_ERROR] {e}"; status = -1
         log_exc("fetch_http", e)
@@ -172,30 +179,10 @@ def fetch_http(url: str, timeout: float = 18.0, follow_redirects: bool = True) -
     return Resp(url, final_url, status, resp_headers, text, is_json, jobj, "http", took)
 
 # ===================== Selenium helpers =====================
-def _wait_dom_complete(driver, max_wait_s: int) -> None:
-    WebDriverWait(driver, max_wait_s).until(
-        lambda d: d.execute_script("return document.readyState") == "complete"
-    )
-
-def _stabilize_url(driver, window_ms: int, max_ms: int) -> str:
-    start = time.time() * 1000
-    last = driver.current_url
-    estable_desde = start
-    while True:
-        time.sleep(0.15)
-        cur = driver.current_url
-        ahora = time.time() * 1000
-        if cur != last:
-            last = cur
-            estable_desde = ahora
-        if (ahora - estable_desde) >= window_ms:
-            return cur
-        if (ahora - start) >= max_ms:
-            return cur
-
 # Devuelve (driver_name, driver_instance) o (None, None)
 def get_webdriver() -> Tuple[Optional[str], Optional["webdriver.Remote"]]:
-    if not (SELENIUM_OK and has_display()):
+    # Sin pantalla arranca sin ventana (headless); opciones comunes en motores/navegadores.py
+    if not SELENIUM_OK:
         return (None, None)
     # 1) Firefox explícito
     try:
@@ -204,12 +191,12 @@ def get_webdriver() -> Tuple[Optional[str], Optional["webdriver.Remote"]]:
         gecko = which_any(DEFAULT_PATHS["geckodriver"])
         fxbin = which_any(DEFAULT_PATHS["firefox"])
         if gecko and fxbin:
-            opts = FxOptions()
-            # Ventana real si hay DISPLAY (no headless)
+            opts = opciones_firefox(FxOptions())
             opts.binary_location = fxbin
             svc = FxService(executable_path=gecko)
             drv = webdriver.Firefox(service=svc, options=opts)
-            log("NAVEGADOR", f"Usando Firefox real → {fxbin} + {gecko}")
+            preparar("firefox", drv)
+            log("NAVEGADOR", f"Usando Firefox real{' (sin ventana)' if sin_ventana() else ''} → {fxbin} + {gecko}")
             return ("firefox", drv)
     except Exception as e:
         log("AVISO", f"Firefox no disponible ({e}). Probando Chromium…")
@@ -221,56 +208,61 @@ def get_webdriver() -> Tuple[Optional[str], Optional["webdriver.Remote"]]:
         chd = which_any(DEFAULT_PATHS["chromedriver"])
         chbin = which_any(DEFAULT_PATHS["chromium"])
         if chd and chbin:
-            opts = ChOptions()
+            opts = opciones_chromium(ChOptions())
             opts.binary_location = chbin
             svc = ChService(executable_path=chd)
             drv = webdriver.Chrome(service=svc, options=opts)
-            log("NAVEGADOR", f"Usando Chromium real → {chbin} + {chd}")
+            preparar("chromium", drv)
+            log("NAVEGADOR", f"Usando Chromium real{' (sin ventana)' if sin_ventana() else ''} → {chbin} + {chd}")
             return ("chromium", drv)
     except Exception as e:
         log("AVISO", f"Chromium no disponible ({e}).")
 
     return (None, None)
 
-def selenium_fetch(url: str) -> Optional[Resp]:
-    """Abre navegador real (Firefox o Chromium). Si no hay, retorna None."""
-    name, drv = get_webdriver()
-    if not drv:
-        return None
-    try:
-        print(f"{MAG}{BOLD}→ Abriendo navegador real ({name}) para: {url}{RESET}")
+# Navegadores reutilizables (se arrancan una vez; ver motores/navegadores.py)
+POOL_NAVEGADORES = PoolNavegadores(lambda: get_webdriver(), CREADOR_NAVEGADORES)
+
+def selenium_fetch(url: str, forzar: bool = False) -> Optional[Resp]:
+    """Usa un navegador real del pool (Firefox o Chromium). Si no hay, retorna None."""
+    ent = cache_disco.leer(url, cache_disco.MODOS_NAVEGADOR, forzar)
+    if ent is not None:
+        log("CACHE", f"{ent.modo} (guardada) para: {url}")
+        return Resp(url=url, final_url=ent.final_url, status=ent.status,
+                    headers=ent.headers, text=ent.text, is_json=False,
+                    json_obj=None, via=ent.modo, took_ms=0)
+    with POOL_NAVEGADORES.usar() as inst:
+        if inst is None:
+            return None
+        name, drv = inst.nombre, inst.driver
         try:
-            # Tiempo de carga y estabilización
-            drv.set_page_load_timeout(SELENIUM_PAGELOAD_TIMEOUT)
-        except Exception:
-            pass
-        t0 = int(time.time() * 1000)
-
-        drv.get(url)
-        # Espera DOM completo (sin bloquear infinito)
-        try:
-            _wait_dom_complete(drv, DOM_READY_MAX_WAIT)
-        except Exception:
-            log("AVISO", "La página no llegó a 'complete' a tiempo. Continuamos para capturar estado final.")
-
-        # Estabiliza URL (importante para detectar perfiles inexistentes)
-        final_estable = _stabilize_url(drv, URL_STABILIZE_WINDOW_MS, URL_STABILIZE_MAX_MS)
-        time.sleep(POST_LOAD_SETTLE_MS / 1000.0)
-
-        html = drv.page_source or ""
-        took = int(time.time() * 1000) - t0
-
-        return Resp(url=url, final_url=final_estable, status=200,
-                    headers={"via": name}, text=html, is_json=False,
-                    json_obj=None, via=name, took_ms=took)
-    except Exception as e:
-        log_exc("selenium_fetch", e)
-        return None
-    finally:
-        try:
-            drv.quit()
-        except Exception:
-            pass
+            print(f"{MAG}{BOLD}→ Navegador real ({name}) para: {url}{RESET}")
+            try:
+                # Tiempo de carga y estabilización
+                drv.set_page_load_timeout(SELENIUM_PAGELOAD_TIMEOUT)
+            except Exception:
+                pass
+            instalar_sonda(drv, name)
+            # misma política de recursos que el buscador por defecto (sin imágenes, fuentes, vídeo ni rastreadores)
+            aplicar(drv, name, url)
+            t0 = int(time.time() * 1000)
+
+            drv.get(url)
+            # Espera a que red, DOM y URL se queden quietos (importante para detectar perfiles inexistentes)
+            final_estable, listo = esperar_listo(drv, REGLA_LISTO)
+            if not listo:
+                log("AVISO", "La página no terminó de asentarse a tiempo. Continuamos para capturar estado final.")
+
+            html = drv.page_source or ""
+            took = int(time.time() * 1000) - t0
+            cache_disco.escribir(url, name, final_estable, 200, {"via": name}, html)
+
+            return Resp(url=url, final_url=final_estable, status=200,
+                        headers={"via": name}, text=html, is_json=False,
+                        json_obj=None, via=name, took_ms=took)
+        except Exception as e:
+            log_exc("selenium_fetch", e)
+            return None
 
 # ===================== Detección básica =====================
 def detect_captcha(text: str) -> bool:
@@ -294,14 +286,18 @@ def _content_text_from_eval(e: EvalRes) -> str:
 def method_outcome_signature(metodo: str, params: Dict[str, Any], e: EvalRes) -> Optional[str]:
     """
     Devuelve un texto corto con el “resultado” observado para ese método/usuario.
-    Eso se guarda y luego el Buscador decide por coincidencia exacta.
+    Eso se guarda y luego el Buscador decide por coincidencia (URL con el usuario como {user},
+    huellas del DOM a pocos bits; ver motores/huellas.py).
     """
     try:
         if metodo == "status_code":
             return f"status={e.resp_http.status}"
 
         elif metodo in ("url_check", "redirect_check"):
-            return f"final_url={_final_url_from_eval(e)}"
+            return outcome_url(_final_url_from_eval(e), e.usuario)
+
+        elif metodo == "huella_dom":
+            return huella_dom(_content_text_from_eval(e))
 
         elif metodo == "status_code_y_texto":
             code = params.get("codigo")
@@ -340,31 +336,6 @@ def method_outcome_signature(metodo: str, params: Dict[str, Any], e: EvalRes) ->
         return None
     return None
 
-# ===================== Text mining auxiliar =====================
-def extract_words(text: str, min_len: int = 4, max_words: int = 80) -> List[str]:
-    text = re.sub(r"<[^>]+>", " ", text)
-    tokens = re.findall(r"[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ0-9_]{%d,}" % min_len, text)
-    freq: Dict[str,int] = {}
-    for w in tokens:
-        wl = w.lower()
-        freq[wl] = freq.get(wl, 0) + 1
-    top = sorted(freq.items(), key=lambda kv: (-kv[1], kv[0]))[:max_words]
-    return [w for w,_ in top]
-
-def common_intersection(list_of_lists: List[List[str]]) -> List[str]:
-    if not list_of_lists: return []
-    inter = set(list_of_lists[0])
-    for lst in list_of_lists[1:]:
-        inter &= set(lst)
-    return list(inter)
-
-def stable_contains(all_texts: List[str]) -> List[str]:
-    bags = [extract_words(t) for t in all_texts]
-    inter = common_intersection(bags)
-    basura = {"home","login","about","contact","cookies","terms","policy","help","explore","search"}
-    inter = [w for w in inter if w not in basura]
-    return sorted(inter)[:30]
-
 # ===================== Plantillas de métodos =====================
 def derive_method_templates(site_name: str,
                             url_base: str,
@@ -383,21 +354,24 @@ def derive_method_templates(site_name: str,
     methods.append({"nombre": site_name, "url_base": url_base, "metodo": "redirect_check",
                     "parametros": {}, "evidencia": {"nota": "Detecta diferencia de destino final."}})
 
-    # 3) html_contains / status_code_y_texto — claves del DOM real
+    # 2b) huella_dom — esqueleto de etiquetas del HTML (perfil y "no encontrado" suelen usar plantillas distintas)
+    if any(not e.resp_http.is_json and _content_text_from_eval(e) for e in reales + falsos):
+        methods.append({"nombre": site_name, "url_base": url_base, "metodo": "huella_dom",
+                        "parametros": {}, "evidencia": {"nota": "Compara la estructura del HTML, no su texto."}})
+
+    # 3) html_contains / status_code_y_texto — claves del DOM real (motores/minado.py; ya en orden de puntuación)
     real_texts = [_content_text_from_eval(e) for e in reales]
     fake_texts = [_content_text_from_eval(e) for e in falsos]
-    real_stable = set(stable_contains(real_texts))
-    fake_stable = set(stable_contains(fake_texts))
-    html_keys = list(real_stable - fake_stable)
+    html_keys = minar(real_texts, fake_texts, excluir=[e.usuario for e in reales + falsos])
     if html_keys:
         methods.append({"nombre": site_name, "url_base": url_base, "metodo": "html_contains",
-                        "parametros": {"claves": sorted(html_keys)[:25]},
-                        "evidencia": {"claves": sorted(html_keys)[:25]}})
+                        "parametros": {"claves": html_keys},
+                        "evidencia": {"claves": html_keys}})
         real_codes = [e.resp_http.status for e in reales]
         if real_codes:
             code = max(set(real_codes), key=real_codes.count)
             methods.append({"nombre": site_name, "url_base": url_base, "metodo": "status_code_y_texto",
-                            "parametros": {"codigo": code, "debe_contener": sorted(html_keys)[:10]},
+                            "parametros": {"codigo": code, "debe_contener": html_keys},
                             "evidencia": {"codigo": code}})
 
     # 4) json_response_check — si hubo JSON
@@ -438,31 +412,35 @@ def derive_method_templates(site_name: str,
     return methods
 
 # ===================== Outcomes por método =====================
+def _sin_texto(e: EvalRes) -> EvalRes:
+    """Copia ligera para el pool de procesos: el contenido viaja aparte (memoria compartida)."""
+    sel = replace(e.resp_sel, text="") if e.resp_sel else None
+    return EvalRes(e.usuario, replace(e.resp_http, text=""), sel, e.content_markers)
+
+def _firmas_evaluacion(texto: str, e: EvalRes, plantillas: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[str]]:
+    """Firmas de todas las plantillas para una evaluación; `texto` es su contenido (_content_text_from_eval)."""
+    e = EvalRes(e.usuario, replace(e.resp_http, text=texto), e.resp_sel, e.content_markers)
+    return [method_outcome_signature(metodo, params, e) for metodo, params in plantillas]
+
+def outcomes_por_plantilla(templates: List[Dict[str, Any]],
+                           reales: List[EvalRes],
+                           falsos: List[EvalRes]) -> List[Tuple[Set[str], Set[str]]]:
+    """(outcomes reales, falsos) de cada plantilla; cada evaluación se firma de una vez (pool si hay textos grandes)."""
+    plantillas = [(m.get("metodo", "?"), m.get("parametros", {})) for m in templates]
+    evals = list(reales) + list(falsos)
+    firmas = procesos.mapear(_firmas_evaluacion, [_content_text_from_eval(e) for e in evals], plantillas,
+                             por_texto=[(_sin_texto(e),) for e in evals])
+    out: List[Tuple[Set[str], Set[str]]] = []
+    for j in range(len(plantillas)):
+        real_out = {f[j] for f in firmas[:len(reales)] if f[j] is not None}
+        fake_out = {f[j] for f in firmas[len(reales):] if f[j] is not None}
+        out.append((real_out, fake_out))
+    return out
+
 def compute_outcomes_for_method(m: Dict[str, Any],
                                 reales: List[EvalRes],
                                 falsos: List[EvalRes]) -> Tuple[Set[str], Set[str]]:
-    metodo = m.get("metodo","?")
-    params = m.get("parametros",{})
-    real_out: Set[str] = set()
-    fake_out: Set[str] = set()
-
-    for e in reales:
-        try:
-            sig = method_outcome_signature(metodo, params, e)
-            if sig is not None:
-                real_out.add(sig)
-        except Exception as ex:
-            log_exc(f"compute_outcomes(real,{metodo})", ex)
-
-    for e in falsos:
-        try:
-            sig = method_outcome_signature(metodo, params, e)
-            if sig is not None:
-                fake_out.add(sig)
-        except Exception as ex:
-            log_exc(f"compute_outcomes(fake,{metodo})", ex)
-
-    return real_out, fake_out
+    return outcomes_por_plantilla([m], reales, falsos)[0]
 
 def build_methods_with_outcomes(site_name: str,
                                 url_base: str,
@@ -470,9 +448,18 @@ def build_methods_with_outcomes(site_name: str,
                                 reales: List[EvalRes],
                                 falsos: List[EvalRes]) -> List[Dict[str, Any]]:
     enriched: List[Dict[str, Any]] = []
-    for m in templates:
-        ro, fo = compute_outcomes_for_method(m, reales, falsos)
-        inter = ro & fo
+    hubo_navegador = any(e.resp_sel is not None for e in reales + falsos)
+    # mismas evaluaciones sin el navegador: si dan los mismos outcomes, el método va por HTTP al buscar
+    reales_http = [EvalRes(e.usuario, e.resp_http, None, e.content_markers) for e in reales]
+    falsos_http = [EvalRes(e.usuario, e.resp_http, None, e.content_markers) for e in falsos]
+    con_nav = outcomes_por_plantilla(templates, reales, falsos)
+    solo_http = outcomes_por_plantilla(templates, reales_http, falsos_http) if hubo_navegador else con_nav
+    for m, (ro, fo), (ro_h, fo_h) in zip(templates, con_nav, solo_http):
+        modo = elegir_modo(m.get("metodo", ""), (ro, fo), (ro_h, fo_h), hubo_navegador)
+        http_iguales = (ro, fo) == (ro_h, fo_h)
+        if modo == MODO_HTTP:
+            ro, fo = ro_h, fo_h
+        inter = solape(ro, fo)
         ro_clean = sorted(list(ro - inter))
         fo_clean = sorted(list(fo - inter))
         status = "GOOD" if (ro_clean or fo_clean) else "BAD"
@@ -498,7 +485,8 @@ def build_methods_with_outcomes(site_name: str,
             "outcomes_fake": fo_clean,
             "outcomes_overlap": sorted(list(inter)),
             "status": status,
-            "razon": razon
+            "razon": razon,
+            "modo_fetch": modo
         }
         # Métricas simples
         m2.setdefault("evidencia", {})
@@ -506,35 +494,30 @@ def build_methods_with_outcomes(site_name: str,
             "real_outcomes_count": len(ro_clean),
             "fake_outcomes_count": len(fo_clean),
             "overlap_count": len(inter),
+            "outcomes_http_iguales": http_iguales,
         })
         enriched.append(m2)
     return enriched
 
 # ===================== sitios.json helpers =====================
+# Lectura/escritura a través del almacén (sitios.json + registro append-only, ver motores/almacen.py)
 def load_sitios(path: str = "sitios.json") -> List[Dict[str, Any]]:
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            d = json.load(f)
-            if isinstance(d, list): return d
+        return Almacen(path).leer()
     except Exception as e:
         log_exc("load_sitios", e)
     return []
 
 def save_sitios(items: List[Dict[str, Any]], path: str = "sitios.json") -> None:
     try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(items, f, indent=4, ensure_ascii=False)
+        Almacen(path).reemplazar(items)
     except Exception as e:
         log_exc("save_sitios", e)
 
 def append_sitios(nuevos: List[Dict[str, Any]], path: str = "sitios.json") -> None:
+    """Añade los métodos con metodo_id nuevos (nunca reutilizados) sin reescribir sitios.json."""
     try:
-        data = load_sitios(path)
-        base = len(data)
-        for i, m in enumerate(nuevos, start=1):
-            m["metodo_id"] = base + i
-        data.extend(nuevos)
-        save_sitios(data, path)
+        Almacen(path).agregar(nuevos)
     except Exception as e:
         log_exc("append_sitios", e)
 
@@ -594,11 +577,11 @@ def prompt_select_methods(methods: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     return elegidos
 
 # ===================== Evaluación de usuarios =====================
-def evaluate_user(url_base: str, usuario: str, use_browser: bool) -> Optional[EvalRes]:
+def evaluate_user(url_base: str, usuario: str, use_browser: bool, fresco: bool = False) -> Optional[EvalRes]:
     try:
         url = url_base.replace("{user}", usuario).replace("{usuario}", usuario)
-        r_sel = selenium_fetch(url) if use_browser else None
-        r_http = fetch_http(url)
+        r_sel = selenium_fetch(url, forzar=fresco) if use_browser else None
+        r_http = fetch_http(url, forzar=fresco)
         content = r_sel.text if (r_sel and len(r_sel.text) > len(r_http.text)) else r_http.text
         markers = {
             "captcha": detect_captcha(content),
@@ -614,39 +597,51 @@ def evaluate_user(url_base: str, usuario: str, use_browser: bool) -> Optional[Ev
         log_exc(f"evaluate_user({usuario})", e)
         return None
 
-# ===================== Núcleo principal =====================
-def ejecutar_core(site_name: str,
-                  url_base: str,
-                  reales_users: List[str],
-                  falsos_users: List[str],
-                  palabras_usuario: List[str],
-                  use_browser: bool) -> str:
-    log("INFO", "Haciendo pruebas con usuarios reales…")
-    eval_reales: List[EvalRes] = []
-    eval_falsos: List[EvalRes] = []
+def evaluate_users(url_base: str,
+                   reales_users: List[str],
+                   falsos_users: List[str],
+                   use_browser: bool,
+                   fresco: bool = False) -> Tuple[List[EvalRes], List[EvalRes]]:
+    """
+    Evalúa TODOS los usuarios de muestra a la vez (pool de hilos) y devuelve (reales, falsos)
+    en el orden en que se escribieron. Los omitidos (fallo) no aparecen.
+    """
+    # todos van al mismo host (url_base): este semáforo es el límite de cortesía con el sitio
+    cortesia = threading.BoundedSemaphore(CREADOR_POR_HOST)
 
-    for u in reales_users:
+    def _evaluar(tipo: str, u: str) -> Optional[EvalRes]:
         try:
-            log("REAL", f"Evaluando {u}")
-            e = evaluate_user(url_base, u, use_browser)
-            if e: eval_reales.append(e)
-            else: log("AVISO", f"No se pudo evaluar {u} (omitido).")
+            with cortesia:
+                log(tipo, f"Evaluando {u}")
+                e = evaluate_user(url_base, u, use_browser, fresco)
+            if not e: log("AVISO", f"No se pudo evaluar {u} (omitido).")
+            return e
         except Exception as ex:
-            log_exc(f"eval_real({u})", ex)
-        time.sleep(0.3)
+            log_exc(f"eval_{tipo.lower()}({u})", ex)
+            return None
 
-    for u in falsos_users:
-        try:
-            log("FALSO", f"Evaluando {u}")
-            e = evaluate_user(url_base, u, use_browser)
-            if e: eval_falsos.append(e)
-            else: log("AVISO", f"No se pudo evaluar {u} (omitido).")
-        except Exception as ex:
-            log_exc(f"eval_falso({u})", ex)
-        time.sleep(0.3)
+    tareas = [("REAL", u) for u in reales_users] + [("FALSO", u) for u in falsos_users]
+    if not tareas:
+        return [], []
+    with ThreadPoolExecutor(max_workers=min(CREADOR_TRABAJADORES, len(tareas))) as ex:
+        res = list(ex.map(lambda t: _evaluar(*t), tareas))
+    n = len(reales_users)
+    return [e for e in res[:n] if e], [e for e in res[n:] if e]
+
+# ===================== Núcleo principal =====================
+def generar_metodos(site_name: str,
+                    url_base: str,
+                    reales_users: List[str],
+                    falsos_users: List[str],
+                    palabras_usuario: List[str],
+                    use_browser: bool,
+                    fresco: bool = False) -> Tuple[List[Dict[str, Any]], str]:
+    """Parte no interactiva del creador: evalúa y devuelve (métodos con outcomes, aviso si no hay)."""
+    log("INFO", "Haciendo pruebas con usuarios reales y falsos (en paralelo)…")
+    eval_reales, eval_falsos = evaluate_users(url_base, reales_users, falsos_users, use_browser, fresco)
 
     if not eval_reales:
-        return "⚠️  No se logró evaluar ningún usuario REAL."
+        return [], "⚠️  No se logró evaluar ningún usuario REAL."
 
     log("INFO", "Generando plantillas de métodos…")
     templates = derive_method_templates(site_name, url_base, eval_reales, eval_falsos, palabras_usuario)
@@ -655,7 +650,19 @@ def ejecutar_core(site_name: str,
     methods = build_methods_with_outcomes(site_name, url_base, templates, eval_reales, eval_falsos)
 
     if not methods:
-        return "⚠️  No se generaron métodos."
+        return [], "⚠️  No se generaron métodos."
+    return methods, ""
+
+def ejecutar_core(site_name: str,
+                  url_base: str,
+                  reales_users: List[str],
+                  falsos_users: List[str],
+                  palabras_usuario: List[str],
+                  use_browser: bool,
+                  fresco: bool = False) -> str:
+    methods, aviso = generar_metodos(site_name, url_base, reales_users, falsos_users, palabras_usuario, use_browser, fresco)
+    if not methods:
+        return aviso
 
     seleccion = prompt_select_methods(methods)
     if not seleccion:
@@ -680,6 +687,7 @@ def run_terminal():
     reales_str = input(f"{BOLD}👤 Usuarios REALES (uno o varios, separados por coma): {RESET}").strip()
     falsos_str = input(f"{BOLD}👻 Usuarios FALSOS (uno o varios, separados por coma, Enter para omitir): {RESET}").strip()
     palabras_str = input(f"{BOLD}📝 Palabras clave (opcional, separadas por coma): {RESET}").strip()
+    fresco_str = input(f"{BOLD}♻️  ¿Descargar de nuevo ignorando la caché? (s/N): {RESET}").strip().lower()
 
     # Validaciones amigables
     if "{user}" not in urlb and "{usuario}" not in urlb:
@@ -689,33 +697,36 @@ def run_terminal():
     reales = [u.strip() for u in reales_str.split(",") if u.strip()]
     falsos = [u.strip() for u in falsos_str.split(",") if u.strip()]
     palabras = [p.strip() for p in palabras_str.split(",") if p.strip()]
+    fresco = fresco_str in ("s", "si", "sí", "y", "yes")
 
     if not site or not urlb or not reales:
         print(f"{YELLOW}Faltan datos obligatorios (sitio, URL base y al menos 1 real).{RESET}")
         return
 
-    # Decidir navegador real: DUAL DRIVER (Firefox → Chromium). HTTP si no hay GUI.
-    if has_display() and SELENIUM_OK:
-        drv_name, drv_inst = get_webdriver()
-        if drv_inst:
-            # cerramos de inmediato; solo probamos disponibilidad
-            try: drv_inst.quit()
-            except Exception: pass
+    # Decidir navegador real: DUAL DRIVER (Firefox → Chromium). Sin GUI, sin ventana; HTTP si no hay Selenium.
+    if SELENIUM_OK:
+        # la instancia que arranca aquí queda en el pool y la reutilizan todas las evaluaciones
+        drv_name = POOL_NAVEGADORES.iniciar()
+        if drv_name:
             use_browser = True
-            print(f"{OK} Entorno gráfico con navegador real disponible ({BOLD}{drv_name}{RESET}).")
+            modo = "sin ventana (headless)" if sin_ventana() else "entorno gráfico"
+            print(f"{OK} Navegador real disponible ({BOLD}{drv_name}{RESET}, {modo}).")
         else:
             print(f"{WARN} No se pudo iniciar Firefox ni Chromium. Se usará {BOLD}modo HTTP{RESET}.")
             use_browser = False
     else:
-        print(f"{WARN} No hay entorno gráfico o Selenium no está disponible: se usará {BOLD}modo HTTP{RESET}.")
+        print(f"{WARN} Selenium no está disponible: se usará {BOLD}modo HTTP{RESET}.")
         use_browser = False
 
-    res = ejecutar_core(site, urlb, reales, falsos, palabras, use_browser)
+    try:
+        res = ejecutar_core(site, urlb, reales, falsos, palabras, use_browser, fresco)
+    finally:
+        POOL_NAVEGADORES.cerrar()
     print(res)
 
 # ===================== API =====================
 def ejecutar_creador():
-    print(f"{BOLD}🔧 Creador de sitios (terminal; navegador real DUAL si hay GUI).{RESET}")
+    print(f"{BOLD}🔧 Creador de sitios (terminal; navegador real DUAL, con o sin GUI).{RESET}")
     try:
         run_terminal()
     except KeyboardInterrupt:
@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Escáner concurrente – Ojo de Zeus 2
+– Lanza TODOS los sitios de sitios.json a la vez (asyncio + cliente con pool de motores/red.py).
+– Límite global de peticiones simultáneas y límite por host (no saturar un mismo dominio).
+– Selenium es síncrono: cada página del navegador real corre en un hilo, con su propio límite.
+  Solo se pide para las URLs con algún método en modo "navegador" (motores/planificador.py).
+– Cada URL expandida se descarga UNA vez por escaneo aunque varios métodos la usen.
+– Por sitio, las descargas van en olas de la más decisiva a la menos (motores/puntuacion.py);
+  si el sitio queda decidido (algún No existe), las que faltan no se piden.
+– La decisión por sitio es la misma del buscador (decidir_por_outcome + heurística).
+– Streaming (opcional): lee el cuerpo por trozos y corta en cuanto las firmas de la URL dicen "No existe" en
+  todos sus sitios (PlanLectura); si algún sitio puede acabar en Existe o en la heurística, se lee entero.
+– Procesos (opcional, modo lote): las firmas, la heurística y la extracción de los sitios con cuerpos
+  grandes se deciden en el pool de CPU (motores/procesos.py), con los cuerpos en memoria compartida;
+  el loop solo descarga. Los sitios pequeños se deciden aquí (el viaje costaría más que el trabajo).
+"""
+
+import asyncio, json, time
+from collections import Counter
+from dataclasses import replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from motores.buscador_auto_graficos import (
+    JSON_CT, PlanLectura, Resp, ResultadoSitio, rand_ua, selenium_fetch,
+    agrupar_por_url, evaluar_respuestas, resultado_metodo, decidir_sitio,
+)
+from motores.coincidencias import BuscadorClaves
+from motores.indice import MetodoCompilado, SitioCompilado
+from motores.red import ClienteHTTPAsync, Respuesta, Seguir
+from motores import cache_disco, metricas
+from motores.listo import regla_de
+from motores.recursos import politica_de
+from motores.planificador import MODO_HTTP, MODO_NAVEGADOR, necesita_navegador
+from motores.procesos import PROCESOS_MIN_BYTES, Memoria, PoolCPU, Texto, leer
+from motores.puntuacion import Historial, Unidad, anotar_sitio, decidido, olas, omitir, unidades
+
+# ===== Límites (ajustables) =====
+ESCANEO_CONCURRENCIA=64      # peticiones HTTP simultáneas en total
+ESCANEO_POR_HOST=4           # peticiones simultáneas contra un mismo host
+ESCANEO_NAVEGADORES=2        # páginas de navegador real simultáneas
+ESCANEO_TIMEOUT=16.0         # seg. por petición HTTP (igual que fetch_http)
+ESCANEO_STREAMING=False      # cortar la lectura del cuerpo cuando ya no cambia ninguna firma
+ESCANEO_MAX_CUERPO=2*1024*1024   # bytes máximos por cuerpo en modo streaming
+
+# (r_http, claves ya buscadas durante la lectura en streaming o None)
+Descarga = Tuple[Resp, Optional[BuscadorClaves]]
+Evaluacion = Tuple[str, Dict[str,Any], Resp, Optional[Resp]]
+
+async def fetch_http_async(client:ClienteHTTPAsync, url:str, timeout:float=ESCANEO_TIMEOUT, follow_redirects:bool=True,
+                           max_bytes:Optional[int]=None, seguir:Optional[Seguir]=None, forzar:bool=False)->Resp:
+    """Versión asíncrona de fetch_http: mismos headers, mismo Resp, mismos errores ([HTTP_ERROR], status=-1)."""
+    t0=int(time.time()*1000)
+    headers={"User-Agent":rand_ua(),"Accept":"*/*","Accept-Language":"es-MX,es;q=0.9,en;q=0.8","Cache-Control":"no-cache","Pragma":"no-cache"}
+    final_url=url; status=0; resp_headers={}; text=""; is_json=False; jobj=None; truncado=False
+    try:
+        # SQLite y zlib bloquean: fuera del loop
+        ent=await asyncio.to_thread(cache_disco.leer, url, ("http",), forzar) if follow_redirects else None
+        if ent is not None:
+            r=Respuesta(ent.final_url, ent.status, ent.headers, ent.text)
+            if seguir and seguir(r.status, None): seguir(r.status, r.text)
+        elif max_bytes or seguir: r=await client.get_stream(url, headers, timeout, follow_redirects, max_bytes, seguir)
+        else: r=await client.get(url, headers, timeout, follow_redirects)
+        final_url=r.final_url; status=r.status; resp_headers=r.headers; text=r.text; truncado=r.truncado
+        ct=resp_headers.get("content-type","").split(";")[0].strip().lower()
+        if ct in JSON_CT and not truncado:
+            try: jobj=json.loads(text); is_json=True
+            except Exception: is_json=False
+        if ent is None and follow_redirects:
+            await asyncio.to_thread(cache_disco.escribir, url, "http", final_url, status, resp_headers, text, truncado)
+    except Exception as e:
+        text=f"[HTTP_ERROR] {e}"; status=-1
+        if metricas.es_timeout(e): metricas.anotar("timeout", time.time()-t0/1000)
+    took=int(time.time()*1000)-t0
+    metricas.anotar("http.total", took/1000)
+    return Resp(url, final_url, status, resp_headers, text, is_json, jobj, "http", took, truncado)
+
+class Escaner:
+    def __init__(self, use_browser:bool=False, concurrencia:int=ESCANEO_CONCURRENCIA, por_host:int=ESCANEO_POR_HOST,
+                 navegadores:int=ESCANEO_NAVEGADORES, timeout:float=ESCANEO_TIMEOUT,
+                 streaming:bool=ESCANEO_STREAMING, max_cuerpo:Optional[int]=ESCANEO_MAX_CUERPO, procesos:int=0,
+                 historial:Optional[Historial]=None, cortocircuito:bool=True):
+        self.use_browser=use_browser; self.concurrencia=max(1,concurrencia); self.por_host=max(1,por_host)
+        self.navegadores=max(1,navegadores); self.timeout=timeout
+        self.streaming=streaming; self.max_cuerpo=max_cuerpo
+        self.procesos=max(0,procesos); self._cpu:Optional[PoolCPU]=None
+        self.historial=historial       # orden de los métodos y, al decidir, lo que se aprende de ellos
+        self.cortocircuito=cortocircuito
+        self._sem_global:Optional[asyncio.Semaphore]=None
+        self._sem_nav:Optional[asyncio.Semaphore]=None
+        self._client:Optional[ClienteHTTPAsync]=None
+        # URL expandida → descarga HTTP / de navegador en curso o terminada, y cuántos sitios la usan todavía
+        self._respuestas:Dict[str,"asyncio.Future[Descarga]"]={}
+        self._navegadas:Dict[str,"asyncio.Future[Optional[Resp]]"]={}
+        self._pendientes:Counter=Counter()
+        self._metodos_url:Dict[str,List[MetodoCompilado]]={}     # métodos de todos los sitios que leen cada URL
+
+    async def _http(self, url:str, plan:Optional[PlanLectura]=None)->Resp:
+        # el tope por host lo aplica el cliente (misma regla que el cliente síncrono compartido)
+        async with self._sem_global:
+            if not self.streaming: return await fetch_http_async(self._client, url, self.timeout)
+            return await fetch_http_async(self._client, url, self.timeout, True, self.max_cuerpo, plan.seguir if plan else None)
+
+    async def _navegador(self, url:str)->Optional[Resp]:
+        metodos=self._metodos_url.get(url, ())
+        regla=regla_de(mc.datos for mc in metodos); politica=politica_de(mc.datos for mc in metodos)
+        async with self._sem_nav:
+            return await asyncio.to_thread(selenium_fetch, url, False, regla, politica)
+
+    def _lee_http(self, url:str)->List[MetodoCompilado]:
+        """Métodos (de todos los sitios) que miran el cuerpo HTTP de `url`: con navegador, solo los "http"."""
+        metodos=self._metodos_url.get(url, [])
+        if self.use_browser and necesita_navegador(metodos): return [mc for mc in metodos if mc.modo==MODO_HTTP]
+        return metodos
+
+    async def _descargar(self, url:str)->Descarga:
+        metodos=self._lee_http(url)
+        plan=PlanLectura(metodos) if (self.streaming and metodos) else None
+        r_http=await self._http(url, plan)
+        return r_http, (plan.hits if plan and r_http.status>=0 else None)
+
+    async def _obtener(self, url:str)->Descarga:
+        """Una sola descarga HTTP por URL aunque la pidan varios sitios (ver _soltar)."""
+        fut=self._respuestas.get(url)
+        if fut is None: fut=self._respuestas[url]=asyncio.ensure_future(self._descargar(url))
+        return await fut
+
+    async def _obtener_nav(self, url:str)->Optional[Resp]:
+        fut=self._navegadas.get(url)
+        if fut is None: fut=self._navegadas[url]=asyncio.ensure_future(self._navegador(url))
+        return await fut
+
+    def _soltar(self, url:str)->None:
+        """Un sitio terminó con `url`: cuando ya no la usa ninguno, sus respuestas salen de memoria."""
+        self._pendientes[url]-=1
+        if self._pendientes[url]<=0:
+            self._respuestas.pop(url, None); self._navegadas.pop(url, None); self._pendientes.pop(url, None)
+
+    async def obtener_respuestas(self, url:str)->Tuple[Resp, Optional[Resp]]:
+        try:
+            r_http, _ = await self._obtener(url)
+            nav=self.use_browser and necesita_navegador(self._metodos_url.get(url, ()))
+            return r_http, (await self._obtener_nav(url) if nav else None)
+        finally:
+            self._soltar(url)
+
+    async def evaluar_metodo(self, mc:MetodoCompilado, usuario:str)->Evaluacion:
+        url=mc.url(usuario)
+        self._metodos_url.setdefault(url, [mc])
+        r_http, r_sel = await self.obtener_respuestas(url)
+        return resultado_metodo(mc, r_http, r_sel if mc.modo==MODO_NAVEGADOR else None)
+
+    async def evaluar_sitio(self, sitio:SitioCompilado, usuario:str)->ResultadoSitio:
+        # las descargas que lance este sitio (tareas e hilos) heredan el contexto y se le apuntan
+        with metricas.en_sitio(sitio.nombre), metricas.etapa("sitio"):
+            return await self._evaluar_sitio(sitio, usuario)
+
+    async def _evaluar_sitio(self, sitio:SitioCompilado, usuario:str)->ResultadoSitio:
+        metodos=sitio.metodos; grupos=agrupar_por_url(metodos, usuario)
+        evaluaciones:List[Any]=[None]*len(metodos)
+        try:
+            for ola in olas(unidades(metodos, grupos, self.use_browser, self.historial)):
+                if self.cortocircuito and decidido(evaluaciones, metodos):
+                    for u in ola: omitir(evaluaciones, u.idxs)
+                    continue
+                await asyncio.gather(*[self._unidad(u, metodos, evaluaciones) for u in ola])
+            res=await self._decidir(sitio, usuario, evaluaciones)
+        finally:
+            for url in grupos: self._soltar(url)
+        anotar_sitio(self.historial, metodos, evaluaciones, res.resultados, res.decision)
+        return res
+
+    async def _unidad(self, u:Unidad, metodos:Tuple[MetodoCompilado,...], evaluaciones:List[Any])->None:
+        ms=[metodos[i] for i in u.idxs]
+        try:
+            r_http, hits = await self._obtener(u.url)
+            r_sel=await self._obtener_nav(u.url) if u.navegador else None
+            evs:List[Any]=await self._firmas(ms, r_http, r_sel, None if u.navegador else hits)
+        except Exception as e:
+            evs=[e]*len(ms)
+        for i, ev in zip(u.idxs, evs): evaluaciones[i]=ev
+
+    # ===== CPU: aquí o en el pool de procesos =====
+    async def _firmas(self, ms:List[MetodoCompilado], r_http:Resp, r_sel:Optional[Resp],
+                      hits:Optional[BuscadorClaves])->List[Evaluacion]:
+        if self._cpu is not None and _bytes([r_http, r_sel])>=PROCESOS_MIN_BYTES:
+            try:
+                with Memoria() as mem:
+                    fut=self._cpu.enviar(_firmas_en_proceso, ms, _a_memoria(mem, r_http), _a_memoria(mem, r_sel),
+                                         hits, metricas.METRICAS_ACTIVAS)
+                    firmas, eventos = await asyncio.wrap_future(fut)
+                metricas.reanotar(eventos)
+                return [(o, meta, r_http, r_sel) for o, meta in firmas]
+            except Exception:
+                pass        # pool roto (trabajador muerto, sin memoria compartida): se hace aquí
+        return evaluar_respuestas(ms, r_http, r_sel, hits)
+
+    async def _decidir(self, sitio:SitioCompilado, usuario:str, evaluaciones:List[Any])->ResultadoSitio:
+        # con un No existe no hay heurística ni extracción: no vale la pena el viaje
+        if self._cpu is not None and not decidido(evaluaciones, sitio.metodos):
+            resps=_respuestas_de(evaluaciones)
+            if _bytes(resps)>=PROCESOS_MIN_BYTES:
+                try: return await self._decidir_en_pool(sitio, usuario, evaluaciones, resps)
+                except Exception:
+                    pass
+        return decidir_sitio(sitio.nombre, usuario, sitio.metodos, evaluaciones)
+
+    async def _decidir_en_pool(self, sitio:SitioCompilado, usuario:str, evaluaciones:List[Any],
+                               resps:List[Resp])->ResultadoSitio:
+        pos={id(r):k for k,r in enumerate(resps)}
+        carga=[(ev[0], ev[1], pos[id(ev[2])], pos[id(ev[3])] if ev[3] is not None else None) if isinstance(ev, tuple)
+               else RuntimeError(str(ev)) if isinstance(ev, BaseException) else ev for ev in evaluaciones]
+        with Memoria() as mem:
+            fut=self._cpu.enviar(_decidir_en_proceso, sitio.nombre, sitio.metodos, usuario,
+                                 [_a_memoria(mem, r) for r in resps], carga, metricas.METRICAS_ACTIVAS)
+            res, eventos = await asyncio.wrap_future(fut)
+        metricas.reanotar(eventos)
+        return res
+
+    async def escanear(self, usuario:str, sitios:Iterable[SitioCompilado],
+                       al_terminar:Optional[Callable[[ResultadoSitio],None]]=None)->List[ResultadoSitio]:
+        """Devuelve los resultados en el orden de sitios.json; `al_terminar` se llama en orden de llegada."""
+        sitios=list(sitios)
+        if self._sem_global is None:
+            self._sem_global=asyncio.Semaphore(self.concurrencia)
+            self._sem_nav=asyncio.Semaphore(self.navegadores)
+        self._respuestas={}; self._navegadas={}; self._metodos_url={}; self._pendientes=Counter()
+        for s in sitios:
+            for url, idxs in agrupar_por_url(s.metodos, usuario).items():
+                self._pendientes[url]+=1
+                self._metodos_url.setdefault(url,[]).extend(s.metodos[i] for i in idxs)
+        propio=self._client is None
+        if propio: self.abrir()
+        try:
+            posicion={s.nombre:i for i,s in enumerate(sitios)}
+            tareas=[self.evaluar_sitio(s, usuario) for s in sitios]
+            resultados:List[Optional[ResultadoSitio]]=[None]*len(sitios)
+            for fut in asyncio.as_completed(tareas):
+                res=await fut
+                resultados[posicion[res.nombre]]=res
+                if al_terminar: al_terminar(res)
+            return [r for r in resultados if r is not None]
+        finally:
+            if propio: await self.cerrar()
+
+    def abrir(self)->None:
+        """Abre el cliente para varios escaneos seguidos (modo lote); escanear() solo no hace falta llamarlo."""
+        if self._client is None:
+            self._client=ClienteHTTPAsync(max_conexiones=self.concurrencia, max_por_host=self.por_host)
+        if self.procesos and self._cpu is None: self._cpu=PoolCPU(self.procesos)
+
+    async def cerrar(self)->None:
+        if self._client is not None:
+            await self._client.cerrar(); self._client=None
+        if self._cpu is not None:
+            cpu, self._cpu = self._cpu, None
+            await asyncio.to_thread(cpu.cerrar)
+
+# ===== Trabajadores del pool de CPU =====
+def _bytes(resps:Iterable[Optional[Resp]])->int:
+    return sum(len(r.text) for r in resps if r is not None)
+
+def _respuestas_de(evaluaciones:List[Any])->List[Resp]:
+    """Respuestas distintas (por identidad) que aparecen en las evaluaciones."""
+    vistas:Dict[int,Resp]={}
+    for ev in evaluaciones:
+        if isinstance(ev, tuple):
+            for r in ev[2:4]:
+                if r is not None: vistas.setdefault(id(r), r)
+    return list(vistas.values())
+
+def _a_memoria(mem:Memoria, r:Optional[Resp])->Optional[Tuple[Resp, Texto]]:
+    return None if r is None else (replace(r, text=""), mem.guardar(r.text))
+
+def _de_memoria(par:Optional[Tuple[Resp, Texto]])->Optional[Resp]:
+    return None if par is None else replace(par[0], text=leer(par[1]))
+
+def _firmas_en_proceso(ms:List[MetodoCompilado], par_http:Tuple[Resp, Texto], par_sel:Optional[Tuple[Resp, Texto]],
+                       hits:Optional[BuscadorClaves], medir:bool)->Tuple[List[Tuple[str, Dict[str,Any]]], List[metricas.Evento]]:
+    """Firmas de una descarga; vuelven solo (outcome, meta): las respuestas ya están en el principal."""
+    with metricas.capturar(medir) as eventos:
+        evs=evaluar_respuestas(ms, _de_memoria(par_http), _de_memoria(par_sel), hits)
+    return [(o, meta) for o, meta, _, _ in evs], eventos
+
+def _decidir_en_proceso(nombre:str, metodos:Tuple[MetodoCompilado,...], usuario:str,
+                        pares:List[Tuple[Resp, Texto]], carga:List[Any], medir:bool)->Tuple[ResultadoSitio, List[metricas.Evento]]:
+    """Heurística y extracción del sitio con las respuestas reconstruidas desde la memoria compartida."""
+    with metricas.capturar(medir) as eventos:
+        resps=[_de_memoria(p) for p in pares]
+        evaluaciones=[(ev[0], ev[1], resps[ev[2]], resps[ev[3]] if ev[3] is not None else None) if isinstance(ev, tuple)
+                      else ev for ev in carga]
+        res=decidir_sitio(nombre, usuario, metodos, evaluaciones)
+    return res, eventos
+
+def escanear_usuario(usuario:str, sitios:Iterable[SitioCompilado], use_browser:bool=False,
+                     al_terminar:Optional[Callable[[ResultadoSitio],None]]=None, **cfg)->List[ResultadoSitio]:
+    """Punto de entrada síncrono (menú, scripts): corre un escaneo completo en su propio loop."""
+    return asyncio.run(Escaner(use_browser, **cfg).escanear(usuario, sitios, al_terminar))
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Extractor HTML de una pasada – Ojo de Zeus 2
+– Recorre el HTML UNA vez con el parser incremental de lxml (modo target: no construye árbol)
+  y junta título, canonical, meta description, campos OpenGraph, JSON-LD y el texto.
+– El resultado (DocumentoHTML) lo comparten la heurística y la extracción de datos del buscador:
+  antes cada una quitaba etiquetas y pasaba a minúsculas el documento entero por su cuenta.
+– `texto` incluye el contenido de <script> (como el antiguo quitar-etiquetas con regex: en las SPA
+  los contadores viven en el JSON embebido); `visible` excluye script/style/noscript/template.
+– Sin lxml cae a las mismas expresiones regulares de antes.
+"""
+
+import io, json, re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+try:
+    from lxml import etree  # type: ignore
+    LXML_OK=True
+except Exception:
+    LXML_OK=False
+
+TROZO_PARSER=1<<16                         # caracteres por feed()
+NO_VISIBLES=frozenset({"script","style","noscript","template"})
+_ESPACIOS=re.compile(r"\s+")
+
+@dataclass
+class DocumentoHTML:
+    titulo:str=""
+    canonical:str=""
+    descripcion:str=""
+    og:Dict[str,str]=field(default_factory=dict)          # "og:title" → contenido (primera aparición)
+    json_ld:List[Any]=field(default_factory=list)
+    texto:str=""                                           # todo el texto, espacios normalizados
+    visible:str=""                                         # solo texto visible
+    _texto_min:Optional[str]=None
+
+    @property
+    def texto_min(self)->str:
+        """`texto` en minúsculas, calculado una sola vez."""
+        if self._texto_min is None: self._texto_min=self.texto.lower()
+        return self._texto_min
+
+class _Colector:
+    """Target de lxml: recibe eventos start/end/data sin que lxml cree nodos."""
+    def __init__(self):
+        self.doc=DocumentoHTML(); self.partes=io.StringIO(); self.visibles=io.StringIO()
+        self._ocultos=0
+        self._en_titulo=False; self._titulo:List[str]=[]
+        self._ld:Optional[List[str]]=None
+
+    def start(self, tag:Any, attrib:Dict[str,str])->None:
+        tag=tag.lower() if isinstance(tag,str) else ""
+        self._corte()
+        if tag in NO_VISIBLES: self._ocultos+=1
+        if tag=="title" and not self.doc.titulo and not self._titulo: self._en_titulo=True
+        elif tag=="meta":
+            contenido=attrib.get("content")
+            if contenido is None: return
+            nombre=(attrib.get("name") or "").lower(); prop=(attrib.get("property") or "").lower()
+            if nombre=="description" and not self.doc.descripcion: self.doc.descripcion=contenido.strip()
+            if prop.startswith("og:") and prop not in self.doc.og: self.doc.og[prop]=contenido.strip()
+        elif tag=="link":
+            if "canonical" in (attrib.get("rel") or "").lower().split() and not self.doc.canonical:
+                self.doc.canonical=(attrib.get("href") or "").strip()
+        elif tag=="script" and (attrib.get("type") or "").lower().strip()=="application/ld+json":
+            self._ld=[]
+
+    def end(self, tag:Any)->None:
+        tag=tag.lower() if isinstance(tag,str) else ""
+        self._corte()
+        if tag in NO_VISIBLES and self._ocultos: self._ocultos-=1
+        if tag=="title" and self._en_titulo:
+            self._en_titulo=False; self.doc.titulo=_ESPACIOS.sub(" ", "".join(self._titulo)).strip()
+        elif tag=="script" and self._ld is not None:
+            try: self.doc.json_ld.append(json.loads("".join(self._ld)))
+            except Exception: pass
+            self._ld=None
+
+    def _corte(self)->None:
+        # cada etiqueta separa palabras (como el antiguo re.sub("<[^>]+>"," ")); un mismo nodo de
+        # texto puede llegar en varios data() y esos trozos NO se separan
+        self.partes.write(" ")
+        if not self._ocultos: self.visibles.write(" ")
+
+    def data(self, txt:str)->None:
+        self.partes.write(txt)
+        if not self._ocultos: self.visibles.write(txt)
+        if self._en_titulo: self._titulo.append(txt)
+        if self._ld is not None: self._ld.append(txt)
+
+    def comment(self, txt:str)->None:
+        pass
+
+    def close(self)->DocumentoHTML:
+        self.doc.texto=_ESPACIOS.sub(" ", self.partes.getvalue()).strip()
+        self.doc.visible=_ESPACIOS.sub(" ", self.visibles.getvalue()).strip()
+        self.partes.close(); self.visibles.close()
+        return self.doc
+
+# ===== Respaldo sin lxml (las expresiones de siempre) =====
+def _rg(pat:str, text:str, flags=re.I|re.S)->Optional[str]:
+    m=re.search(pat, text, flags); return m.group(1).strip() if m else None
+
+def _analizar_regex(html:str)->DocumentoHTML:
+    doc=DocumentoHTML()
+    doc.titulo=_ESPACIOS.sub(" ", _rg(r"<title[^>]*>(.*?)</title>", html) or "")
+    doc.canonical=_rg(r'<link[^>]*rel=["\']canonical["\'][^>]*href=["\']([^"\']+)["\']', html) or ""
+    doc.descripcion=_rg(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', html) or ""
+    for p,v in re.findall(r'<meta[^>]*property=["\'](og:[^"\']+)["\'][^>]*content=["\']([^"\']+)["\']', html, re.I):
+        doc.og.setdefault(p.lower(), v.strip())
+    for bloque in re.findall(r'<script[^>]*application/ld\+json[^>]*>(.*?)</script>', html, re.I|re.S):
+        try: doc.json_ld.append(json.loads(bloque))
+        except Exception: pass
+    doc.texto=_ESPACIOS.sub(" ", re.sub(r"<[^>]+>", " ", html, flags=re.S)).strip()
+    visible=re.sub(r"<(script|style|noscript|template)\b.*?</\1>", " ", html, flags=re.I|re.S)
+    doc.visible=_ESPACIOS.sub(" ", re.sub(r"<[^>]+>", " ", visible, flags=re.S)).strip()
+    return doc
+
+def analizar_html(html:str)->DocumentoHTML:
+    """Una pasada sobre el HTML (por trozos); nunca lanza: ante un error devuelve lo reunido o el respaldo."""
+    if not html: return DocumentoHTML()
+    if not LXML_OK: return _analizar_regex(html)
+    try:
+        parser=etree.HTMLParser(target=_Colector(), huge_tree=True, recover=True)
+        for i in range(0, len(html), TROZO_PARSER): parser.feed(html[i:i+TROZO_PARSER])
+        return parser.close()
+    except Exception:
+        return _analizar_regex(html)
+
+# ===== Utilidades sobre el documento =====
+def _tipos(nodo:Dict[str,Any])->List[str]:
+    t=nodo.get("@type"); return [str(x) for x in (t if isinstance(t,list) else [t]) if x]
+
+def perfil_json_ld(doc:DocumentoHTML)->Dict[str,Any]:
+    """Primer Person/ProfilePage de JSON-LD (también dentro de @graph o mainEntity), o {}."""
+    pendientes=list(doc.json_ld)
+    while pendientes:
+        n=pendientes.pop(0)
+        if isinstance(n, list): pendientes.extend(n); continue
+        if not isinstance(n, dict): continue
+        tipos=_tipos(n)
+        if "ProfilePage" in tipos and isinstance(n.get("mainEntity"), dict): return n["mainEntity"]
+        if "Person" in tipos or "ProfilePage" in tipos: return n
+        if isinstance(n.get("@graph"), list): pendientes.extend(n["@graph"])
+    return {}
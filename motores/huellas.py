@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Huellas de respuestas – Ojo de Zeus 2
+– url_check/redirect_check guardaban la URL final tal cual (final_url=https://sitio/@usuario_de_muestra):
+  al buscar a otro usuario casi nunca coincidía y el sitio acababa en la heurística.
+  Ahora la URL se normaliza antes de firmarla:
+    – el usuario buscado se sustituye por {user} (en la ruta, la consulta y en un subdominio exacto)
+    – se quitan parámetros volátiles (utm_*, fbclid, nonces, marcas de tiempo…) y el fragmento
+    – trozos que parecen ids o nonces pasan a {n} (números largos) o {x} (hex/base64 largos)
+    – host en minúsculas, sin puerto por defecto, sin barra final, parámetros ordenados
+  Así final_url=https://www.tiktok.com/@{user} vale para cualquier cuenta.
+– Los outcomes antiguos de sitios.json se normalizan al compilar el índice: si la URL guardada tiene la
+  forma de url_base, el trozo del usuario de muestra se cambia por {user}.
+– huella_dom: SimHash de 64 bits sobre los caminos de etiquetas del HTML (esqueleto, sin texto ni atributos):
+  outcome "dom=<16 hex>". Páginas con la misma plantilla dan la misma huella o una a pocos bits;
+  la búsqueda exacta sigue siendo O(1) y solo si falla se mira la distancia (conjuntos de pocas huellas).
+"""
+
+import hashlib, re
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+HUELLA_BITS=64
+HUELLA_DISTANCIA=4              # bits distintos que aún cuentan como la misma plantilla
+HUELLA_PROFUNDIDAD=4            # etiquetas de cada camino (las más cercanas)
+HUELLA_MAX_CARACTERES=1_000_000 # el esqueleto está al principio; el resto no cambia la huella
+PREFIJO_URL="final_url="
+PREFIJO_DOM="dom="
+MARCA_USUARIO="{user}"
+
+PARAMS_VOLATILES=frozenset({
+    "fbclid","gclid","dclid","msclkid","igshid","mc_cid","mc_eid","_ga","_gl","ref_src","ref_url",
+    "_","t","ts","timestamp","time","cb","cachebuster","nocache","rnd","rand","random",
+    "nonce","state","csrf","csrf_token","token","sid","session","sessionid","phpsessid","jsessionid",
+})
+PREFIJOS_VOLATILES=("utm_","__")
+PUERTOS_DEFECTO={"http":"80","https":"443"}
+ETIQUETAS_VACIAS=frozenset({"area","base","br","col","embed","hr","img","input","link","meta","param","source","track","wbr"})
+
+_NUMERO=re.compile(r"^\d{5,}$")
+_NONCE=re.compile(r"^(?=[A-Za-z0-9_-]*\d)(?=[A-Za-z0-9_-]*[A-Za-z])[A-Za-z0-9_-]{20,}$|^[0-9a-fA-F]{16,}$")
+_SIN_CONTENIDO=re.compile(r"<!--.*?-->|<(script|style|template|noscript)\b[^>]*>.*?</\1\s*>", re.S|re.I)
+_ETIQUETA=re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9:-]*)[^>]*?(/?)>")
+
+# ===== URL =====
+def _trozo(t:str)->str:
+    if not t or MARCA_USUARIO in t: return t
+    if _NUMERO.match(t): return "{n}"
+    if _NONCE.match(t): return "{x}"
+    return t
+
+def _sin_usuario(texto:str, variantes:List[str])->str:
+    """El usuario como palabra entera (no "log" dentro de "/login")."""
+    for v in variantes:
+        texto=re.sub(r"(?<![A-Za-z0-9])"+re.escape(v)+r"(?![A-Za-z0-9])", MARCA_USUARIO, texto, flags=re.I)
+    return texto
+
+def plantilla_url(url:str, usuario:Optional[str]=None)->str:
+    """URL normalizada con el usuario como {user}; "" si no hay URL."""
+    if not url: return ""
+    try: p=urlsplit(url.strip())
+    except ValueError: return url.strip()
+    usuario=(usuario or "").strip()
+    variantes=sorted({usuario, quote(usuario, safe=""), quote(usuario)}, key=len, reverse=True) if len(usuario)>=2 else []
+    esquema=p.scheme.lower(); host=(p.hostname or "").lower()
+    if p.port and str(p.port)!=PUERTOS_DEFECTO.get(esquema): host+=f":{p.port}"
+    if usuario and "." in host:
+        etiquetas=host.split(".")
+        host=".".join(MARCA_USUARIO if e==usuario.lower() else e for e in etiquetas)
+    ruta="/".join(_trozo(_sin_usuario(s, variantes)) for s in unquote(p.path).split("/")).rstrip("/") or "/"
+    params=[]
+    for k, v in parse_qsl(p.query, keep_blank_values=True):
+        kl=k.lower()
+        if kl in PARAMS_VOLATILES or kl.startswith(PREFIJOS_VOLATILES): continue
+        params.append((k, _trozo(_sin_usuario(v, variantes))))
+    consulta=urlencode(sorted(params), safe="{}/:@")
+    return urlunsplit((esquema, host, ruta, consulta, ""))
+
+@lru_cache(maxsize=4096)
+def _patron_base(url_base:str)->Optional["re.Pattern[str]"]:
+    partes=re.split(r"\{user\}|\{usuario\}", url_base)
+    if len(partes)<2: return None
+    cuerpo=r"(?P<u>[^/?#&]+)".join(re.escape(t) for t in partes[:2])
+    return re.compile(cuerpo, re.I)
+
+def usuario_en(url_base:str, url:str)->Optional[str]:
+    """El usuario que ocupa {user} de `url_base` en `url` (la URL pedida o una con la misma forma)."""
+    pat=_patron_base(url_base) if url_base else None
+    m=pat.match(url) if (pat and url) else None
+    return unquote(m.group("u")) if m else None
+
+def outcome_url(final_url:str, usuario:Optional[str])->str:
+    return PREFIJO_URL+plantilla_url(final_url, usuario)
+
+def normalizar_outcome(outcome:str, url_base:str)->str:
+    """Outcome guardado por una versión anterior (URL del usuario de muestra) → forma actual."""
+    if not outcome.startswith(PREFIJO_URL): return outcome
+    url=outcome[len(PREFIJO_URL):]
+    return outcome_url(url, usuario_en(url_base, url))
+
+# ===== DOM =====
+@lru_cache(maxsize=65536)
+def _hash(rasgo:str)->int:
+    return int.from_bytes(hashlib.blake2b(rasgo.encode("utf-8"), digest_size=8).digest(), "big")
+
+def caminos(html:str)->Set[str]:
+    """Caminos de etiquetas distintos (los últimos HUELLA_PROFUNDIDAD niveles), sin texto ni atributos."""
+    html=_SIN_CONTENIDO.sub(lambda m: f"<{m.group(1)}></{m.group(1)}>" if m.group(1) else "", html[:HUELLA_MAX_CARACTERES])
+    pila:List[str]=[]; out:Set[str]=set()
+    for m in _ETIQUETA.finditer(html):
+        cierre, tag, auto = m.group(1), m.group(2).lower(), m.group(3)
+        if cierre:
+            if tag in pila:
+                while pila and pila.pop()!=tag: pass
+            continue
+        out.add("/".join(pila[-(HUELLA_PROFUNDIDAD-1):]+[tag]))
+        if not auto and tag not in ETIQUETAS_VACIAS: pila.append(tag)
+    return out
+
+def simhash(rasgos:Iterable[str])->int:
+    cuenta=[0]*HUELLA_BITS
+    for r in rasgos:
+        h=_hash(r)
+        for b in range(HUELLA_BITS):
+            cuenta[b]+=1 if (h>>b)&1 else -1
+    return sum(1<<b for b,c in enumerate(cuenta) if c>0)
+
+def huella_dom(html:str)->str:
+    return f"{PREFIJO_DOM}{simhash(caminos(html)):016x}"
+
+def distancia(a:str, b:str)->int:
+    """Bits distintos entre dos outcomes dom=…; HUELLA_BITS+1 si alguno no lo es."""
+    try: return bin(int(a[len(PREFIJO_DOM):],16)^int(b[len(PREFIJO_DOM):],16)).count("1")
+    except ValueError: return HUELLA_BITS+1
+
+# ===== Comparación =====
+def coincide(outcome:str, conocidos:Iterable[str])->bool:
+    """Igual a alguno de `conocidos` (set/frozenset: O(1)); las huellas dom también a pocos bits."""
+    if outcome in conocidos: return True
+    if not outcome.startswith(PREFIJO_DOM): return False
+    return any(o.startswith(PREFIJO_DOM) and distancia(outcome, o)<=HUELLA_DISTANCIA for o in conocidos)
+
+def solape(reales:Set[str], falsos:Set[str])->Set[str]:
+    """Outcomes que aparecen (o casi, en huellas dom) en los dos lados."""
+    return {o for o in reales if coincide(o, falsos)} | {o for o in falsos if coincide(o, reales)}
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Índice compilado de métodos – Ojo de Zeus 2
+– Convierte sitios.json en objetos listos para evaluar: URL partida en trozos, claves ya en
+  minúsculas (tuplas) y outcomes reales/falsos como frozenset (búsqueda O(1)).
+– Se construye una vez y se guarda junto a sitios.json (sitios.json.idx).
+– Solo se reconstruye si cambia el almacén (sitios.json + sitios.json.log, ver motores/almacen.py):
+  primero mira mtime/tamaño de ambos y, si difieren, el hash.
+– Cada método lleva ya resuelto su modo de descarga (http/navegador, ver motores/planificador.py).
+– Los outcomes de URL se guardan normalizados (usuario como {user}, ver motores/huellas.py), también
+  los que escribió una versión anterior del creador. Si tras normalizar un outcome de URL sale en reales
+  y en falsos se quita de ambos; un método de URL que se queda sin reales o sin falsos no decide
+  (outcomes vacíos) y queda en `recrear` con el motivo: hay que volver a crearlo (por_recrear()).
+"""
+
+import hashlib, os, pickle, re, threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from motores.almacen import Almacen, rutas_de
+from motores.planificador import MODO_HTTP, modo_de, sitio_js
+from motores.huellas import PREFIJO_URL, normalizar_outcome
+
+INDICE_VERSION=6
+INDICE_SUFIJO=".idx"
+
+_MARCADOR=re.compile(r"\{user\}|\{usuario\}")
+
+@dataclass(frozen=True)
+class MetodoCompilado:
+    nombre:str
+    metodo:str
+    url_base:str
+    partes:Tuple[str,...]                 # url_base partida por {user}/{usuario}; 1 trozo = URL sin marcador
+    claves:Tuple[str,...]=()              # claves de contenido en minúsculas, ya recortadas como las usa la firma
+    codigo:Any=None                       # status_code_y_texto
+    claves_json:Tuple[str,...]=()         # json_response_check (sensibles a mayúsculas)
+    outcomes_real:FrozenSet[str]=frozenset()
+    outcomes_fake:FrozenSet[str]=frozenset()
+    modo:str=MODO_HTTP                    # "http" | "navegador" (planificador)
+    recrear:str=""                        # motivo por el que sus outcomes no valen (no decide); "" si valen
+    datos:Dict[str,Any]=field(default_factory=dict, compare=False, hash=False)   # entrada original de sitios.json
+
+    @property
+    def valida(self)->bool:
+        return len(self.partes)>1
+
+    def url(self, usuario:str)->str:
+        return usuario.join(self.partes)
+
+@dataclass(frozen=True)
+class SitioCompilado:
+    nombre:str
+    metodos:Tuple[MetodoCompilado,...]
+
+@dataclass
+class IndiceMetodos:
+    sitios:Tuple[SitioCompilado,...]
+    huella:Tuple[Tuple[int,...],str]=((),"")    # ((mtime_ns, tamaño) de foto y registro, sha1 de ambos)
+
+    def __iter__(self)->Iterator[SitioCompilado]:
+        return iter(self.sitios)
+
+    def __len__(self)->int:
+        return len(self.sitios)
+
+    @property
+    def total_metodos(self)->int:
+        return sum(len(s.metodos) for s in self.sitios)
+
+    def por_recrear(self)->List[Tuple[str,str,str]]:
+        """(sitio, método, motivo) de los métodos que no deciden hasta volver a crearlos."""
+        return [(s.nombre, m.metodo, m.recrear) for s in self.sitios for m in s.metodos if m.recrear]
+
+# ===== Compilación =====
+def _lower(claves:Any)->Tuple[str,...]:
+    return tuple(str(k).lower() for k in (claves or []))
+
+def _outcomes(lista:Any, url_base:str)->FrozenSet[str]:
+    return frozenset(normalizar_outcome(str(o), url_base) for o in (lista or []))
+
+def _outcomes_url(real:FrozenSet[str], fake:FrozenSet[str])->Tuple[FrozenSet[str],FrozenSet[str],str]:
+    """
+    Con {user} en vez del usuario de muestra, reales y falsos pueden quedar iguales (tiktok: @{user} en
+    ambos) o un solo lado puede valer para cualquiera (pinterest: /{user} sin falsos = "Existe" siempre).
+    Los comunes se quitan; si un lado queda vacío el método no decide y se devuelve el motivo.
+    """
+    if not any(o.startswith(PREFIJO_URL) for o in real|fake): return real, fake, ""
+    comunes=real&fake; real, fake = real-comunes, fake-comunes
+    if real and fake: return real, fake, ""
+    motivo=f"{len(comunes)} outcome(s) de URL iguales en reales y falsos" if comunes else ""
+    falta="reales ni falsos" if not (real or fake) else ("falsos" if real else "reales")
+    return frozenset(), frozenset(), (motivo+"; " if motivo else "")+f"sin outcomes de URL {falta} que los distingan"
+
+def compilar_metodo(m:Dict[str,Any], js:bool=False)->MetodoCompilado:
+    """`js`: el sitio del método está marcado js_renderizado (todo por navegador)."""
+    metodo=m.get("metodo","?"); params=m.get("parametros",{}) or {}
+    url_base=m.get("url_base","")
+    real, fake, recrear = _outcomes_url(_outcomes(m.get("outcomes_real"), url_base), _outcomes(m.get("outcomes_fake"), url_base))
+    claves:Tuple[str,...]=()
+    if metodo=="status_code_y_texto": claves=_lower(params.get("debe_contener"))[:5]
+    elif metodo=="html_contains": claves=_lower(params.get("claves"))[:5]
+    elif metodo=="palabras_clave": claves=_lower(params.get("claves"))
+    return MetodoCompilado(
+        nombre=m.get("nombre","general"), metodo=metodo, url_base=url_base,
+        partes=tuple(_MARCADOR.split(url_base)), claves=claves, codigo=params.get("codigo"),
+        claves_json=tuple(params.get("claves_presentes",[]) or [])[:5],
+        outcomes_real=real, outcomes_fake=fake, recrear=recrear,
+        modo=modo_de(m, js, bool(real or fake)), datos=m,
+    )
+
+def compilar(sitios:List[Dict[str,Any]], huella:Tuple[Tuple[int,...],str]=((),""))->IndiceMetodos:
+    """Agrupa por nombre de sitio conservando el orden de aparición (igual que el buscador)."""
+    por_nombre:Dict[str,List[Dict[str,Any]]]={}
+    for m in sitios:
+        if isinstance(m, dict): por_nombre.setdefault(m.get("nombre","general"),[]).append(m)
+    return IndiceMetodos(tuple(SitioCompilado(n, tuple(compilar_metodo(m, sitio_js(ms)) for m in ms))
+                               for n,ms in por_nombre.items()), huella)
+
+# ===== Caché en disco =====
+def _estado(path:str)->Optional[Tuple[int,...]]:
+    """(mtime_ns, tamaño) de sitios.json y de su registro; None si no hay sitios.json ni registro."""
+    est=[]
+    for r in rutas_de(path):
+        try: st=os.stat(r); est+=[st.st_mtime_ns, st.st_size]
+        except OSError: est+=[0, -1]
+    return tuple(est) if (est[1]>=0 or est[3]>=0) else None
+
+def _sha1(path:str)->str:
+    h=hashlib.sha1()
+    for r in rutas_de(path):
+        try:
+            with open(r,"rb") as f:
+                for bloque in iter(lambda: f.read(1<<20), b""): h.update(bloque)
+        except OSError:
+            pass
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _leer_cache(path_idx:str)->Optional[Dict[str,Any]]:
+    try:
+        with open(path_idx,"rb") as f: d=pickle.load(f)
+        if isinstance(d,dict) and d.get("version")==INDICE_VERSION: return d
+    except Exception:
+        pass
+    return None
+
+def _escribir_cache(path_idx:str, indice:IndiceMetodos)->None:
+    tmp=f"{path_idx}.{os.getpid()}.tmp"
+    try:
+        with open(tmp,"wb") as f: pickle.dump({"version":INDICE_VERSION, "indice":indice}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path_idx)
+    except Exception:
+        try: os.remove(tmp)
+        except Exception: pass
+
+_MEMORIA:Dict[str,IndiceMetodos]={}
+_LOCK=threading.Lock()
+
+def cargar_indice(path:str="sitios.json")->IndiceMetodos:
+    """Índice de `path`, desde memoria, desde sitios.json.idx o recompilado (en ese orden)."""
+    est=_estado(path)
+    if est is None: return IndiceMetodos(())
+    clave=os.path.abspath(path)
+    with _LOCK:
+        mem=_MEMORIA.get(clave)
+        if mem and mem.huella[0]==est: return mem
+
+        path_idx=path+INDICE_SUFIJO
+        cache=_leer_cache(path_idx)
+        indice:Optional[IndiceMetodos]=cache["indice"] if cache else None
+        if indice is not None and indice.huella[0]!=est:
+            sha=_sha1(path)
+            if indice.huella[1]==sha:         # mismo contenido (p. ej. checkout/touch): solo refresca mtime
+                indice.huella=(est, sha); _escribir_cache(path_idx, indice)
+            else:
+                indice=None
+        if indice is None:
+            sha=_sha1(path)
+            try: datos=Almacen(path).leer()
+            except Exception:
+                return IndiceMetodos(())        # JSON roto: no se cachea, se reintenta la próxima vez
+            indice=compilar(datos, (est, sha))
+            _escribir_cache(path_idx, indice)
+        _MEMORIA[clave]=indice
+        return indice
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Limitador por host – Ojo de Zeus 2
+– Cubeta de fichas por host: LIMITE_RPS peticiones/seg. sostenidas, ráfagas de hasta LIMITE_RAFAGA.
+– Respeta Retry-After (segundos o fecha HTTP) de 429/503: el host queda en pausa hasta entonces.
+– Reintenta errores pasajeros (conexión caída, 429, 5xx) con espera exponencial y jitter.
+– Se adapta (AIMD): al ver 429/503 o una página de CAPTCHA/desafío la tasa del host baja a la mitad;
+  cada respuesta normal la vuelve a subir poco a poco hasta su tasa base.
+– Lo usan los clientes de motores/red.py: todas las descargas HTTP pasan por aquí.
+"""
+
+import random, threading, time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+# ===== Ajustes =====
+LIMITE_RPS=4.0                # peticiones/seg. por host
+LIMITE_RAFAGA=8               # fichas acumulables (peticiones seguidas sin esperar)
+LIMITE_RPS_POR_HOST:Dict[str,float]={   # host → peticiones/seg. propias
+    # "www.instagram.com": 1.0,
+}
+LIMITE_MIN_RPS=0.2            # suelo al frenar por 429/CAPTCHA
+LIMITE_SUBIDA=0.1             # rps que se recuperan por cada respuesta normal
+REINTENTOS=2                  # reintentos tras el primer intento
+ESPERA_BASE_S=0.5             # 0.5, 1, 2… (+ jitter) entre reintentos
+ESPERA_MAX_S=30.0             # tope de espera (también para Retry-After)
+
+STATUS_REINTENTABLES=frozenset({429, 500, 502, 503, 504})
+STATUS_FRENO=frozenset({429, 503})
+# Mismos marcadores que CAPTCHA_MARKERS del buscador; solo cuentan en páginas de desafío
+# (error o cuerpo corto): muchos perfiles normales cargan scripts de cloudflare.
+MARCADORES_DESAFIO=("captcha","cf-challenge","hcaptcha","g-recaptcha","cloudflare","attention required!",
+                    "/cdn-cgi/challenge-platform","are you a human","just a moment...")
+DESAFIO_MAX_CUERPO=32768
+
+def host_de(url:str)->str:
+    try: return (urlsplit(url).hostname or "").lower()
+    except Exception: return ""
+
+def es_desafio(status:int, texto:str)->bool:
+    if status<400 and len(texto)>DESAFIO_MAX_CUERPO: return False
+    t=texto[:DESAFIO_MAX_CUERPO].lower()
+    return any(m in t for m in MARCADORES_DESAFIO)
+
+def retry_after(headers:Dict[str,str])->Optional[float]:
+    """Segundos indicados por Retry-After (ya acotados a ESPERA_MAX_S) o None."""
+    v=(headers or {}).get("retry-after")
+    if not v: return None
+    try: s=float(v)
+    except ValueError:
+        try: s=parsedate_to_datetime(v).timestamp()-time.time()
+        except Exception: return None
+    return max(0.0, min(s, ESPERA_MAX_S))
+
+def espera_reintento(intento:int)->float:
+    """Exponencial con jitter (mitad fija, mitad aleatoria). La pausa de Retry-After la añade turno()."""
+    exp=min(ESPERA_MAX_S, ESPERA_BASE_S*(2**intento))
+    return random.uniform(exp/2, exp)
+
+@dataclass
+class EstadoHost:
+    base:float; tasa:float; fichas:float; ultimo:float
+    pausa_hasta:float=0.0; frenazos:int=0
+
+class Limitador:
+    """Seguro entre hilos; `turno()` no duerme: devuelve cuánto esperar (time.sleep o asyncio.sleep)."""
+    def __init__(self, rps:float=LIMITE_RPS, rafaga:int=LIMITE_RAFAGA):
+        self.rps=rps; self.rafaga=max(1,rafaga)
+        self._hosts:Dict[str,EstadoHost]={}; self._lock=threading.Lock()
+
+    def _estado(self, host:str, ahora:float)->EstadoHost:
+        st=self._hosts.get(host)
+        if st is None:
+            base=max(LIMITE_MIN_RPS, LIMITE_RPS_POR_HOST.get(host, self.rps))
+            st=self._hosts[host]=EstadoHost(base, base, float(self.rafaga), ahora)
+        return st
+
+    def turno(self, url:str)->float:
+        """Reserva una ficha del host de `url` y dice cuántos seg. esperar antes de usarla."""
+        if self.rps<=0: return 0.0
+        ahora=time.monotonic(); host=host_de(url)
+        with self._lock:
+            st=self._estado(host, ahora)
+            st.fichas=min(float(self.rafaga), st.fichas+(ahora-st.ultimo)*st.tasa); st.ultimo=ahora
+            st.fichas-=1.0        # puede quedar negativa: la deuda ordena a quienes esperan
+            espera=0.0 if st.fichas>=0 else -st.fichas/st.tasa
+            return max(espera, st.pausa_hasta-ahora)
+
+    def registrar(self, url:str, status:int, headers:Dict[str,str], texto:str="")->None:
+        """Ajusta la tasa del host según la respuesta (429/503/desafío frenan, el resto recupera)."""
+        ahora=time.monotonic(); host=host_de(url)
+        with self._lock:
+            st=self._estado(host, ahora)
+            if status in STATUS_FRENO or es_desafio(status, texto):
+                st.tasa=max(LIMITE_MIN_RPS, st.tasa/2); st.frenazos+=1
+                ra=retry_after(headers)
+                if ra: st.pausa_hasta=max(st.pausa_hasta, ahora+ra)
+            elif status>=0:
+                st.tasa=min(st.base, st.tasa+LIMITE_SUBIDA)
+
+    def frenados(self)->Dict[str,float]:
+        """Hosts que van por debajo de su tasa base → rps actual (para informar al final)."""
+        with self._lock:
+            return {h:round(st.tasa,2) for h,st in self._hosts.items() if st.tasa<st.base}
+
+# ===== Limitador único por proceso =====
+_LIMITADOR:Optional[Limitador]=None
+_LIMITADOR_LOCK=threading.Lock()
+
+def limitador_compartido()->Limitador:
+    global _LIMITADOR
+    if _LIMITADOR is None:
+        with _LIMITADOR_LOCK:
+            if _LIMITADOR is None: _LIMITADOR=Limitador()
+    return _LIMITADOR
+
+def configurar(rps:Optional[float]=None, rafaga:Optional[int]=None)->None:
+    """--rps/--rafaga del modo lote. rps=0 desactiva la cubeta (los reintentos siguen)."""
+    lim=limitador_compartido()
+    with lim._lock:
+        if rps is not None: lim.rps=rps
+        if rafaga is not None: lim.rafaga=max(1,rafaga)
+        lim._hosts.clear()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Página lista – Ojo de Zeus 2 (detector para Selenium)
+– Sustituye el sondeo fijo (current_url cada 120 ms hasta 700 ms quieta + 450 ms de espera siempre):
+  una sonda JS en la página cuenta peticiones fetch/XHR en vuelo, escucha mutaciones del DOM y
+  cambios de URL (pushState, redirecciones por JS), y avisa en cuanto todo lleva `quieto_ms` quieto.
+– Una sola llamada execute_async_script por página: el navegador espera, Python no sondea.
+– Chromium: la sonda se instala antes de los scripts de la página (CDP addScriptToEvaluateOnNewDocument),
+  así ve también las peticiones del arranque. Firefox: se inyecta tras get(); lo que ya estaba en
+  vuelo no se cuenta, pero las mutaciones que provoca sí.
+– Si la página navega durante la espera (redirección completa), se vuelve a esperar en la nueva.
+– Regla por sitio: cualquier método del sitio en sitios.json puede llevar
+    "listo": {"quieto_ms": 600, "max_ms": 12000, "selector": "main h1", "red": false}
+  selector = CSS que debe existir; red=false no espera a que terminen fetch/XHR.
+– Si el navegador no admite scripts asíncronos, cae al sondeo de URL de siempre.
+"""
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+LISTO_QUIETO_MS=350          # ms sin red, mutaciones ni cambios de URL
+LISTO_MAX_MS=8000            # tope total de espera
+LISTO_RED_IGNORAR_MS=4000    # peticiones más largas (long-polling, streams) no cuentan como "en vuelo"
+LISTO_TICK_MS=50             # revisión dentro de la página
+# Respaldo sin scripts asíncronos (el comportamiento anterior)
+SONDEO_VENTANA_MS=700
+SONDEO_INTERVALO_S=0.12
+
+@dataclass(frozen=True)
+class Regla:
+    quieto_ms:int=LISTO_QUIETO_MS
+    max_ms:int=LISTO_MAX_MS
+    selector:Optional[str]=None
+    red:bool=True
+    ignorar_red_ms:int=LISTO_RED_IGNORAR_MS
+
+REGLA_DEFECTO=Regla()
+
+def regla_de(metodos:Iterable[Dict[str,Any]], base:Regla=REGLA_DEFECTO)->Regla:
+    """Primera regla "listo" entre los métodos (entradas de sitios.json) de un sitio; si no hay, `base`."""
+    for m in metodos:
+        r=(m or {}).get("listo")
+        if not isinstance(r, dict): continue
+        try:
+            campos:Dict[str,Any]={k:max(0,int(r[k])) for k in ("quieto_ms","max_ms","ignorar_red_ms") if k in r}
+        except (TypeError, ValueError):
+            return base
+        if "red" in r: campos["red"]=bool(r["red"])
+        if isinstance(r.get("selector"), str) and r["selector"].strip(): campos["selector"]=r["selector"].strip()
+        return replace(base, **campos)
+    return base
+
+# Sonda: idempotente; se puede instalar antes de la página (CDP) o después (execute_script)
+SONDA_JS=r"""
+(function(){
+  if (window.__zeusListo) return;
+  var z = window.__zeusListo = {vuelo:{}, n:0, cambio:performance.now(), url:location.href};
+  function toque(){ z.cambio = performance.now(); }
+  function empieza(){ var id = ++z.n; z.vuelo[id] = performance.now(); toque(); return id; }
+  function termina(id){ delete z.vuelo[id]; toque(); }
+  var f = window.fetch;
+  if (f) window.fetch = function(){
+    var id = empieza();
+    try { var p = f.apply(this, arguments); } catch(e) { termina(id); throw e; }
+    p.then(function(){ termina(id); }, function(){ termina(id); });
+    return p;
+  };
+  var X = window.XMLHttpRequest;
+  if (X && X.prototype && X.prototype.send){
+    var send = X.prototype.send;
+    X.prototype.send = function(){
+      var id = empieza(), xhr = this;
+      xhr.addEventListener("loadend", function(){ termina(id); });
+      try { return send.apply(xhr, arguments); } catch(e) { termina(id); throw e; }
+    };
+  }
+  try { new MutationObserver(toque).observe(document, {childList:true, subtree:true, characterData:true}); } catch(e) {}
+})();
+"""
+
+# Espera dentro del navegador: devuelve {listo, url, ms, red} en cuanto la regla se cumple o vence el tope
+ESPERA_JS=SONDA_JS+r"""
+var cb = arguments[arguments.length-1];
+var quieto = arguments[0], maximo = arguments[1], sel = arguments[2], conRed = arguments[3], ignorar = arguments[4], tick = arguments[5];
+var z = window.__zeusListo, t0 = performance.now();
+function enVuelo(ahora){ var n = 0; for (var k in z.vuelo) if (ahora - z.vuelo[k] < ignorar) n++; return n; }
+(function revisar(){
+  var ahora = performance.now();
+  if (location.href !== z.url) { z.url = location.href; z.cambio = ahora; }
+  var red = conRed ? enVuelo(ahora) : 0;
+  var ok = document.readyState === "complete" && red === 0 && (ahora - z.cambio) >= quieto;
+  if (ok && sel) { try { ok = !!document.querySelector(sel); } catch(e) {} }
+  if (ok || ahora - t0 >= maximo) return cb({listo: ok, url: location.href, ms: ahora - t0, red: red});
+  setTimeout(revisar, tick);
+})();
+"""
+
+def instalar_sonda(driver:Any, nombre:str)->None:
+    """Chromium: deja la sonda registrada para cada documento nuevo (una vez por sesión)."""
+    if nombre!="chromium" or getattr(driver, "_zeus_sonda", False): return
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": SONDA_JS})
+        driver._zeus_sonda=True
+    except Exception:
+        pass
+
+def _sondeo(driver:Any, max_ms:int)->Tuple[str,bool]:
+    """Respaldo: URL sin cambios durante SONDEO_VENTANA_MS (como antes)."""
+    inicio=time.time()*1000; ultima=driver.current_url; desde=inicio
+    while True:
+        time.sleep(SONDEO_INTERVALO_S); cur=driver.current_url; ahora=time.time()*1000
+        if cur!=ultima: ultima=cur; desde=ahora
+        if (ahora-desde)>=SONDEO_VENTANA_MS: return cur, True
+        if (ahora-inicio)>=max_ms: return cur, False
+
+def esperar_listo(driver:Any, regla:Regla=REGLA_DEFECTO)->Tuple[str,bool]:
+    """Tras driver.get(): espera a que la página esté quieta. Devuelve (URL final, si se cumplió la regla)."""
+    fin=time.time()*1000+regla.max_ms
+    try: driver.set_script_timeout(regla.max_ms/1000.0+5)
+    except Exception: pass
+    fallos=0
+    while True:
+        restante=int(fin-time.time()*1000)
+        if restante<=0:
+            try: return driver.current_url, False
+            except Exception: return "", False
+        try:
+            r=driver.execute_async_script(ESPERA_JS, regla.quieto_ms, restante, regla.selector, regla.red,
+                                          regla.ignorar_red_ms, LISTO_TICK_MS)
+        except Exception:
+            # la página navegó mientras se esperaba (el script muere con el documento): esperar en la nueva.
+            # Si falla seguido sin navegar, el navegador no admite la sonda: sondeo clásico.
+            fallos+=1
+            if fallos>=3: return _sondeo(driver, max(0, int(fin-time.time()*1000)))
+            time.sleep(LISTO_TICK_MS/1000.0); continue
+        if isinstance(r, dict) and r.get("url"):
+            return str(r["url"]), bool(r.get("listo"))
+        return driver.current_url, False
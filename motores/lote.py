@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Modo lote – Ojo de Zeus 2
+– Verifica miles de usuarios/correos leídos de un archivo (o stdin) sin preguntar nada.
+– Misma evaluación que el buscador (escáner concurrente + decidir_por_outcome + heurística).
+– Escribe JSON Lines mientras avanza: una línea por usuario × sitio, con sus métodos.
+– Punto de control (<salida>.ckpt): si el proceso muere, al relanzarlo sigue tras el último usuario terminado.
+– Métodos de cada sitio del más decisivo al menos; lo que queda tras un No existe se omite
+  (--todos para evaluarlos igual). Lo aprendido se guarda en <sitios.json>.puntos.
+– También guarda cada escaneo en resultados.sqlite (motores/resultados.py) para consultarlo después.
+– Usa todos los núcleos: firmas, heurística y extracción van a un pool de procesos (--procesos, 0 = aquí).
+
+Uso:
+  python3 -m motores.lote usuarios.txt -o resultados.jsonl
+  cat usuarios.txt | python3 -m motores.lote - -o resultados.jsonl --concurrencia 128
+"""
+
+import argparse, asyncio, json, os, sys, time
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO
+
+from motores.buscador_auto_graficos import ResultadoSitio, SELENIUM_OK, POOL_NAVEGADORES
+from motores.escaner import Escaner, ESCANEO_CONCURRENCIA, ESCANEO_POR_HOST, ESCANEO_NAVEGADORES, ESCANEO_TIMEOUT, ESCANEO_MAX_CUERPO
+from motores.indice import IndiceMetodos, cargar_indice
+from motores.planificador import resumen
+from motores import cache_disco, limitador, metricas, navegadores, recursos
+from motores.procesos import PROCESOS_AUTO
+from motores.puntuacion import Historial
+from motores.resultados import RESULTADOS_RUTA, AlmacenResultados
+
+def log(evento:str, detalle:str): print(f"[{evento}] {detalle}", file=sys.stderr, flush=True)
+
+def leer_usuarios(origen:str)->Iterator[str]:
+    """Un usuario por línea; ignora vacías y comentarios (#). '-' lee de stdin."""
+    f:TextIO = sys.stdin if origen=="-" else open(origen, "r", encoding="utf-8")
+    try:
+        vistos:Set[str]=set()
+        for linea in f:
+            u=linea.strip()
+            if not u or u.startswith("#") or u in vistos: continue
+            vistos.add(u)
+            yield u
+    finally:
+        if f is not sys.stdin: f.close()
+
+def avisar_recrear(indice:IndiceMetodos)->None:
+    """Métodos que no deciden hasta volver a crearlos (outcomes que ya no distinguen reales de falsos)."""
+    for sitio, metodo, motivo in indice.por_recrear(): log("RECREAR", f"{sitio} · {metodo}: {motivo}")
+
+def fila_jsonl(usuario:str, res:ResultadoSitio)->Dict[str,Any]:
+    return {
+        "usuario": usuario, "sitio": res.nombre, "decision": res.decision, "heuristica": res.heuristica,
+        "metodos": [{"metodo":m, "decision":d, "outcome":o, "final_url":fu} for d,m,o,fu in res.resultados],
+        "info": res.info, "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+# ===== Punto de control =====
+class PuntoControl:
+    """
+    Registro append-only de usuarios terminados junto con el tamaño de la salida en ese momento.
+    Al reanudar se recorta la salida a ese tamaño: las líneas a medias del usuario interrumpido
+    se descartan y ese usuario se repite completo (sin duplicados).
+    """
+    def __init__(self, ruta:str):
+        self.ruta=ruta; self.hechos:Set[str]=set(); self.offset=0
+        if os.path.exists(ruta):
+            with open(ruta, "r", encoding="utf-8") as f:
+                for linea in f:
+                    try: d=json.loads(linea)
+                    except Exception: continue      # última línea cortada por el kill
+                    self.hechos.add(d["usuario"]); self.offset=int(d.get("offset",0))
+
+    def marcar(self, usuario:str, offset:int)->None:
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"usuario":usuario, "offset":offset}, ensure_ascii=False)+"\n")
+            f.flush(); os.fsync(f.fileno())
+        self.hechos.add(usuario); self.offset=offset
+
+# ===== Ejecución =====
+async def correr_lote(usuarios:Iterator[str], salida:TextIO, indice:IndiceMetodos,
+                      escaner:Escaner, ckpt:Optional[PuntoControl]=None,
+                      bd:Optional[AlmacenResultados]=None)->Dict[str,int]:
+    stats={"usuarios":0, "omitidos":0, "existe":0}
+    escaner.abrir()
+    try:
+        for usuario in usuarios:
+            if ckpt and usuario in ckpt.hechos:
+                stats["omitidos"]+=1; continue
+            t0=time.time(); existe=0
+            esc=bd.abrir_escaneo(usuario, "lote") if bd else 0
+            def _al_terminar(res:ResultadoSitio)->None:
+                nonlocal existe
+                if res.decision=="Existe": existe+=1
+                salida.write(json.dumps(fila_jsonl(usuario, res), ensure_ascii=False)+"\n")
+                if bd: bd.agregar(esc, res)
+            await escaner.escanear(usuario, indice, _al_terminar)
+            if bd: bd.cerrar_escaneo(esc)
+            salida.flush()
+            if ckpt:
+                os.fsync(salida.fileno()); ckpt.marcar(usuario, salida.tell())
+            stats["usuarios"]+=1; stats["existe"]+=existe
+            log("LOTE", f"{stats['usuarios']} · {usuario}: existe en {existe} sitio(s) ({time.time()-t0:.1f}s)")
+    finally:
+        await escaner.cerrar()
+    return stats
+
+def main(argv:Optional[List[str]]=None)->int:
+    ap=argparse.ArgumentParser(prog="python3 -m motores.lote", description="Verificación por lotes (JSON Lines, reanudable).")
+    ap.add_argument("usuarios", help="archivo con un usuario/correo por línea, o '-' para stdin")
+    ap.add_argument("-o","--salida", default="-", help="archivo .jsonl de salida ('-' = stdout, sin punto de control)")
+    ap.add_argument("--sitios", default="sitios.json")
+    ap.add_argument("--navegador", action="store_true", help="usar navegador real donde haga falta; sin GUI, sin ventana (por defecto solo HTTP)")
+    ap.add_argument("--headless", action="store_true", help="navegador sin ventana aunque haya GUI")
+    ap.add_argument("--completo", action="store_true", help="cargar imágenes, fuentes y vídeo en el navegador (por defecto no)")
+    ap.add_argument("--concurrencia", type=int, default=ESCANEO_CONCURRENCIA)
+    ap.add_argument("--por-host", type=int, default=ESCANEO_POR_HOST)
+    ap.add_argument("--navegadores", type=int, default=ESCANEO_NAVEGADORES)
+    ap.add_argument("--timeout", type=float, default=ESCANEO_TIMEOUT)
+    ap.add_argument("--streaming", action="store_true", help="dejar de leer cada cuerpo en cuanto las firmas están decididas")
+    ap.add_argument("--max-cuerpo", type=int, default=ESCANEO_MAX_CUERPO, help="bytes máximos leídos por cuerpo con --streaming")
+    ap.add_argument("--todos", action="store_true", help="evaluar todos los métodos aunque el sitio ya esté decidido")
+    ap.add_argument("--procesos", type=int, default=PROCESOS_AUTO,
+                    help=f"procesos para el trabajo de CPU (por defecto {PROCESOS_AUTO}; 0 = todo en este proceso)")
+    ap.add_argument("--rps", type=float, default=limitador.LIMITE_RPS, help="peticiones/seg. por host (0 = sin límite)")
+    ap.add_argument("--rafaga", type=int, default=limitador.LIMITE_RAFAGA, help="peticiones seguidas permitidas por host")
+    ap.add_argument("--fresco", action="store_true", help="no usar respuestas guardadas en la caché (sí se actualiza)")
+    ap.add_argument("--sin-cache", action="store_true", help="no leer ni escribir la caché de respuestas en disco")
+    ap.add_argument("--perfil", action="store_true", help="al terminar, mostrar sitios y etapas más lentos y el tiempo perdido en timeouts")
+    ap.add_argument("--metricas", metavar="RUTA", help="exportar los tiempos por etapa/sitio/método (.json o texto de Prometheus)")
+    ap.add_argument("--bd", default=RESULTADOS_RUTA, metavar="RUTA", help=f"base de resultados (por defecto {RESULTADOS_RUTA})")
+    ap.add_argument("--sin-bd", action="store_true", help="no guardar los resultados en la base")
+    ap.add_argument("--desde-cero", action="store_true", help="ignorar el punto de control y sobrescribir la salida")
+    a=ap.parse_args(argv)
+    cache_disco.configurar(activa=not a.sin_cache, fresco=a.fresco)
+    limitador.configurar(a.rps, a.rafaga)
+    navegadores.configurar(headless=True if a.headless else None, ligero=not a.completo)
+    if a.perfil or a.metricas: metricas.activar()
+
+    indice=cargar_indice(a.sitios)
+    if not indice.total_metodos:
+        log("ERROR", f"No encontré {a.sitios} o está vacío."); return 2
+    avisar_recrear(indice)
+    n_nav, n_sitios = resumen(indice.sitios)
+    # sin ningún método que lo necesite, el navegador ni se arranca
+    if a.navegador: recursos.preparar_sesion(indice)
+    POOL_NAVEGADORES.redimensionar(a.navegadores)     # el semáforo del escáner y el pool, mismo tope
+    use_browser=bool(a.navegador and n_nav and SELENIUM_OK and POOL_NAVEGADORES.iniciar())
+    if a.navegador: log("LOTE", f"Navegador solo en {n_nav} de {n_sitios} sitio(s); el resto va por HTTP.")
+    historial=Historial.de(a.sitios)
+    escaner=Escaner(use_browser, a.concurrencia, a.por_host, a.navegadores, a.timeout, a.streaming, a.max_cuerpo, a.procesos,
+                    historial, not a.todos)
+
+    ckpt:Optional[PuntoControl]=None
+    if a.salida=="-":
+        salida:TextIO=sys.stdout
+    else:
+        ruta_ckpt=a.salida+".ckpt"
+        if a.desde_cero and os.path.exists(ruta_ckpt): os.remove(ruta_ckpt)
+        ckpt=PuntoControl(ruta_ckpt)
+        salida=open(a.salida, "a+" if not a.desde_cero else "w", encoding="utf-8")
+        if ckpt.hechos:
+            salida.truncate(ckpt.offset); salida.seek(ckpt.offset)
+            log("LOTE", f"Reanudando: {len(ckpt.hechos)} usuario(s) ya terminados.")
+        else:
+            salida.truncate(0)
+    bd=None if a.sin_bd else AlmacenResultados(a.bd)
+    try:
+        stats=asyncio.run(correr_lote(leer_usuarios(a.usuarios), salida, indice, escaner, ckpt, bd))
+    except KeyboardInterrupt:
+        log("LOTE", "Interrumpido; vuelve a lanzar el mismo comando para continuar."); return 130
+    finally:
+        if salida is not sys.stdout: salida.close()
+        POOL_NAVEGADORES.cerrar(); historial.guardar()
+        if bd: bd.cerrar()
+    log("LOTE", f"Terminado: {stats['usuarios']} usuario(s), {stats['omitidos']} ya hechos, {stats['existe']} coincidencias.")
+    frenados=limitador.limitador_compartido().frenados()
+    if frenados: log("LIMITE", "Hosts frenados por 429/CAPTCHA (rps actual): "+", ".join(f"{h}={r}" for h,r in frenados.items()))
+    if a.perfil: print(metricas.REGISTRO.informe(), file=sys.stderr, flush=True)
+    if a.metricas:
+        metricas.REGISTRO.exportar(a.metricas); log("LOTE", f"Métricas en {a.metricas}")
+    return 0
+
+if __name__=="__main__": sys.exit(main())
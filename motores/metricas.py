@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de tiempo – Ojo de Zeus 2
+– Cronometra cada etapa del escaneo y la suma por sitio, por tipo de método y en total:
+    http.cola        espera por cupo del host/pool antes de tocar la red
+    http.conexion    DNS + TCP (httpcore los mide juntos; 0 si se reutiliza una conexión keep-alive)
+    http.tls         handshake TLS
+    http.espera      desde enviar la petición hasta recibir las cabeceras (TTFB)
+    http.cuerpo      lectura del cuerpo
+    http.limitador / http.reintento   pausas del limitador y esperas entre reintentos
+    http.total       fetch_http completo (Resp.took_ms)
+    selenium.*       arranque del driver, get, listo (red/DOM/URL quietos, motores/listo.py), total
+    firma, analisis_html, heuristica, extraccion, sitio (de principio a fin), timeout
+    descarga         solo por tipo de método: lo que tardó la URL de la que dependía
+– Desactivadas por defecto: sin activar() cada punto de medida es una comprobación de un booleano.
+– El sitio se toma del contexto (contextvars): lo fija el escáner para cada sitio y lo heredan las
+  tareas y los hilos de asyncio.to_thread. Una URL compartida se apunta al sitio que la pidió primero.
+– En los procesos del pool de CPU (motores/procesos.py) lo medido se captura y el principal lo
+  vuelve a apuntar en el sitio que corresponde (capturar / reanotar).
+– Timeouts: HTTP, y páginas del navegador que no llegaron a estar listas antes del tope.
+– informe(): sitios más lentos, etapas más lentas y tiempo perdido en timeouts.
+  exportar(ruta): JSON si acaba en .json; si no, texto de Prometheus.
+"""
+
+import contextvars, json, threading, time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+METRICAS_ACTIVAS=False
+PREFIJO_PROM="ojo_de_zeus"
+
+_SITIO:contextvars.ContextVar[Optional[str]]=contextvars.ContextVar("sitio", default=None)
+_NULO=nullcontext()
+Evento = Tuple[str, float, Optional[str], bool]       # (etapa, segundos, metodo, solo_metodo)
+_CAPTURA:Optional[List[Evento]]=None
+
+@dataclass
+class Serie:
+    n:int=0; total:float=0.0; maximo:float=0.0
+
+    def sumar(self, s:float)->None:
+        self.n+=1; self.total+=s
+        if s>self.maximo: self.maximo=s
+
+    @property
+    def media(self)->float:
+        return self.total/self.n if self.n else 0.0
+
+class Metricas:
+    """Acumulador seguro entre hilos (el escáner apunta desde el loop y desde hilos de Selenium)."""
+    def __init__(self):
+        self._lock=threading.Lock()
+        self.etapas:Dict[str,Serie]={}
+        self.sitios:Dict[str,Dict[str,Serie]]={}
+        self.metodos:Dict[str,Dict[str,Serie]]={}
+
+    def anotar(self, etapa:str, segundos:float, sitio:Optional[str]=None, metodo:Optional[str]=None,
+               solo_metodo:bool=False)->None:
+        """`solo_metodo`: tiempo ya contado en otra etapa que solo se reparte por tipo de método."""
+        with self._lock:
+            if metodo is not None: _serie(self.metodos.setdefault(metodo,{}), etapa).sumar(segundos)
+            if solo_metodo: return
+            _serie(self.etapas, etapa).sumar(segundos)
+            if sitio is not None: _serie(self.sitios.setdefault(sitio,{}), etapa).sumar(segundos)
+
+    def vaciar(self)->None:
+        with self._lock:
+            self.etapas={}; self.sitios={}; self.metodos={}
+
+    # ===== Salidas =====
+    def a_dict(self)->Dict[str,Any]:
+        def _d(series:Dict[str,Serie])->Dict[str,Dict[str,float]]:
+            return {k:{"n":s.n, "total_s":round(s.total,4), "media_ms":round(s.media*1000,1), "max_ms":round(s.maximo*1000,1)}
+                    for k,s in sorted(series.items())}
+        with self._lock:
+            return {"etapas":_d(self.etapas),
+                    "sitios":{k:_d(v) for k,v in sorted(self.sitios.items())},
+                    "metodos":{k:_d(v) for k,v in sorted(self.metodos.items())}}
+
+    def a_prometheus(self)->str:
+        lineas:List[str]=[]
+        def _familia(nombre:str, ayuda:str, filas:List[Tuple[Dict[str,str],Serie]])->None:
+            m=f"{PREFIJO_PROM}_{nombre}_segundos"
+            lineas.extend([f"# HELP {m} {ayuda}", f"# TYPE {m} summary"])
+            for etiquetas, s in filas:
+                e=",".join(f'{k}="{_escapar(v)}"' for k,v in etiquetas.items())
+                lineas.append(f"{m}_sum{{{e}}} {s.total:.6f}"); lineas.append(f"{m}_count{{{e}}} {s.n}")
+        with self._lock:
+            _familia("etapa", "Tiempo por etapa del escaneo.", [({"etapa":k}, s) for k,s in sorted(self.etapas.items())])
+            _familia("sitio", "Tiempo por sitio y etapa.",
+                     [({"sitio":si, "etapa":k}, s) for si,d in sorted(self.sitios.items()) for k,s in sorted(d.items())])
+            _familia("metodo", "Tiempo por tipo de método y etapa.",
+                     [({"metodo":me, "etapa":k}, s) for me,d in sorted(self.metodos.items()) for k,s in sorted(d.items())])
+            m=f"{PREFIJO_PROM}_etapa_max_segundos"
+            lineas.extend([f"# HELP {m} Peor caso por etapa.", f"# TYPE {m} gauge"])
+            lineas.extend(f'{m}{{etapa="{_escapar(k)}"}} {s.maximo:.6f}' for k,s in sorted(self.etapas.items()))
+        return "\n".join(lineas)+"\n"
+
+    def informe(self, n:int=10)->str:
+        """Texto para la terminal: sitios y etapas más lentos, y lo perdido en timeouts."""
+        with self._lock:
+            etapas=dict(self.etapas); sitios={k:dict(v) for k,v in self.sitios.items()}
+        if not etapas: return "Sin métricas (¿se activaron antes del escaneo?)."
+        out=["⏱️  Perfil de tiempos", "", f"Sitios más lentos (media de principio a fin, top {n}):"]
+        lentos=sorted(((d["sitio"].media, k, d) for k,d in sitios.items() if "sitio" in d), reverse=True)[:n]
+        for media, k, d in lentos:
+            peor=max(((s.total, e) for e,s in d.items() if e!="sitio"), default=(0.0, "-"))
+            out.append(f"  {k:28s} {media*1000:9.0f} ms   (más tiempo en {peor[1]}: {peor[0]*1000:.0f} ms)")
+        out+=["", "Etapas (tiempo acumulado):"]
+        for k,s in sorted(etapas.items(), key=lambda kv: kv[1].total, reverse=True):
+            if k in ("sitio","timeout"): continue
+            out.append(f"  {k:20s} {s.total:9.2f} s   n={s.n:<6d} media {s.media*1000:8.1f} ms   máx {s.maximo*1000:8.1f} ms")
+        to=etapas.get("timeout")
+        out+=["", f"Timeouts: {to.n if to else 0}, {to.total if to else 0.0:.1f} s perdidos"]
+        if to:
+            peores=sorted(((d["timeout"].total, k) for k,d in sitios.items() if "timeout" in d), reverse=True)[:n]
+            out+=[f"  {k:28s} {s:9.1f} s" for s,k in peores]
+        return "\n".join(out)
+
+    def exportar(self, ruta:str)->None:
+        with open(ruta, "w", encoding="utf-8") as f:
+            if ruta.lower().endswith(".json"): json.dump(self.a_dict(), f, indent=2, ensure_ascii=False)
+            else: f.write(self.a_prometheus())
+
+def _serie(d:Dict[str,Serie], k:str)->Serie:
+    s=d.get(k)
+    if s is None: s=d[k]=Serie()
+    return s
+
+def _escapar(v:str)->str:
+    return v.replace("\\","\\\\").replace('"','\\"').replace("\n","\\n")
+
+# ===== Registro único por proceso =====
+REGISTRO=Metricas()
+
+def activar(activas:bool=True)->None:
+    global METRICAS_ACTIVAS
+    METRICAS_ACTIVAS=activas
+
+def anotar(etapa:str, segundos:float, metodo:Optional[str]=None)->None:
+    if not METRICAS_ACTIVAS: return
+    if _CAPTURA is not None: _CAPTURA.append((etapa, segundos, metodo, False))
+    else: REGISTRO.anotar(etapa, segundos, _SITIO.get(), metodo)
+
+def anotar_metodo(metodo:str, etapa:str, segundos:float)->None:
+    if not METRICAS_ACTIVAS: return
+    if _CAPTURA is not None: _CAPTURA.append((etapa, segundos, metodo, True))
+    else: REGISTRO.anotar(etapa, segundos, metodo=metodo, solo_metodo=True)
+
+@contextmanager
+def capturar(activas:bool)->Iterator[List[Evento]]:
+    """Proceso trabajador: junta lo medido dentro para devolverlo al principal (una tarea a la vez)."""
+    global _CAPTURA
+    activar(activas); _CAPTURA=eventos=[]
+    try: yield eventos
+    finally: _CAPTURA=None
+
+def reanotar(eventos:List[Evento])->None:
+    """Principal: apunta lo capturado en un trabajador como si se hubiera medido aquí."""
+    if not METRICAS_ACTIVAS: return
+    sitio=_SITIO.get()
+    for etapa_, s, metodo, solo in eventos: REGISTRO.anotar(etapa_, s, sitio, metodo, solo)
+
+def etapa(nombre:str, metodo:Optional[str]=None):
+    """`with etapa("heuristica"): …` — no hace nada si las métricas están desactivadas."""
+    return _cronometro(nombre, metodo) if METRICAS_ACTIVAS else _NULO
+
+@contextmanager
+def _cronometro(nombre:str, metodo:Optional[str])->Iterator[None]:
+    t0=time.perf_counter()
+    try: yield
+    finally: anotar(nombre, time.perf_counter()-t0, metodo)
+
+@contextmanager
+def en_sitio(nombre:str)->Iterator[None]:
+    """Lo que se mida dentro (también en tareas e hilos lanzados desde aquí) cuenta para `nombre`."""
+    tok=_SITIO.set(nombre)
+    try: yield
+    finally: _SITIO.reset(tok)
+
+def es_timeout(e:BaseException)->bool:
+    """httpx.*Timeout, requests Timeout, selenium TimeoutException, asyncio/socket timeouts."""
+    return isinstance(e, TimeoutError) or "Timeout" in type(e).__name__
+
+# ===== Traza de httpx (extensions={"trace": …}) =====
+class TrazaHTTP:
+    """Convierte los eventos de httpcore de una petición en etapas http.*; `fin()` al terminar de leer.
+    Con redirecciones cada salto vuelve a emitir eventos: los tramos se suman."""
+    TRAMOS={"connect_tcp":"http.conexion", "start_tls":"http.tls"}
+
+    def __init__(self):
+        self.t0=time.perf_counter(); self.red:Optional[float]=None; self.cabeceras:Optional[float]=None
+        self.inicios:Dict[str,float]={}; self.suma:Dict[str,float]={}
+
+    def evento(self, nombre:str, info:Dict[str,Any])->None:
+        # "connection.connect_tcp.started", "http11.receive_response_headers.complete", "http2.…"
+        ahora=time.perf_counter()
+        paso, _, fase=nombre.partition(".")[2].rpartition(".")
+        if paso=="send_request_headers" and fase=="started": paso="espera"
+        elif paso=="receive_response_headers" and fase=="complete":
+            paso="espera"; self.cabeceras=ahora
+        elif paso not in self.TRAMOS: return
+        if fase=="started":
+            if self.red is None: self.red=ahora
+            self.inicios[paso]=ahora
+        elif fase=="complete" and paso in self.inicios:
+            self.suma[paso]=self.suma.get(paso,0.0)+ahora-self.inicios.pop(paso)
+
+    async def aevento(self, nombre:str, info:Dict[str,Any])->None:
+        self.evento(nombre, info)
+
+    def extensiones(self, asincrono:bool=False)->Dict[str,Any]:
+        return {"trace": self.aevento if asincrono else self.evento}
+
+    def fin(self)->None:
+        if not METRICAS_ACTIVAS: return
+        if self.red is not None: anotar("http.cola", self.red-self.t0)
+        for paso, s in self.suma.items(): anotar(self.TRAMOS.get(paso, "http.espera"), s)
+        if self.cabeceras is not None: anotar("http.cuerpo", time.perf_counter()-self.cabeceras)
+
+def traza_http()->Optional[TrazaHTTP]:
+    return TrazaHTTP() if METRICAS_ACTIVAS else None
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Minado de claves – Ojo de Zeus 2 (creador: html_contains / status_code_y_texto)
+– Antes: las 80 palabras más frecuentes de cada página, intersección entre reales menos la de falsos.
+  Entraban restos de scripts y estilos (910fmf, aemdhvv) que cambian en el siguiente despliegue,
+  y el orden alfabético decidía cuáles 5 usaba el buscador.
+– Ahora: frecuencia de documento de cada término (presencia) en TODAS las muestras reales y falsas a la
+  vez, sobre el texto visible (sin scripts, estilos, comentarios ni entidades), y cada término que
+  aparece en alguna muestra se puntúa por lo que discrimina: df_real − df_falso (fracción de documentos)
+  y, para desempatar, chi².
+– Candidatos: df_real ≥ MINADO_MIN_DF_REAL, no la intersección estricta (una página real rara ya no
+  deja sin claves al sitio). Como html_contains exige TODAS sus claves, el conjunto elegido debe
+  seguir estando entero en esa fracción de los reales.
+  Se eligen en orden de puntuación hasta que cada falso carece de al menos MINADO_REDUNDANCIA de
+  ellas, con un tope de MINADO_MAX_CLAVES: pocas claves = menos que se pueda romper.
+  La ausencia en los falsos se comprueba en su HTML completo, como lo mira el buscador.
+– Fuera: tokens con dígitos, rachas de consonantes, hex/base64, los usuarios de muestra y
+  palabras de interfaz genéricas.
+– El tokenizado va al pool de procesos si las páginas son grandes (motores/procesos.py).
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Sequence
+
+from motores import procesos
+from motores.coincidencias import BuscadorClaves
+
+MINADO_MIN_LEN=4
+MINADO_MAX_LEN=24
+MINADO_MAX_CLAVES=5             # lo que usa el buscador de cada método
+MINADO_REDUNDANCIA=2            # claves ausentes por falso (aguanta que una aparezca tras un despliegue)
+MINADO_MIN_DF_REAL=0.8          # fracción mínima de reales con el término (y con el conjunto elegido entero)
+
+GENERICAS=frozenset({
+    "home","login","about","contact","cookies","terms","policy","help","explore","search","privacy",
+    "sign","signup","account","password","email","download","language","english","español",
+})
+
+_INVISIBLE=re.compile(r"<!--.*?-->|<(script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>", re.S|re.I)
+_ETIQUETA=re.compile(r"<[^>]+>")
+_ENTIDAD=re.compile(r"&#?\w+;")
+_TOKEN=re.compile(r"[a-zA-ZáéíóúüñÁÉÍÓÚÜÑ]{%d,%d}" % (MINADO_MIN_LEN, MINADO_MAX_LEN))
+_CONSONANTES=re.compile(r"[bcdfghjklmnpqrstvwxz]{5,}")
+_VOCALES=re.compile(r"[aeiouáéíóúü]")
+
+@dataclass(frozen=True)
+class Termino:
+    termino:str; df_real:float; df_falso:float; chi2:float
+
+    @property
+    def puntuacion(self)->float:
+        return self.df_real-self.df_falso
+
+def es_basura(t:str)->bool:
+    """Restos de código o identificadores: sin vocales suficientes o con rachas de consonantes."""
+    return bool(_CONSONANTES.search(t)) or len(_VOCALES.findall(t))*5<len(t)
+
+def terminos(texto:str)->FrozenSet[str]:
+    """Términos del texto visible, en minúsculas y sin basura (lo que se puede buscar luego con `in`)."""
+    texto=_ENTIDAD.sub(" ", _ETIQUETA.sub(" ", _INVISIBLE.sub(" ", texto)))
+    # el token entero debe ser la palabra: "abc123def" no deja "abc"/"def" sueltos
+    out=set()
+    for m in _TOKEN.finditer(texto):
+        ini, fin = m.span()
+        if (ini and (texto[ini-1].isalnum() or texto[ini-1]=="_")) or (fin<len(texto) and (texto[fin].isalnum() or texto[fin]=="_")):
+            continue
+        t=m.group(0).lower()
+        if t not in GENERICAS and not es_basura(t): out.add(t)
+    return frozenset(out)
+
+def _chi2(a:float, b:float, c:float, d:float)->float:
+    """2×2: a reales con el término, b falsos con él, c reales sin él, d falsos sin él."""
+    n=a+b+c+d; den=(a+b)*(c+d)*(a+c)*(b+d)
+    return n*(a*d-b*c)**2/den if den else 0.0
+
+def puntuar(reales:Sequence[FrozenSet[str]], falsos:Sequence[FrozenSet[str]],
+            min_df_real:float=MINADO_MIN_DF_REAL)->List[Termino]:
+    """
+    Todos los términos de las muestras, contados en una pasada sobre reales y falsos; salen los que están
+    en al menos `min_df_real` de los reales, de más a menos discriminante (empates: chi², alfabético).
+    """
+    if not reales: return []
+    nr, nf = len(reales), len(falsos)
+    con_real:Counter=Counter(); con_falso:Counter=Counter()
+    for cuenta, docs in ((con_real, reales), (con_falso, falsos)):
+        for doc in docs: cuenta.update(doc)
+    minimo=min_df_real*nr-1e-9
+    out=[Termino(t, a/nr, (con_falso[t]/nf if nf else 0.0), _chi2(a, con_falso[t], nr-a, nf-con_falso[t]))
+         for t,a in con_real.items() if a>=minimo]
+    return sorted(out, key=lambda x: (-x.puntuacion, -x.chi2, x.termino))
+
+def elegir(puntuados:Sequence[Termino], reales:Sequence[FrozenSet[str]], falsos_html:Sequence[str],
+           max_claves:int=MINADO_MAX_CLAVES, redundancia:int=MINADO_REDUNDANCIA,
+           min_df_real:float=MINADO_MIN_DF_REAL)->List[str]:
+    """
+    Conjunto mínimo en orden de puntuación: se añade hasta que cada falso carece de `redundancia`
+    claves (o se llega al tope). Solo términos que faltan en algún falso (si no, no discriminan) y que
+    dejan el conjunto entero en al menos `min_df_real` de los reales (html_contains exige todas).
+    """
+    presentes=[]
+    if falsos_html:
+        for html in falsos_html:
+            b=BuscadorClaves(t.termino for t in puntuados); b.alimentar(html.lower()); presentes.append(b.encontradas)
+    elegidas:List[str]=[]; faltan=[0]*len(falsos_html)
+    cubiertos=list(range(len(reales)))       # reales que tienen todas las elegidas
+    for t in puntuados:
+        if len(elegidas)>=max_claves: break
+        if falsos_html and all(t.termino in p for p in presentes): continue
+        siguen=[i for i in cubiertos if t.termino in reales[i]]
+        if reales and len(siguen)<min_df_real*len(reales)-1e-9: continue
+        elegidas.append(t.termino); cubiertos=siguen
+        for i,p in enumerate(presentes):
+            if t.termino not in p: faltan[i]+=1
+        if falsos_html and min(faltan)>=redundancia: break
+    return elegidas
+
+def minar(textos_reales:Sequence[str], textos_falsos:Sequence[str], excluir:Iterable[str]=(),
+          max_claves:int=MINADO_MAX_CLAVES)->List[str]:
+    """Claves para html_contains: en casi todos los reales y ausentes en los falsos. `excluir`: usuarios de muestra."""
+    docs=procesos.mapear(terminos, list(textos_reales)+list(textos_falsos))
+    fuera={e.lower() for e in excluir if e}
+    trozos={p for e in fuera for p in re.split(r"[^a-záéíóúüñ]+", e) if len(p)>=MINADO_MIN_LEN}
+    reales=[frozenset(t for t in d if t not in trozos and not any(e in t for e in fuera)) for d in docs[:len(textos_reales)]]
+    return elegir(puntuar(reales, docs[len(textos_reales):]), reales, textos_falsos, max_claves)
@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de navegadores – Ojo de Zeus 2
+– Arranca N navegadores reales (Firefox/Chromium) UNA vez y los presta a cada página.
+– Entre usos limpia el estado: pestañas extra, cookies, localStorage/sessionStorage, about:blank.
+– Recicla una instancia tras NAVEGADOR_MAX_PAGINAS páginas o si deja de responder (crash).
+– La fábrica es el get_webdriver() de cada motor, así conservan sus propias rutas; las opciones de
+  arranque son comunes (opciones_firefox / opciones_chromium):
+    – sin pantalla (Linux sin DISPLAY) el navegador arranca sin ventana (headless) en vez de caer a HTTP;
+      configurar(headless=True) lo fuerza también con pantalla (servidores con Xvfb)
+    – modo ligero: sin autoplay de audio/vídeo y ventana reducida; Firefox además sin imágenes ni fuentes
+      descargables y con protección contra rastreadores. En Chromium eso lo bloquea la política de
+      recursos de cada página (motores/recursos.py). El DOM y la URL final no cambian
+    – Firefox fija esas preferencias al arrancar: las clases que algún sitio de la sesión permite
+      (permitir_firefox, desde recursos.preparar_sesion) se dejan sin bloquear para toda la sesión
+    – Chromium sin ventana se anuncia como "HeadlessChrome": se corrige el User-Agent tras arrancar
+"""
+
+import atexit, os, platform, threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+NAVEGADORES_POOL=2           # instancias simultáneas como máximo
+NAVEGADOR_MAX_PAGINAS=40     # páginas antes de reciclar una instancia (memoria/fugas del navegador)
+NAVEGADOR_ESPERA_S=300       # seg. máximos esperando una instancia libre
+
+NAVEGADOR_ANCHO=1280         # ventana reducida: menos que pintar y menos memoria por pestaña
+NAVEGADOR_ALTO=800
+
+Fabrica = Callable[[], Tuple[Optional[str], Any]]
+
+# ===== Opciones de arranque =====
+_CONFIG:Dict[str,Any]={"headless":None, "ligero":True, "firefox_permitir":frozenset()}
+
+def configurar(headless:Optional[bool]=None, ligero:bool=True)->None:
+    """`headless`: None = solo sin pantalla; True/False lo fuerza. `ligero`: recortar lo que no cambia el DOM."""
+    _CONFIG.update(headless=headless, ligero=ligero)
+
+def permitir_firefox(clases:Iterable[str])->None:
+    """Clases de recursos (recursos.CLASES) que los Firefox que se arranquen desde ahora no bloquean."""
+    _CONFIG["firefox_permitir"]=frozenset(clases)
+
+def permitidas_firefox()->FrozenSet[str]:
+    return _CONFIG["firefox_permitir"]
+
+def es_ligero()->bool:
+    return bool(_CONFIG["ligero"])
+
+def hay_pantalla()->bool:
+    if platform.system().lower()=="linux": return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+def sin_ventana()->bool:
+    h=_CONFIG["headless"]
+    return (not hay_pantalla()) if h is None else bool(h)
+
+FIREFOX_LIGERO={
+    "permissions.default.image": 2,                  # sin imágenes
+    "gfx.downloadable_fonts.enabled": False,         # sin fuentes web
+    "media.autoplay.default": 5,                     # sin autoplay de audio ni vídeo
+    "media.autoplay.blocking_policy": 2,
+    "privacy.trackingprotection.enabled": True,      # lista de rastreadores de Firefox
+    "privacy.trackingprotection.socialtracking.enabled": True,
+    "privacy.trackingprotection.cryptomining.enabled": True,
+    "privacy.trackingprotection.fingerprinting.enabled": True,
+    "browser.shell.checkDefaultBrowser": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+}
+# preferencias de FIREFOX_LIGERO que bloquean cada clase de recursos (recursos.CLASES)
+FIREFOX_CLASES={
+    "imagen": ("permissions.default.image",),
+    "fuente": ("gfx.downloadable_fonts.enabled",),
+    "media": ("media.autoplay.default", "media.autoplay.blocking_policy"),
+    "rastreador": ("privacy.trackingprotection.enabled", "privacy.trackingprotection.socialtracking.enabled",
+                   "privacy.trackingprotection.cryptomining.enabled", "privacy.trackingprotection.fingerprinting.enabled"),
+}
+CHROMIUM_LIGERO_PREFS={
+    "profile.default_content_setting_values.notifications": 2,
+}
+# imágenes, fuentes, vídeo y rastreadores: por página con CDP (motores/recursos.py), así un sitio puede permitirlos
+CHROMIUM_LIGERO_ARGS=("--autoplay-policy=user-gesture-required", "--mute-audio",
+                      "--disable-extensions", "--disable-background-networking", "--disable-sync",
+                      "--disable-default-apps", "--no-first-run", "--disable-features=Translate,MediaRouter")
+
+def opciones_firefox(opts:Any)->Any:
+    if sin_ventana(): opts.add_argument("-headless")
+    if _CONFIG["ligero"]:
+        sueltas={k for c in _CONFIG["firefox_permitir"] for k in FIREFOX_CLASES.get(c,())}
+        for k,v in FIREFOX_LIGERO.items():
+            if k not in sueltas: opts.set_preference(k, v)
+        opts.add_argument(f"--width={NAVEGADOR_ANCHO}"); opts.add_argument(f"--height={NAVEGADOR_ALTO}")
+    return opts
+
+def opciones_chromium(opts:Any)->Any:
+    if sin_ventana():
+        opts.add_argument("--headless=new"); opts.add_argument("--disable-gpu")
+        opts.add_argument("--disable-dev-shm-usage")            # /dev/shm pequeño en contenedores
+        if hasattr(os, "geteuid") and os.geteuid()==0: opts.add_argument("--no-sandbox")
+    if _CONFIG["ligero"]:
+        for a in CHROMIUM_LIGERO_ARGS: opts.add_argument(a)
+        opts.add_experimental_option("prefs", dict(CHROMIUM_LIGERO_PREFS))
+        opts.add_argument(f"--window-size={NAVEGADOR_ANCHO},{NAVEGADOR_ALTO}")
+    return opts
+
+def preparar(nombre:str, driver:Any)->None:
+    """Tras arrancar: Chromium sin ventana lleva "HeadlessChrome" en el User-Agent (muchos sitios lo bloquean)."""
+    if nombre!="chromium" or not sin_ventana(): return
+    try:
+        ua=driver.execute_script("return navigator.userAgent") or ""
+        if "Headless" in ua:
+            driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": ua.replace("HeadlessChrome", "Chrome")})
+    except Exception:
+        pass
+
+class Instancia:
+    def __init__(self, nombre:str, driver:Any):
+        self.nombre=nombre; self.driver=driver; self.paginas=0; self.rota=False
+
+    def marcar_rota(self)->None:
+        self.rota=True
+
+    def limpiar(self)->bool:
+        """Deja el navegador como recién abierto. False si no responde (se recicla)."""
+        drv=self.driver
+        try:
+            handles=drv.window_handles
+            for h in handles[1:]:
+                drv.switch_to.window(h); drv.close()
+            drv.switch_to.window(handles[0])
+            try: drv.execute_script("try{localStorage.clear();sessionStorage.clear();}catch(e){}")
+            except Exception: pass
+            drv.delete_all_cookies()
+            drv.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def cerrar(self)->None:
+        try: self.driver.quit()
+        except Exception: pass
+
+class PoolNavegadores:
+    def __init__(self, fabrica:Fabrica, tamano:int=NAVEGADORES_POOL, max_paginas:int=NAVEGADOR_MAX_PAGINAS):
+        self.fabrica=fabrica; self.tamano=max(1,tamano); self.max_paginas=max(1,max_paginas)
+        self._libres:List[Instancia]=[]
+        self._vivas=0; self._cond=threading.Condition()
+        self._sin_navegador=False      # la fábrica ya falló: no reintentar en cada página
+        _POOLS.append(self)
+
+    def _crear(self)->Optional[Instancia]:
+        try: nombre, drv = self.fabrica()
+        except Exception: nombre, drv = None, None
+        if not drv:
+            with self._cond:
+                self._vivas-=1; self._sin_navegador=(self._vivas==0); self._cond.notify_all()
+            return None
+        return Instancia(nombre or "navegador", drv)
+
+    def _tomar(self)->Optional[Instancia]:
+        with self._cond:
+            while True:
+                if self._libres: return self._libres.pop()
+                if self._sin_navegador: return None
+                if self._vivas<self.tamano:
+                    self._vivas+=1; break
+                if not self._cond.wait(timeout=NAVEGADOR_ESPERA_S): return None
+        return self._crear()    # fuera del candado: arrancar un navegador tarda segundos
+
+    def redimensionar(self, tamano:int)->None:
+        """Instancias simultáneas como máximo (p. ej. lote --navegadores); si baja, las que sobran se cierran al devolverse."""
+        with self._cond:
+            self.tamano=max(1,tamano); self._cond.notify_all()
+
+    def _devolver(self, inst:Instancia)->None:
+        inst.paginas+=1
+        with self._cond: sobra=self._vivas>self.tamano
+        sana=(not inst.rota) and not sobra and inst.paginas<self.max_paginas and inst.limpiar()
+        if not sana: inst.cerrar()
+        with self._cond:
+            if sana: self._libres.append(inst)
+            else: self._vivas-=1
+            self._cond.notify()
+
+    def iniciar(self, n:Optional[int]=None)->Optional[str]:
+        """Arranca `n` instancias ya (por defecto 1, para comprobar que hay navegador). Devuelve su nombre o None."""
+        arrancadas:List[Instancia]=[]
+        for _ in range(min(self.tamano, max(1, n or 1))):
+            inst=self._tomar()
+            if inst is None: break
+            arrancadas.append(inst)
+        with self._cond:
+            self._libres.extend(arrancadas); self._cond.notify_all()
+        return arrancadas[0].nombre if arrancadas else None
+
+    @contextmanager
+    def usar(self)->Iterator[Optional[Instancia]]:
+        """Presta una instancia (None si no hay navegador). Una excepción dentro la marca como rota."""
+        inst=self._tomar()
+        try:
+            yield inst
+        except BaseException:
+            if inst: inst.marcar_rota()
+            raise
+        finally:
+            if inst: self._devolver(inst)
+
+    def cerrar(self)->None:
+        """Cierra las instancias libres; las prestadas vuelven al pool al devolverse."""
+        with self._cond:
+            libres=self._libres; self._libres=[]
+            self._vivas-=len(libres); self._sin_navegador=False
+        for inst in libres: inst.cerrar()
+
+_POOLS:List[PoolNavegadores]=[]
+
+@atexit.register
+def _cerrar_todos()->None:
+    for p in _POOLS: p.cerrar()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Planificador de descargas – Ojo de Zeus 2
+– Decide por método (y por sitio) si hace falta el navegador real o basta HTTP:
+    "modo_fetch": "http" | "navegador"   en cada método de sitios.json (lo escribe el creador)
+– Sin ese campo (métodos antiguos) se deduce del tipo de método:
+    status_code, json_response_check     → http (solo leen el status/JSON de la respuesta HTTP)
+    custom_selector_check                → navegador (mira el DOM real)
+    url_check, redirect_check            → navegador (la URL "estabilizada" puede venir de un redirect por JS),
+                                           salvo sin outcomes: no pueden decidir nada y no merecen un navegador
+    resto (claves, huella_dom)           → http
+– Un sitio marcado "js_renderizado": true (en cualquiera de sus métodos) va entero por navegador.
+– El escáner solo abre el navegador para una URL si alguno de sus métodos lo necesita, y los métodos
+  "http" se evalúan sin el DOM del navegador (igual que cuando el creador los aprendió).
+"""
+
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+MODO_HTTP="http"
+MODO_NAVEGADOR="navegador"
+MODOS_FETCH=(MODO_HTTP, MODO_NAVEGADOR)
+
+METODOS_SOLO_HTTP=frozenset({"status_code","json_response_check"})
+METODOS_SOLO_NAVEGADOR=frozenset({"custom_selector_check"})
+# Sin "modo_fetch" guardado: lo que se asume para métodos creados antes del planificador
+MODO_ANTIGUO={"url_check":MODO_NAVEGADOR, "redirect_check":MODO_NAVEGADOR}
+
+def sitio_js(metodos:Iterable[Dict[str,Any]])->bool:
+    """¿Algún método del sitio lo marca como renderizado por JS?"""
+    return any(bool((m or {}).get("js_renderizado")) for m in metodos)
+
+def modo_de(m:Dict[str,Any], js:bool=False, con_outcomes:Optional[bool]=None)->str:
+    """
+    Modo de descarga de un método (entrada de sitios.json); `js`: su sitio está marcado js_renderizado.
+    `con_outcomes`: si le quedan outcomes con los que decidir (por defecto, si `m` guarda alguno).
+    """
+    metodo=m.get("metodo","")
+    if metodo in METODOS_SOLO_HTTP: return MODO_HTTP
+    if metodo in METODOS_SOLO_NAVEGADOR or js: return MODO_NAVEGADOR
+    guardado=m.get("modo_fetch")
+    if guardado in MODOS_FETCH: return guardado
+    if con_outcomes is None: con_outcomes=bool(m.get("outcomes_real") or m.get("outcomes_fake"))
+    return MODO_ANTIGUO.get(metodo, MODO_HTTP) if con_outcomes else MODO_HTTP
+
+def necesita_navegador(metodos:Iterable[Any])->bool:
+    """`metodos`: MetodoCompilado (con .modo) de una misma URL."""
+    return any(mc.modo==MODO_NAVEGADOR for mc in metodos)
+
+def elegir_modo(metodo:str, con_navegador:Tuple[Set[str],Set[str]], solo_http:Tuple[Set[str],Set[str]],
+                hubo_navegador:bool)->str:
+    """
+    Creador: (outcomes reales, falsos) vistos con navegador+HTTP y solo con HTTP.
+    Si coinciden, el navegador no aporta nada para este método.
+    """
+    if metodo in METODOS_SOLO_NAVEGADOR: return MODO_NAVEGADOR
+    if metodo in METODOS_SOLO_HTTP or not hubo_navegador: return MODO_HTTP
+    return MODO_HTTP if con_navegador==solo_http else MODO_NAVEGADOR
+
+def resumen(sitios:Sequence[Any])->Tuple[int,int]:
+    """(sitios que necesitan navegador, total) de un IndiceMetodos."""
+    return sum(1 for s in sitios if necesita_navegador(s.metodos)), len(sitios)
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de CPU – Ojo de Zeus 2
+– Las etapas que solo gastan CPU (minúsculas y búsqueda de claves de las firmas, análisis del HTML,
+  heurística, extracción, tokenizado del creador) pueden correr en procesos aparte: así no frenan
+  el loop de asyncio que está descargando y aprovechan todos los núcleos en escaneos por lotes.
+– Los cuerpos grandes no viajan en el pickle: se escriben UNA vez (UTF-8) en memoria compartida
+  y el trabajador los lee de ahí; el proceso principal libera el segmento al recibir el resultado.
+  Los pequeños (< PROCESOS_MIN_BYTES) van dentro del pickle, que para ellos es más barato.
+– Procesos con "spawn": el principal tiene hilos (Selenium, asyncio.to_thread) y fork no es seguro.
+– Apagado por defecto fuera del modo lote; PROCESOS_AUTO = núcleos - 1 (0 en máquinas de un núcleo).
+"""
+
+import atexit, multiprocessing, os, threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Sequence, Union
+
+PROCESOS_AUTO=max(0, (os.cpu_count() or 1)-1)
+PROCESOS_MIN_BYTES=64*1024       # cuerpos desde este tamaño: memoria compartida (y sitios que merecen el viaje)
+
+@dataclass(frozen=True)
+class RefMemoria:
+    nombre:str; n:int
+
+Texto = Union[str, RefMemoria]
+
+class Memoria:
+    """Lado principal: `with Memoria() as mem: ref=mem.guardar(texto)`; al salir se liberan los segmentos."""
+    def __init__(self, min_bytes:int=PROCESOS_MIN_BYTES):
+        self.min_bytes=min_bytes; self._segmentos:List[shared_memory.SharedMemory]=[]
+
+    def guardar(self, texto:str)->Texto:
+        if len(texto)<self.min_bytes: return texto
+        datos=texto.encode("utf-8", "surrogatepass")
+        shm=shared_memory.SharedMemory(create=True, size=max(1,len(datos)))
+        shm.buf[:len(datos)]=datos
+        self._segmentos.append(shm)
+        return RefMemoria(shm.name, len(datos))
+
+    def __enter__(self)->"Memoria":
+        return self
+
+    def __exit__(self, *exc)->None:
+        for shm in self._segmentos:
+            try: shm.close(); shm.unlink()
+            except Exception: pass
+        self._segmentos=[]
+
+def leer(ref:Texto)->str:
+    """Lado trabajador: el texto tal cual o decodificado directamente del segmento compartido."""
+    if isinstance(ref, str): return ref
+    shm=shared_memory.SharedMemory(name=ref.nombre)
+    vista=shm.buf[:ref.n]
+    try: return str(vista, "utf-8", "surrogatepass")
+    finally:
+        vista.release(); shm.close()
+
+def _con_texto(fn:Callable[..., Any], ref:Texto, args:tuple)->Any:
+    return fn(leer(ref), *args)
+
+def _args(i:int, por_texto:Optional[Sequence[tuple]], extra:tuple)->tuple:
+    return (tuple(por_texto[i])+extra) if por_texto is not None else extra
+
+class PoolCPU:
+    """ProcessPoolExecutor con los trabajadores arrancados bajo demanda."""
+    def __init__(self, trabajadores:int=PROCESOS_AUTO):
+        self.trabajadores=max(1, trabajadores)
+        self._pool:Optional[ProcessPoolExecutor]=None; self._lock=threading.Lock()
+
+    def _ejecutor(self)->ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool=ProcessPoolExecutor(self.trabajadores, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def enviar(self, fn:Callable[..., Any], *args:Any)->"Future[Any]":
+        return self._ejecutor().submit(fn, *args)
+
+    def mapear(self, fn:Callable[..., Any], textos:Sequence[str], *extra:Any,
+               por_texto:Optional[Sequence[tuple]]=None)->List[Any]:
+        """
+        [fn(t, *por_texto[i], *extra) for i,t in enumerate(textos)] en los trabajadores,
+        con los textos grandes por memoria compartida.
+        """
+        with Memoria() as mem:
+            futs=[self.enviar(_con_texto, fn, mem.guardar(t), _args(i, por_texto, extra)) for i,t in enumerate(textos)]
+            return [f.result() for f in futs]
+
+    def cerrar(self)->None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None: pool.shutdown(wait=True, cancel_futures=True)
+
+# ===== Pool compartido (creador) =====
+_COMPARTIDO:Optional[PoolCPU]=None
+
+def pool_compartido()->Optional[PoolCPU]:
+    """None en máquinas de un núcleo: ahí los procesos solo añaden coste."""
+    global _COMPARTIDO
+    if PROCESOS_AUTO<=0: return None
+    if _COMPARTIDO is None: _COMPARTIDO=PoolCPU(PROCESOS_AUTO)
+    return _COMPARTIDO
+
+def mapear(fn:Callable[..., Any], textos:Sequence[str], *extra:Any,
+           por_texto:Optional[Sequence[tuple]]=None)->List[Any]:
+    """Como PoolCPU.mapear con el pool compartido; en el mismo proceso si el lote es pequeño o no hay núcleos."""
+    pool=pool_compartido()
+    if pool is not None and len(textos)>=2 and sum(len(t) for t in textos)>=PROCESOS_MIN_BYTES:
+        try: return pool.mapear(fn, textos, *extra, por_texto=por_texto)
+        except Exception:
+            pass        # pool roto: se hace aquí
+    return [fn(t, *_args(i, por_texto, extra)) for i,t in enumerate(textos)]
+
+@atexit.register
+def _cerrar_compartido()->None:
+    if _COMPARTIDO is not None: _COMPARTIDO.cerrar()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Puntuación de métodos – Ojo de Zeus 2
+– La decisión de un sitio es "cualquier No existe gana; si no, cualquier Existe": en cuanto un método
+  dice No existe, el resto del sitio ya no puede cambiar la respuesta.
+– Cada método recibe una puntuación = decisividad / coste:
+    decisividad  probabilidad de que diga No existe × acierto frente a la decisión final del sitio
+                 (historial de escaneos; sin historial, lo que guardó el creador en sitios.json:
+                 sin outcomes falsos nunca puede decir No existe, status BAD puntúa poco)
+    coste        HTTP 1, navegador COSTE_NAVEGADOR, más el tamaño medio del cuerpo visto
+– Las descargas de un sitio (URL por HTTP y, si hace falta, URL por navegador) se ordenan por la
+  mejor puntuación de sus métodos y van en olas: primero la más decisiva sola, luego el resto de
+  HTTP a la vez y al final el navegador. Al quedar decidido el sitio, lo que falta se omite.
+– Historial en <sitios.json>.puntos (JSON por metodo_id): se actualiza al terminar cada escaneo.
+  Al guardar se suma lo anotado en esta ejecución a lo que haya en el archivo, bajo candado (fcntl,
+  <sitios.json>.puntos.lock, como motores/almacen.py): varios trabajadores de la cola no se pisan.
+"""
+
+import json, os, threading
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from motores.indice import MetodoCompilado
+
+try:
+    import fcntl  # type: ignore
+    FCNTL_OK=True
+except Exception:
+    FCNTL_OK=False
+from motores.planificador import MODO_NAVEGADOR
+
+PUNTOS_SUFIJO=".puntos"
+COSTE_NAVEGADOR=10.0          # una página en navegador frente a una petición HTTP
+COSTE_BYTES=256*1024          # cada tanto de cuerpo medio suma 1 al coste
+PRIOR_N=2.0                   # peso (en escaneos) de lo que dice sitios.json frente al historial
+PRIOR_NO={"GOOD":0.5, "BAD":0.1}
+OMITIDO="[omitido: el sitio ya estaba decidido]"
+
+def clave_metodo(mc:MetodoCompilado)->str:
+    mid=mc.datos.get("metodo_id")
+    return str(mid) if isinstance(mid, int) else f"{mc.nombre}|{mc.metodo}|{mc.url_base}"
+
+@dataclass
+class Cuenta:
+    n:int=0; no:int=0; decisivos:int=0; aciertos:int=0; bytes:int=0
+
+    @property
+    def bytes_medios(self)->float:
+        return self.bytes/self.n if self.n else 0.0
+
+    def sumar(self, otra:"Cuenta")->None:
+        for f in fields(self): setattr(self, f.name, getattr(self, f.name)+getattr(otra, f.name))
+
+def _leer(ruta:str)->Dict[str,Cuenta]:
+    """Archivo roto o ausente: vacío (se reescribe al guardar)."""
+    try:
+        with open(ruta, "r", encoding="utf-8") as f: datos=json.load(f)
+        return {k:Cuenta(**{c:int(v.get(c,0)) for c in ("n","no","decisivos","aciertos","bytes")})
+                for k,v in datos.items() if isinstance(v, dict)}
+    except Exception:
+        return {}
+
+class Historial:
+    """Cuentas por método de escaneos anteriores; seguro entre hilos (el escáner anota desde el loop)."""
+    def __init__(self, ruta:Optional[str]=None):
+        self.ruta=ruta; self._lock=threading.Lock()
+        self.cuentas:Dict[str,Cuenta]=_leer(ruta) if (ruta and os.path.exists(ruta)) else {}
+        self._nuevas:Dict[str,Cuenta]={}     # lo anotado desde la última vez que se guardó
+
+    @classmethod
+    def de(cls, path_sitios:str="sitios.json")->"Historial":
+        return cls(path_sitios+PUNTOS_SUFIJO)
+
+    def cuenta(self, mc:MetodoCompilado)->Optional[Cuenta]:
+        return self.cuentas.get(clave_metodo(mc))
+
+    def anotar(self, mc:MetodoCompilado, decision:str, final:str, n_bytes:int)->None:
+        with self._lock:
+            clave=clave_metodo(mc)
+            for c in (self.cuentas.setdefault(clave, Cuenta()), self._nuevas.setdefault(clave, Cuenta())):
+                c.n+=1; c.bytes+=n_bytes
+                if decision=="No existe": c.no+=1
+                if decision in ("Existe","No existe"):
+                    c.decisivos+=1
+                    if decision==final: c.aciertos+=1
+
+    def guardar(self)->None:
+        """Suma lo nuevo a lo que otros procesos hayan guardado entretanto (leer-sumar-escribir bajo candado)."""
+        if not self.ruta: return
+        with self._lock:
+            nuevas=self._nuevas; self._nuevas={}
+        if not nuevas: return
+        tmp=f"{self.ruta}.{os.getpid()}.tmp"
+        try:
+            with _candado(self.ruta+".lock"):
+                total=_leer(self.ruta)
+                for k,c in nuevas.items(): total.setdefault(k, Cuenta()).sumar(c)
+                with open(tmp, "w", encoding="utf-8") as f: json.dump({k:vars(c) for k,c in total.items()}, f)
+                os.replace(tmp, self.ruta)
+            with self._lock:
+                for k,c in self._nuevas.items(): total.setdefault(k, Cuenta()).sumar(c)
+                self.cuentas=total
+        except Exception:
+            with self._lock:
+                for k,c in nuevas.items(): self._nuevas.setdefault(k, Cuenta()).sumar(c)
+            try: os.remove(tmp)
+            except Exception: pass
+
+@contextmanager
+def _candado(ruta:str)->Iterator[None]:
+    """Candado exclusivo entre procesos; sin fcntl (Windows) no protege, como en motores/almacen.py."""
+    if not FCNTL_OK:
+        yield; return
+    try: f=open(ruta, "a+")
+    except OSError:
+        yield; return
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        yield
+    finally:
+        try: fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        finally: f.close()
+
+# ===== Puntuación =====
+def decisividad(mc:MetodoCompilado, historial:Optional[Historial]=None)->float:
+    if not mc.outcomes_fake: return 0.0          # sin outcomes de "no existe" nunca decide el sitio
+    prior=PRIOR_NO.get(str(mc.datos.get("status","GOOD")), PRIOR_NO["GOOD"])
+    c=historial.cuenta(mc) if historial else None
+    if c is None: return prior*0.5
+    p_no=(c.no+PRIOR_N*prior)/(c.n+PRIOR_N)
+    return p_no*(c.aciertos+1)/(c.decisivos+2)
+
+def coste(metodos:Sequence[MetodoCompilado], navegador:bool, historial:Optional[Historial]=None)->float:
+    """Coste de UNA descarga compartida por `metodos` (por HTTP o por navegador)."""
+    cuentas=[historial.cuenta(mc) for mc in metodos] if historial else []
+    cuerpo=max((c.bytes_medios for c in cuentas if c), default=0.0)
+    return (COSTE_NAVEGADOR if navegador else 1.0)+cuerpo/COSTE_BYTES
+
+@dataclass(frozen=True)
+class Unidad:
+    """Una descarga de un sitio: URL por HTTP o por navegador, y las posiciones de los métodos que la leen."""
+    url:str; navegador:bool; idxs:Tuple[int,...]; puntuacion:float
+
+def unidades(metodos:Sequence[MetodoCompilado], grupos:Dict[str,List[int]], use_browser:bool,
+             historial:Optional[Historial]=None)->List[Unidad]:
+    """Descargas del sitio de más a menos decisiva por unidad de coste (empates: orden de sitios.json)."""
+    out:List[Unidad]=[]
+    for url, idxs in grupos.items():
+        nav=[i for i in idxs if use_browser and metodos[i].modo==MODO_NAVEGADOR]
+        for navegador, ids in ((False, [i for i in idxs if i not in nav]), (True, nav)):
+            if not ids: continue
+            ms=[metodos[i] for i in ids]
+            d=max(decisividad(mc, historial) for mc in ms)
+            out.append(Unidad(url, navegador, tuple(ids), d/coste(ms, navegador, historial)))
+    return sorted(out, key=lambda u: -u.puntuacion)
+
+def olas(unids:List[Unidad])->List[List[Unidad]]:
+    """La más decisiva sola (si puede decidir algo), luego el resto de HTTP y al final el navegador."""
+    if not unids: return []
+    primera, resto = ([unids[0]], unids[1:]) if unids[0].puntuacion>0 else ([], unids)
+    http=[u for u in resto if not u.navegador]; nav=[u for u in resto if u.navegador]
+    return [o for o in (primera, http, nav) if o]
+
+def decidido(evaluaciones:Sequence[Any], metodos:Sequence[MetodoCompilado])->bool:
+    """¿Algún método ya dijo No existe? (evaluaciones como las de decidir_sitio)."""
+    from motores.buscador_auto_graficos import decidir_por_outcome
+    for mc, ev in zip(metodos, evaluaciones):
+        if isinstance(ev, tuple) and decidir_por_outcome(ev[0], mc.outcomes_real, mc.outcomes_fake)=="No existe":
+            return True
+    return False
+
+def omitir(evaluaciones:List[Any], idxs:Sequence[int])->None:
+    for i in idxs:
+        if evaluaciones[i] is None: evaluaciones[i]=OMITIDO
+
+def anotar_sitio(historial:Optional[Historial], metodos:Sequence[MetodoCompilado], evaluaciones:Sequence[Any],
+                 resultados:Sequence[Tuple[str,str,str,str]], final:str)->None:
+    """Suma al historial lo que dijo cada método evaluado frente a la decisión final del sitio."""
+    if historial is None: return
+    for mc, ev, res in zip(metodos, evaluaciones, resultados):
+        if not isinstance(ev, tuple): continue
+        r_http, r_sel = ev[2], ev[3]
+        historial.anotar(mc, res[0], final, len(r_sel.text if r_sel is not None else r_http.text))
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Recursos del navegador – Ojo de Zeus 2
+– selenium_fetch solo lee page_source y current_url: imágenes, vídeo, fuentes, analítica y anuncios
+  son ancho de banda y tiempo de carga perdidos (y peticiones en vuelo que retrasan esperar_listo).
+– Política por página = clases de recursos bloqueadas + dominios de rastreadores/anuncios:
+    Chromium  CDP Network.setBlockedURLs: las peticiones ni salen. Se manda antes de cada get()
+              solo si la política cambió respecto a la página anterior de esa instancia.
+    Firefox   sin CDP: lo fijan las preferencias de arranque (motores/navegadores.py: sin imágenes
+              ni fuentes, protección contra rastreadores), iguales para toda la sesión. preparar_sesion,
+              antes de arrancar el pool, deja sin bloquear las clases que permite algún sitio que va
+              por navegador (un dominio permitido apaga la protección contra rastreadores). Si aun así
+              una página de Firefox pide algo que su sesión bloquea, se avisa una vez por sitio.
+– Los dominios del propio sitio nunca se bloquean (p. ej. al buscar en un sitio que es también rastreador).
+– Excepciones por sitio en sitios.json (cualquier método del sitio, como "listo"):
+    "recursos": {"permitir": ["imagen", "fuente", "cdn.ejemplo.com"]}
+  clases: imagen, media, fuente, rastreador; cualquier otra cosa es un dominio que no se bloquea.
+– Con el modo ligero apagado (lote --completo) no se bloquea nada.
+"""
+
+import sys
+from dataclasses import dataclass, replace
+from typing import Any, Dict, FrozenSet, Iterable, Set, Tuple
+from urllib.parse import urlsplit
+
+from motores.navegadores import es_ligero, permitidas_firefox, permitir_firefox
+from motores.planificador import MODO_NAVEGADOR
+
+EXTENSIONES:Dict[str,Tuple[str,...]]={
+    "imagen": ("png","jpg","jpeg","gif","webp","avif","ico","bmp","svg"),
+    "media":  ("mp4","webm","m4v","mov","m3u8","mpd","mp3","m4a","ogg","oga","wav","flac"),
+    "fuente": ("woff","woff2","ttf","otf","eot"),
+}
+RASTREADORES=(
+    "google-analytics.com","googletagmanager.com","doubleclick.net","googlesyndication.com","googleadservices.com",
+    "adservice.google.com","connect.facebook.net","scorecardresearch.com","hotjar.com","segment.io","segment.com",
+    "mixpanel.com","amplitude.com","criteo.com","criteo.net","taboola.com","outbrain.com","adnxs.com",
+    "amazon-adsystem.com","quantserve.com","nr-data.net","bat.bing.com","clarity.ms","moatads.com",
+    "chartbeat.com","sentry.io","branch.io","adsrvr.org","rubiconproject.com","pubmatic.com",
+)
+CLASES=tuple(EXTENSIONES)+("rastreador",)
+
+@dataclass(frozen=True)
+class Politica:
+    bloquear:FrozenSet[str]=frozenset(CLASES)
+    permitir_dominios:Tuple[str,...]=()
+
+    @property
+    def excepciones(self)->FrozenSet[str]:
+        """Clases que esta política deja pasar; con dominios permitidos, también "rastreador" (Firefox no distingue)."""
+        return frozenset(CLASES)-self.bloquear | (frozenset({"rastreador"}) if self.permitir_dominios else frozenset())
+
+    def patrones(self, url:str="")->Tuple[str,...]:
+        """Patrones de Network.setBlockedURLs para una página de `url`."""
+        out=[]
+        for clase, exts in EXTENSIONES.items():
+            if clase in self.bloquear:
+                for e in exts: out+=[f"*.{e}", f"*.{e}?*"]
+        if "rastreador" in self.bloquear:
+            propios=self.permitir_dominios+((_base(urlsplit(url).hostname or ""),) if url else ())
+            for d in RASTREADORES:
+                if not any(p and (d==p or d.endswith("."+p) or _base(d)==p) for p in propios):
+                    out+=[f"*://{d}/*", f"*://*.{d}/*"]
+        return tuple(out)
+
+POLITICA_DEFECTO=Politica()
+
+def _base(host:str)->str:
+    """Últimas dos etiquetas del host (suficiente para reconocer el dominio del propio sitio)."""
+    return ".".join(host.lower().split(".")[-2:]) if host else ""
+
+def politica_de(metodos:Iterable[Dict[str,Any]], base:Politica=POLITICA_DEFECTO)->Politica:
+    """Primera regla "recursos" entre los métodos (entradas de sitios.json) de un sitio; si no hay, `base`."""
+    for m in metodos:
+        r=(m or {}).get("recursos")
+        if not isinstance(r, dict) or not isinstance(r.get("permitir"), list): continue
+        permitir=[str(x).strip().lower() for x in r["permitir"] if str(x).strip()]
+        clases={p for p in permitir if p in CLASES}
+        return replace(base, bloquear=base.bloquear-clases,
+                       permitir_dominios=base.permitir_dominios+tuple(p for p in permitir if p not in CLASES))
+    return base
+
+def preparar_sesion(sitios:Iterable[Any])->FrozenSet[str]:
+    """
+    Antes de arrancar el pool: Firefox no bloquea lo que permite algún sitio (SitioCompilado) que va por
+    navegador. Devuelve esas clases.
+    """
+    clases:Set[str]=set()
+    for s in sitios:
+        if any(m.modo==MODO_NAVEGADOR for m in s.metodos): clases|=politica_de(m.datos for m in s.metodos).excepciones
+    permitir_firefox(clases)
+    return frozenset(clases)
+
+_AVISADOS:Set[str]=set()
+
+def aplicar(driver:Any, nombre:str, url:str, politica:Politica=POLITICA_DEFECTO)->None:
+    """Antes de driver.get(url). Chromium: bloqueo por CDP; Firefox: sus preferencias de arranque (preparar_sesion)."""
+    if nombre!="chromium":
+        faltan=politica.excepciones-permitidas_firefox() if es_ligero() else frozenset()
+        host=urlsplit(url).hostname or url
+        if faltan and host not in _AVISADOS:
+            _AVISADOS.add(host)
+            print(f"[RECURSOS] {host}: Firefox arrancó bloqueando {', '.join(sorted(faltan))}, que este sitio permite; "
+                  "puede no cargar bien (usa Chromium o --completo).", file=sys.stderr, flush=True)
+        return
+    patrones=politica.patrones(url) if es_ligero() else ()
+    if getattr(driver, "_zeus_bloqueo", None)==patrones: return
+    try:
+        if not hasattr(driver, "_zeus_bloqueo"): driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patrones)})
+        driver._zeus_bloqueo=patrones
+    except Exception:
+        pass
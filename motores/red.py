@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Red – Ojo de Zeus 2 (clientes HTTP)
+– Dos clientes con keep-alive y pool de conexiones propio (httpx no comparte pool entre el síncrono y
+  el asíncrono): uno síncrono por ejecución (cliente_compartido) para buscador, creador y navegador,
+  y uno asíncrono por escaneo (ClienteHTTPAsync, lo abre el escáner). Comparten el limitador por host
+  y los reintentos; el tope de conexiones por host lo aplica cada uno.
+– HTTP/2 con `h2` (en requirements.txt); si falta, HTTP/1.1 con keep-alive.
+– Tope de conexiones simultáneas por host, además del tope global del pool.
+– Sin httpx usa requests.Session con HTTPAdapter (mismo pool, sin HTTP/2).
+– get_stream: lee el cuerpo por trozos y corta en cuanto el llamador ya no lo necesita o pasa del máximo.
+– Cada petición pide turno al limitador del host y se reintenta si el fallo es pasajero (motores/limitador.py).
+– Con las métricas activas (motores/metricas.py) cada petición httpx lleva una traza de conexión/TLS/TTFB/cuerpo.
+"""
+
+import asyncio, atexit, importlib.util, threading, time
+from dataclasses import dataclass
+from typing import Awaitable, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from motores import metricas
+from motores.limitador import (
+    REINTENTOS, STATUS_REINTENTABLES, espera_reintento, host_de, limitador_compartido,
+)
+
+HTTP_BACKEND="httpx"
+try:
+    import httpx
+except Exception:
+    HTTP_BACKEND="requests"
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+
+# Fallos de red que vale la pena reintentar (los timeouts de lectura no: el servidor es lento, no intermitente)
+if HTTP_BACKEND=="httpx":
+    ERRORES_PASAJEROS:tuple=(httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+else:
+    ERRORES_PASAJEROS=(requests.ConnectionError,)
+
+H2_OK=importlib.util.find_spec("h2") is not None     # httpx solo habla HTTP/2 con h2 instalado
+
+# ===== Pool (ajustable) =====
+RED_MAX_CONEXIONES=100       # conexiones abiertas en total
+RED_MAX_KEEPALIVE=40         # conexiones ociosas que se conservan para reutilizar
+RED_KEEPALIVE_EXPIRY=30.0    # seg. que vive una conexión ociosa
+RED_MAX_POR_HOST=6           # peticiones simultáneas contra un mismo host
+RED_HTTP2=True               # se usa solo si H2_OK
+
+@dataclass
+class Respuesta:
+    final_url:str; status:int; headers:Dict[str,str]; text:str; truncado:bool=False
+
+# seguir(status, trozo) → False para dejar de leer. Se llama con trozo=None justo tras las cabeceras.
+Seguir = Callable[[int, Optional[str]], bool]
+
+def _consumir(final_url:str, status:int, headers:Dict[str,str], trozos:Iterator[str], leidos:Callable[[], int],
+              seguir:Optional[Seguir], max_bytes:Optional[int])->Respuesta:
+    partes=[]; truncado=False
+    if seguir is None or seguir(status, None):
+        for t in trozos:
+            partes.append(t)
+            if max_bytes and leidos()>=max_bytes: truncado=True; break
+            if seguir is not None and not seguir(status, t): truncado=True; break
+    else:
+        truncado=True
+    return Respuesta(final_url, status, headers, "".join(partes), truncado)
+
+async def _consumir_async(final_url:str, status:int, headers:Dict[str,str], trozos:AsyncIterator[str], leidos:Callable[[], int],
+                          seguir:Optional[Seguir], max_bytes:Optional[int])->Respuesta:
+    partes=[]; truncado=False
+    if seguir is None or seguir(status, None):
+        async for t in trozos:
+            partes.append(t)
+            if max_bytes and leidos()>=max_bytes: truncado=True; break
+            if seguir is not None and not seguir(status, t): truncado=True; break
+    else:
+        truncado=True
+    return Respuesta(final_url, status, headers, "".join(partes), truncado)
+
+def _pausa_reintento(intento:int)->float:
+    s=espera_reintento(intento); metricas.anotar("http.reintento", s)
+    return s
+
+def _con_reintentos(url:str, intento_unico:Callable[[], Respuesta])->Respuesta:
+    """Turno del limitador (incluye la pausa de Retry-After) + reintentos con espera exponencial."""
+    lim=limitador_compartido()
+    for intento in range(REINTENTOS+1):
+        espera=lim.turno(url)
+        if espera>0: time.sleep(espera); metricas.anotar("http.limitador", espera)
+        try:
+            r=intento_unico()
+        except ERRORES_PASAJEROS:
+            if intento>=REINTENTOS: raise
+            time.sleep(_pausa_reintento(intento)); continue
+        lim.registrar(url, r.status, r.headers, r.text)
+        if r.status in STATUS_REINTENTABLES and intento<REINTENTOS:
+            time.sleep(_pausa_reintento(intento)); continue
+        return r
+    raise RuntimeError("inalcanzable")
+
+async def _con_reintentos_async(url:str, intento_unico:Callable[[], Awaitable[Respuesta]])->Respuesta:
+    lim=limitador_compartido()
+    for intento in range(REINTENTOS+1):
+        espera=lim.turno(url)
+        if espera>0: await asyncio.sleep(espera); metricas.anotar("http.limitador", espera)
+        try:
+            r=await intento_unico()
+        except ERRORES_PASAJEROS:
+            if intento>=REINTENTOS: raise
+            await asyncio.sleep(_pausa_reintento(intento)); continue
+        lim.registrar(url, r.status, r.headers, r.text)
+        if r.status in STATUS_REINTENTABLES and intento<REINTENTOS:
+            await asyncio.sleep(_pausa_reintento(intento)); continue
+        return r
+    raise RuntimeError("inalcanzable")
+
+class ClienteHTTP:
+    """Cliente síncrono con pool; seguro entre hilos (el creador y el navegador lo usan desde varios)."""
+    def __init__(self, max_conexiones:int=RED_MAX_CONEXIONES, max_keepalive:int=RED_MAX_KEEPALIVE,
+                 keepalive_expiry:float=RED_KEEPALIVE_EXPIRY, max_por_host:int=RED_MAX_POR_HOST, http2:bool=RED_HTTP2):
+        self.max_por_host=max(1,max_por_host); self.http2=bool(http2 and H2_OK and HTTP_BACKEND=="httpx")
+        self._hosts:Dict[str,threading.BoundedSemaphore]={}; self._lock=threading.Lock()
+        if HTTP_BACKEND=="httpx":
+            self._c=httpx.Client(verify=True, http2=self.http2,
+                                 limits=httpx.Limits(max_connections=max_conexiones, max_keepalive_connections=max_keepalive,
+                                                     keepalive_expiry=keepalive_expiry))
+        else:
+            self._c=requests.Session()
+            ad=HTTPAdapter(pool_connections=max_keepalive, pool_maxsize=self.max_por_host)
+            self._c.mount("http://", ad); self._c.mount("https://", ad)
+
+    def _sem_host(self, url:str)->threading.BoundedSemaphore:
+        h=host_de(url)
+        with self._lock:
+            sem=self._hosts.get(h)
+            if sem is None: sem=self._hosts[h]=threading.BoundedSemaphore(self.max_por_host)
+        return sem
+
+    def get(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool=True)->Respuesta:
+        """Lanza la excepción del backend si falla (ya reintentada); fetch_http la convierte en [HTTP_ERROR]."""
+        return _con_reintentos(url, lambda: self._get(url, headers, timeout, follow_redirects))
+
+    def _get(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool)->Respuesta:
+        tr=metricas.traza_http()
+        with self._sem_host(url):
+            if HTTP_BACKEND=="httpx":
+                r=self._c.get(url, headers=headers, follow_redirects=follow_redirects, timeout=timeout,
+                              extensions=tr.extensiones() if tr else None)
+                out=Respuesta(str(r.url), r.status_code, {k.lower():v for k,v in r.headers.items()}, r.text or "")
+                if tr: tr.fin()
+                return out
+            r=self._c.get(url, headers=headers, allow_redirects=follow_redirects, timeout=timeout)
+            metricas.anotar("http.espera", r.elapsed.total_seconds())
+            return Respuesta(r.url, r.status_code, {k.lower():v for k,v in r.headers.items()}, r.text or "")
+
+    def get_stream(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool=True,
+                   max_bytes:Optional[int]=None, seguir:Optional[Seguir]=None)->Respuesta:
+        """Lee el cuerpo por trozos y corta al llegar a `max_bytes` o cuando `seguir` devuelve False."""
+        return _con_reintentos(url, lambda: self._get_stream(url, headers, timeout, follow_redirects, max_bytes, seguir))
+
+    def _get_stream(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool,
+                    max_bytes:Optional[int], seguir:Optional[Seguir])->Respuesta:
+        tr=metricas.traza_http()
+        with self._sem_host(url):
+            if HTTP_BACKEND=="httpx":
+                with self._c.stream("GET", url, headers=headers, follow_redirects=follow_redirects, timeout=timeout,
+                                    extensions=tr.extensiones() if tr else None) as r:
+                    out=_consumir(str(r.url), r.status_code, {k.lower():v for k,v in r.headers.items()},
+                                  r.iter_text(), lambda: r.num_bytes_downloaded, seguir, max_bytes)
+                if tr: tr.fin()
+                return out
+            with self._c.get(url, headers=headers, allow_redirects=follow_redirects, timeout=timeout, stream=True) as r:
+                r.encoding=r.encoding or "utf-8"
+                metricas.anotar("http.espera", r.elapsed.total_seconds())
+                return _consumir(r.url, r.status_code, {k.lower():v for k,v in r.headers.items()},
+                                 r.iter_content(chunk_size=16384, decode_unicode=True), r.raw.tell, seguir, max_bytes)
+
+    def cerrar(self)->None:
+        try: self._c.close()
+        except Exception: pass
+
+class ClienteHTTPAsync:
+    """Igual que ClienteHTTP pero para el escáner (un loop de asyncio). Sin httpx delega en el síncrono."""
+    def __init__(self, max_conexiones:int=RED_MAX_CONEXIONES, max_keepalive:int=RED_MAX_KEEPALIVE,
+                 keepalive_expiry:float=RED_KEEPALIVE_EXPIRY, max_por_host:int=RED_MAX_POR_HOST, http2:bool=RED_HTTP2):
+        self.max_por_host=max(1,max_por_host); self.http2=bool(http2 and H2_OK and HTTP_BACKEND=="httpx")
+        self._hosts:Dict[str,asyncio.Semaphore]={}
+        self._c=None
+        if HTTP_BACKEND=="httpx":
+            self._c=httpx.AsyncClient(verify=True, http2=self.http2,
+                                      limits=httpx.Limits(max_connections=max_conexiones, max_keepalive_connections=max_keepalive,
+                                                          keepalive_expiry=keepalive_expiry))
+
+    def _sem_host(self, url:str)->asyncio.Semaphore:
+        h=host_de(url)
+        sem=self._hosts.get(h)
+        if sem is None: sem=self._hosts[h]=asyncio.Semaphore(self.max_por_host)
+        return sem
+
+    async def get(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool=True)->Respuesta:
+        if self._c is None:      # el cliente síncrono ya aplica limitador y reintentos
+            async with self._sem_host(url):
+                return await asyncio.to_thread(cliente_compartido().get, url, headers, timeout, follow_redirects)
+        return await _con_reintentos_async(url, lambda: self._get(url, headers, timeout, follow_redirects))
+
+    async def _get(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool)->Respuesta:
+        tr=metricas.traza_http()
+        async with self._sem_host(url):
+            r=await self._c.get(url, headers=headers, follow_redirects=follow_redirects, timeout=timeout,
+                                extensions=tr.extensiones(True) if tr else None)
+            out=Respuesta(str(r.url), r.status_code, {k.lower():v for k,v in r.headers.items()}, r.text or "")
+            if tr: tr.fin()
+            return out
+
+    async def get_stream(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool=True,
+                         max_bytes:Optional[int]=None, seguir:Optional[Seguir]=None)->Respuesta:
+        if self._c is None:
+            async with self._sem_host(url):
+                return await asyncio.to_thread(cliente_compartido().get_stream, url, headers, timeout, follow_redirects, max_bytes, seguir)
+        return await _con_reintentos_async(url, lambda: self._get_stream(url, headers, timeout, follow_redirects, max_bytes, seguir))
+
+    async def _get_stream(self, url:str, headers:Dict[str,str], timeout:float, follow_redirects:bool,
+                          max_bytes:Optional[int], seguir:Optional[Seguir])->Respuesta:
+        tr=metricas.traza_http()
+        async with self._sem_host(url):
+            async with self._c.stream("GET", url, headers=headers, follow_redirects=follow_redirects, timeout=timeout,
+                                      extensions=tr.extensiones(True) if tr else None) as r:
+                out=await _consumir_async(str(r.url), r.status_code, {k.lower():v for k,v in r.headers.items()},
+                                          r.aiter_text(), lambda: r.num_bytes_downloaded, seguir, max_bytes)
+            if tr: tr.fin()
+            return out
+
+    async def cerrar(self)->None:
+        if self._c is not None:
+            try: await self._c.aclose()
+            except Exception: pass
+
+# ===== Cliente único por ejecución =====
+_CLIENTE:Optional[ClienteHTTP]=None
+_CLIENTE_LOCK=threading.Lock()
+
+def cliente_compartido()->ClienteHTTP:
+    global _CLIENTE
+    if _CLIENTE is None:
+        with _CLIENTE_LOCK:
+            if _CLIENTE is None: _CLIENTE=ClienteHTTP()
+    return _CLIENTE
+
+def cerrar_cliente()->None:
+    global _CLIENTE
+    with _CLIENTE_LOCK:
+        if _CLIENTE is not None: _CLIENTE.cerrar(); _CLIENTE=None
+
+atexit.register(cerrar_cliente)
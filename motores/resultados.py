@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+Resultados de escaneos – Ojo de Zeus 2
+– SQLite (resultados.sqlite): cada escaneo de un usuario, la decisión de cada sitio y una fila
+  compacta por usuario × sitio × método (outcome, decisión, status, URL final, took_ms, modo de descarga).
+– Escritura por tandas: las filas se acumulan y van en una sola transacción cada RESULTADOS_TANDA
+  filas o al cerrar el escaneo (el modo lote escribe miles de usuarios sin frenar).
+– Consultas:
+    existe      sitios donde el usuario existe (su último escaneo)
+    cambios     qué cambió desde un escaneo anterior del mismo usuario (p. ej. el de hace una semana)
+    deriva      sitios cuya distribución de outcomes por método cambió entre dos ventanas de tiempo
+                (distancia de variación total; un sitio que cambió su HTML suele aparecer aquí)
+– exportar a JSON Lines o CSV (según la extensión), todo o un usuario.
+
+Uso:
+  python3 -m motores.resultados existe USUARIO
+  python3 -m motores.resultados cambios USUARIO --dias 7
+  python3 -m motores.resultados deriva --dias 7 --base 30
+  python3 -m motores.resultados exportar salida.csv --usuario USUARIO
+"""
+
+import argparse, csv, json, sqlite3, sys, threading, time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+RESULTADOS_RUTA="resultados.sqlite"
+RESULTADOS_TANDA=1000           # filas de métodos por transacción
+DERIVA_UMBRAL=0.3               # variación total mínima para avisar
+DERIVA_MIN_N=5                  # filas mínimas por método en cada ventana
+DIA_S=86400.0
+
+COLUMNAS_EXPORTAR=("escaneo","usuario","inicio","sitio","decision_sitio","heuristica","pos","metodo_id","metodo",
+                   "outcome","decision","status","final_url","took_ms","modo")
+
+@dataclass
+class Cambio:
+    sitio:str; antes:Optional[str]; ahora:Optional[str]
+
+@dataclass
+class Deriva:
+    sitio:str; metodo_id:str; metodo:str; distancia:float; n_base:int; n_reciente:int
+    base:Dict[str,float]; reciente:Dict[str,float]
+
+class AlmacenResultados:
+    """Una conexión por proceso protegida por candado (el escáner anota desde el loop y desde hilos)."""
+    def __init__(self, ruta:str=RESULTADOS_RUTA, tanda:int=RESULTADOS_TANDA):
+        self.ruta=ruta; self.tanda=max(1,tanda)
+        self._lock=threading.Lock(); self._sitios:List[tuple]=[]; self._metodos:List[tuple]=[]
+        self._db=sqlite3.connect(ruta, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL"); self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS escaneos(
+                id INTEGER PRIMARY KEY, usuario TEXT NOT NULL, inicio REAL NOT NULL, fin REAL, origen TEXT);
+            CREATE INDEX IF NOT EXISTS escaneos_usuario ON escaneos(usuario, inicio);
+            CREATE INDEX IF NOT EXISTS escaneos_inicio ON escaneos(inicio);
+            CREATE TABLE IF NOT EXISTS sitios(
+                escaneo INTEGER NOT NULL, sitio TEXT NOT NULL, decision TEXT NOT NULL, heuristica INTEGER, info TEXT,
+                PRIMARY KEY(escaneo, sitio)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS sitios_decision ON sitios(sitio, decision);
+            CREATE TABLE IF NOT EXISTS metodos(
+                escaneo INTEGER NOT NULL, sitio TEXT NOT NULL, pos INTEGER NOT NULL, metodo_id TEXT, metodo TEXT,
+                outcome TEXT, decision TEXT, status INTEGER, final_url TEXT, took_ms INTEGER, modo TEXT,
+                PRIMARY KEY(escaneo, sitio, pos)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS metodos_metodo ON metodos(sitio, metodo_id, escaneo);
+        """)
+
+    # ===== Escritura =====
+    def abrir_escaneo(self, usuario:str, origen:str="")->int:
+        with self._lock:
+            return int(self._db.execute("INSERT INTO escaneos(usuario, inicio, origen) VALUES(?,?,?)",
+                                        (usuario, time.time(), origen)).lastrowid)
+
+    def agregar(self, escaneo:int, res:Any)->None:
+        """`res`: ResultadoSitio. Se escribe al llenarse la tanda o al cerrar el escaneo."""
+        filas=[]
+        for pos, (decision, metodo, outcome, final_url) in enumerate(res.resultados):
+            status, took, modo, clave = res.detalles[pos] if pos<len(res.detalles) else (None, None, "", "")
+            filas.append((escaneo, res.nombre, pos, clave, metodo, outcome, decision, status, final_url, took, modo))
+        with self._lock:
+            self._sitios.append((escaneo, res.nombre, res.decision, int(bool(res.heuristica)),
+                                 json.dumps(res.info, ensure_ascii=False) if res.info else None))
+            self._metodos.extend(filas)
+            if len(self._metodos)>=self.tanda: self._volcar()
+
+    def cerrar_escaneo(self, escaneo:int)->None:
+        with self._lock:
+            self._volcar()
+            self._db.execute("UPDATE escaneos SET fin=? WHERE id=?", (time.time(), escaneo))
+
+    @contextmanager
+    def escaneo(self, usuario:str, origen:str="")->Iterator[int]:
+        """`with almacen.escaneo(usuario) as esc: almacen.agregar(esc, res)`."""
+        esc=self.abrir_escaneo(usuario, origen)
+        try: yield esc
+        finally: self.cerrar_escaneo(esc)
+
+    def _volcar(self)->None:
+        if not self._sitios and not self._metodos: return
+        self._db.execute("BEGIN")
+        try:
+            self._db.executemany("INSERT OR REPLACE INTO sitios VALUES(?,?,?,?,?)", self._sitios)
+            self._db.executemany("INSERT OR REPLACE INTO metodos VALUES(?,?,?,?,?,?,?,?,?,?,?)", self._metodos)
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK"); raise
+        self._sitios=[]; self._metodos=[]
+
+    def cerrar(self)->None:
+        with self._lock:
+            try: self._volcar()
+            finally: self._db.close()
+
+    # ===== Consultas =====
+    def _ultimo(self, usuario:str, hasta:Optional[float]=None)->Optional[int]:
+        """Último escaneo terminado del usuario (empezado antes de `hasta`, si se da)."""
+        sql="SELECT id FROM escaneos WHERE usuario=? AND fin IS NOT NULL"+(" AND inicio<=?" if hasta is not None else "")
+        fila=self._db.execute(sql+" ORDER BY inicio DESC LIMIT 1", (usuario,)+((hasta,) if hasta is not None else ())).fetchone()
+        return fila[0] if fila else None
+
+    def existe(self, usuario:str)->List[Tuple[str,bool,Dict[str,Any]]]:
+        """(sitio, por heurística, info extraída) donde el usuario existe según su último escaneo."""
+        with self._lock:
+            esc=self._ultimo(usuario)
+            if esc is None: return []
+            filas=self._db.execute("SELECT sitio, heuristica, info FROM sitios WHERE escaneo=? AND decision='Existe' ORDER BY sitio",
+                                   (esc,)).fetchall()
+        return [(s, bool(h), json.loads(i) if i else {}) for s,h,i in filas]
+
+    def cambios(self, usuario:str, desde:float)->Tuple[Optional[int], Optional[int], List[Cambio]]:
+        """(escaneo anterior, último, sitios cuya decisión cambió) entre el escaneo más reciente anterior a `desde` y el último."""
+        with self._lock:
+            nuevo=self._ultimo(usuario); viejo=self._ultimo(usuario, desde)
+            if nuevo is None or viejo is None or viejo==nuevo: return viejo, nuevo, []
+            antes=dict(self._db.execute("SELECT sitio, decision FROM sitios WHERE escaneo=?", (viejo,)).fetchall())
+            ahora=dict(self._db.execute("SELECT sitio, decision FROM sitios WHERE escaneo=?", (nuevo,)).fetchall())
+        return viejo, nuevo, [Cambio(s, antes.get(s), ahora.get(s)) for s in sorted(set(antes)|set(ahora))
+                              if antes.get(s)!=ahora.get(s)]
+
+    def _distribuciones(self, desde:float, hasta:float)->Dict[Tuple[str,str],Tuple[str,Dict[str,int]]]:
+        dist:Dict[Tuple[str,str],Tuple[str,Dict[str,int]]]={}
+        filas=self._db.execute("""SELECT m.sitio, m.metodo_id, m.metodo, m.outcome, COUNT(*) FROM metodos m
+                                  JOIN escaneos e ON e.id=m.escaneo
+                                  WHERE e.inicio>=? AND e.inicio<? AND m.status IS NOT NULL
+                                  GROUP BY m.sitio, m.metodo_id, m.outcome""", (desde, hasta))
+        for sitio, mid, metodo, outcome, n in filas:
+            dist.setdefault((sitio, mid), (metodo, {}))[1][outcome]=n
+        return dist
+
+    def deriva(self, dias:float=7, base:float=30, umbral:float=DERIVA_UMBRAL, min_n:int=DERIVA_MIN_N,
+               ahora:Optional[float]=None)->List[Deriva]:
+        """Métodos cuyo reparto de outcomes en los últimos `dias` difiere del de los `base` días anteriores."""
+        ahora=time.time() if ahora is None else ahora
+        corte=ahora-dias*DIA_S
+        with self._lock:
+            reciente=self._distribuciones(corte, ahora+1); previa=self._distribuciones(corte-base*DIA_S, corte)
+        out=[]
+        for k, (metodo, r) in reciente.items():
+            if k not in previa: continue
+            b=previa[k][1]; nb=sum(b.values()); nr=sum(r.values())
+            if nb<min_n or nr<min_n: continue
+            pb={o:c/nb for o,c in b.items()}; pr={o:c/nr for o,c in r.items()}
+            d=0.5*sum(abs(pb.get(o,0.0)-pr.get(o,0.0)) for o in set(pb)|set(pr))
+            if d>=umbral: out.append(Deriva(k[0], k[1], metodo, round(d,3), nb, nr, pb, pr))
+        return sorted(out, key=lambda x: -x.distancia)
+
+    # ===== Exportar =====
+    def filas(self, usuario:Optional[str]=None)->Iterator[Dict[str,Any]]:
+        sql="""SELECT e.id, e.usuario, e.inicio, s.sitio, s.decision, s.heuristica, m.pos, m.metodo_id, m.metodo,
+                      m.outcome, m.decision, m.status, m.final_url, m.took_ms, m.modo
+               FROM escaneos e JOIN sitios s ON s.escaneo=e.id
+               JOIN metodos m ON m.escaneo=s.escaneo AND m.sitio=s.sitio"""
+        with self._lock:
+            self._volcar()
+            cur=self._db.execute(sql+(" WHERE e.usuario=?" if usuario else "")+" ORDER BY e.id, s.sitio, m.pos",
+                                 (usuario,) if usuario else ())
+            filas=cur.fetchall()
+        for f in filas: yield dict(zip(COLUMNAS_EXPORTAR, f))
+
+    def exportar(self, ruta:str, usuario:Optional[str]=None)->int:
+        """CSV si `ruta` acaba en .csv; si no, JSON Lines. Devuelve cuántas filas."""
+        n=0
+        with open(ruta, "w", encoding="utf-8", newline="") as f:
+            if ruta.lower().endswith(".csv"):
+                w=csv.DictWriter(f, fieldnames=COLUMNAS_EXPORTAR); w.writeheader()
+                for fila in self.filas(usuario): w.writerow(fila); n+=1
+            else:
+                for fila in self.filas(usuario): f.write(json.dumps(fila, ensure_ascii=False)+"\n"); n+=1
+        return n
+
+# ===== CLI =====
+def main(argv:Optional[List[str]]=None)->int:
+    ap=argparse.ArgumentParser(prog="python3 -m motores.resultados", description="Consultas sobre los resultados guardados.")
+    ap.add_argument("--bd", default=RESULTADOS_RUTA, help=f"base de resultados (por defecto {RESULTADOS_RUTA})")
+    sub=ap.add_subparsers(dest="orden", required=True)
+    p=sub.add_parser("existe", help="sitios donde existe el usuario (último escaneo)"); p.add_argument("usuario")
+    p=sub.add_parser("cambios", help="qué cambió desde un escaneo anterior"); p.add_argument("usuario")
+    p.add_argument("--dias", type=float, default=7, help="comparar con el último escaneo de hace al menos N días")
+    p=sub.add_parser("deriva", help="métodos cuyo reparto de outcomes cambió")
+    p.add_argument("--dias", type=float, default=7, help="ventana reciente (días)")
+    p.add_argument("--base", type=float, default=30, help="ventana anterior con la que comparar (días)")
+    p.add_argument("--umbral", type=float, default=DERIVA_UMBRAL)
+    p=sub.add_parser("exportar", help="volcar a .jsonl o .csv"); p.add_argument("ruta"); p.add_argument("--usuario")
+    a=ap.parse_args(argv)
+
+    bd=AlmacenResultados(a.bd)
+    try:
+        if a.orden=="existe":
+            filas=bd.existe(a.usuario)
+            for sitio, heur, info in filas:
+                print(f"{sitio:28s} {'(heurística) ' if heur else ''}{info.get('final_url','')}")
+            print(f"{len(filas)} sitio(s)."); return 0
+        if a.orden=="cambios":
+            viejo, nuevo, cambios = bd.cambios(a.usuario, time.time()-a.dias*DIA_S)
+            if viejo is None or nuevo is None or viejo==nuevo:
+                print(f"No hay dos escaneos de {a.usuario} separados por {a.dias:g} día(s)."); return 1
+            for c in cambios: print(f"{c.sitio:28s} {c.antes or '-':14s} → {c.ahora or '-'}")
+            print(f"{len(cambios)} cambio(s) entre los escaneos {viejo} y {nuevo}."); return 0
+        if a.orden=="deriva":
+            for d in bd.deriva(a.dias, a.base, a.umbral):
+                print(f"{d.sitio:28s} {d.metodo:22s} {d.distancia:.2f}  (n={d.n_base}→{d.n_reciente})")
+                top=lambda p: ", ".join(f"{o} {v:.0%}" for o,v in sorted(p.items(), key=lambda kv:-kv[1])[:3])
+                print(f"    antes: {top(d.base)}\n    ahora: {top(d.reciente)}")
+            return 0
+        n=bd.exportar(a.ruta, a.usuario)
+        print(f"Exportadas {n} fila(s) a {a.ruta}."); return 0
+    finally:
+        bd.cerrar()
+
+if __name__=="__main__": sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import sys
 from motores.borrador import ejecutar_borrador
 from motores.buscador_auto_graficos import ejecutar_buscador as buscador_auto
 from motores.creador_auto_graficos import ejecutar_creador as creador_auto  # ✅ CORREGIDO
@@ -37,4 +38,12 @@ def main():
             input("❌ Opción inválida. Presiona Enter para reintentarlo...")
 
 if __name__ == "__main__":
+    # Modo lote sin menú: python3 ojo_de_zeus_2.py lote usuarios.txt -o resultados.jsonl
+    if len(sys.argv) > 1 and sys.argv[1] == "lote":
+        from motores.lote import main as lote_main
+        sys.exit(lote_main(sys.argv[2:]))
+    # Escaneo repartido: python3 ojo_de_zeus_2.py cola encolar|trabajar|estado|exportar|local ...
+    if len(sys.argv) > 1 and sys.argv[1] == "cola":
+        from motores.cola import main as cola_main
+        sys.exit(cola_main(sys.argv[2:]))
     main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Banco de rendimiento – Ojo de Zeus 2
+– Levanta la granja de sitios simulados (rendimiento/granja.py) con los sitios de sitios.json y mide
+  las rutas calientes contra ella, sin salir a internet:
+    evaluar_metodo   → un método suelto (buscador clásico), usuarios reales y falsos
+    barrido          → escaneo completo de un usuario con el escáner concurrente (todos los sitios)
+    creador          → generar_metodos (lo que hace ejecutar_core antes de preguntar qué guardar)
+– Por etapa: latencia p50/p90/p99, peticiones/seg. (contadas por la granja), bytes servidos y RSS pico.
+– Caché en disco desactivada y limitador sin cubeta (rps=0) para que las corridas sean comparables;
+  los reintentos de 429 siguen activos porque forman parte de lo que se mide.
+– --guardar-base escribe rendimiento/linea_base.json; las corridas siguientes se comparan con ella
+  y terminan con código 1 si alguna etapa empeora más de lo tolerado.
+
+Uso:
+  python3 -m rendimiento.banco --guardar-base
+  python3 -m rendimiento.banco                      (compara con la línea base)
+  python3 -m rendimiento.banco --etapas barrido --usuarios 5 --json informe.json
+"""
+
+import argparse, contextlib, io, json, os, random, sys, time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource  # type: ignore
+    RESOURCE_OK=True
+except Exception:
+    RESOURCE_OK=False
+
+from motores import cache_disco, limitador
+from motores.almacen import Almacen
+from motores.buscador_auto_graficos import evaluar_metodo
+from motores.escaner import escanear_usuario, ESCANEO_CONCURRENCIA, ESCANEO_POR_HOST
+from motores.indice import compilar
+from rendimiento.granja import Granja, USUARIO_REAL, modo_de
+
+RUTA_BASE=os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+ETAPAS=("evaluar_metodo","barrido","creador")
+# Tolerancias frente a la línea base (fracción): más es peor en latencia/RSS, menos es peor en req/s
+TOLERANCIA_LATENCIA=0.25
+TOLERANCIA_RPS=0.20
+TOLERANCIA_RSS=0.30
+HOLGURA_MS=50.0         # diferencias de latencia menores no cuentan (jitter de reintentos, pocas muestras)
+
+def log(evento:str, detalle:str): print(f"[{evento}] {detalle}", file=sys.stderr, flush=True)
+
+def percentil(valores:List[float], p:float)->float:
+    """Rango más cercano sobre los valores ordenados (0 si no hay)."""
+    if not valores: return 0.0
+    v=sorted(valores); k=max(0, min(len(v)-1, int(round(p/100.0*len(v)+0.5))-1))
+    return v[k]
+
+def rss_pico_mb()->float:
+    """RSS máximo del proceso hasta ahora (ru_maxrss: KB en Linux, bytes en macOS)."""
+    if not RESOURCE_OK: return 0.0
+    r=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(r/(1024*1024 if sys.platform=="darwin" else 1024), 1)
+
+def medir(nombre:str, granja:Granja, cuerpo:Callable[[List[float]], None])->Dict[str,Any]:
+    """Corre `cuerpo(latencias)` y arma el informe de la etapa con lo que contó la granja."""
+    granja.reset()
+    latencias:List[float]=[]
+    t0=time.perf_counter(); cuerpo(latencias); total=time.perf_counter()-t0
+    st=granja.stats()
+    inf={"etapa":nombre, "muestras":len(latencias), "segundos":round(total,3),
+         "p50_ms":round(percentil(latencias,50)*1000,1), "p90_ms":round(percentil(latencias,90)*1000,1),
+         "p99_ms":round(percentil(latencias,99)*1000,1),
+         "peticiones":st["peticiones"], "req_s":round(st["peticiones"]/total,1) if total>0 else 0.0,
+         "bytes":st["bytes"], "rss_pico_mb":rss_pico_mb(), "por_modo":st.get("por_modo",{})}
+    log(nombre, f"{inf['muestras']} muestras en {inf['segundos']} s · p50 {inf['p50_ms']} ms · p90 {inf['p90_ms']} ms · "
+                f"p99 {inf['p99_ms']} ms · {inf['req_s']} req/s · {inf['bytes']/1e6:.1f} MB · RSS {inf['rss_pico_mb']} MB")
+    return inf
+
+# ===== Etapas =====
+def etapa_evaluar_metodo(metodos:List[Dict[str,Any]], usuarios:List[str], muestra:int, rnd:random.Random):
+    elegidos=rnd.sample(metodos, min(muestra, len(metodos)))
+    def cuerpo(lat:List[float])->None:
+        for m in elegidos:
+            for u in usuarios:
+                t=time.perf_counter()
+                evaluar_metodo(m["url_base"], u, m.get("metodo",""), m.get("parametros",{}) or {}, False)
+                lat.append(time.perf_counter()-t)
+    return cuerpo
+
+def etapa_barrido(metodos:List[Dict[str,Any]], usuarios:List[str], concurrencia:int, por_host:int, procesos:int=0):
+    indice=compilar(metodos)
+    def cuerpo(lat:List[float])->None:
+        for u in usuarios:
+            t=time.perf_counter()
+            # la latencia de cada sitio es lo que tardó en quedar decidido desde el inicio del escaneo
+            escanear_usuario(u, indice, False, lambda _r: lat.append(time.perf_counter()-t),
+                             concurrencia=concurrencia, por_host=por_host, procesos=procesos)
+    return cuerpo
+
+def etapa_creador(granja:Granja, reales:List[str], falsos:List[str], sitios:int):
+    from motores.creador_auto_graficos import generar_metodos
+    def cuerpo(lat:List[float])->None:
+        for i in range(min(sitios, len(granja.nombres))):
+            url_base=granja.url_de(i)+"/{user}"
+            t=time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                generar_metodos(f"granja{i}", url_base, reales, falsos, ["followers"], False)
+            lat.append(time.perf_counter()-t)
+    return cuerpo
+
+# ===== Línea base =====
+def comparar(actual:Dict[str,Any], base:Dict[str,Any])->List[str]:
+    """Avisos de regresión etapa por etapa (solo las que están en ambos informes)."""
+    avisos=[]
+    for nombre, a in actual.get("etapas",{}).items():
+        b=base.get("etapas",{}).get(nombre)
+        if not b: continue
+        for k in ("p50_ms","p90_ms"):
+            if b[k]>0 and a[k]>max(b[k]*(1+TOLERANCIA_LATENCIA), b[k]+HOLGURA_MS):
+                avisos.append(f"{nombre}: {k} {b[k]} → {a[k]} (+{(a[k]/b[k]-1)*100:.0f} %)")
+        if b["req_s"]>0 and a["req_s"]<b["req_s"]*(1-TOLERANCIA_RPS):
+            avisos.append(f"{nombre}: req_s {b['req_s']} → {a['req_s']} ({(a['req_s']/b['req_s']-1)*100:.0f} %)")
+        if b["rss_pico_mb"]>0 and a["rss_pico_mb"]>b["rss_pico_mb"]*(1+TOLERANCIA_RSS):
+            avisos.append(f"{nombre}: rss_pico_mb {b['rss_pico_mb']} → {a['rss_pico_mb']}")
+    return avisos
+
+def main(argv:Optional[List[str]]=None)->int:
+    ap=argparse.ArgumentParser(prog="python3 -m rendimiento.banco", description="Banco de rendimiento contra la granja local.")
+    ap.add_argument("--sitios", default="sitios.json", help="métodos a simular (por defecto sitios.json)")
+    ap.add_argument("--etapas", default=",".join(ETAPAS), help=f"separadas por coma ({', '.join(ETAPAS)})")
+    ap.add_argument("--usuarios", type=int, default=3, help="usuarios reales del barrido (más otros tantos falsos)")
+    ap.add_argument("--muestra", type=int, default=60, help="métodos sueltos para evaluar_metodo")
+    ap.add_argument("--sitios-creador", type=int, default=5, help="sitios a pasar por el creador")
+    ap.add_argument("--concurrencia", type=int, default=ESCANEO_CONCURRENCIA)
+    ap.add_argument("--por-host", type=int, default=ESCANEO_POR_HOST)
+    ap.add_argument("--procesos", type=int, default=0, help="pool de CPU del escáner en el barrido (0 = sin pool)")
+    ap.add_argument("--rps", type=float, default=0.0, help="activar el limitador por host (0 = sin cubeta)")
+    ap.add_argument("--semilla", type=int, default=2011)
+    ap.add_argument("--base", default=RUTA_BASE, help="archivo de línea base")
+    ap.add_argument("--guardar-base", action="store_true", help="guardar esta corrida como línea base")
+    ap.add_argument("--json", help="escribir también el informe completo aquí")
+    a=ap.parse_args(argv)
+
+    etapas=[e.strip() for e in a.etapas.split(",") if e.strip()]
+    desconocidas=[e for e in etapas if e not in ETAPAS]
+    if desconocidas: ap.error(f"etapa(s) desconocida(s): {', '.join(desconocidas)}")
+    try: metodos=Almacen(a.sitios).leer()
+    except Exception as e:
+        log("ERROR", f"no se pudo leer {a.sitios}: {e}"); return 2
+    if not metodos:
+        log("ERROR", f"{a.sitios} no tiene métodos"); return 2
+
+    cache_disco.configurar(activa=False)
+    limitador.configurar(rps=a.rps)
+    rnd=random.Random(a.semilla)
+    random.seed(a.semilla)          # jitter de reintentos y User-Agent: mismas esperas en cada corrida
+    reales=[f"{USUARIO_REAL}{k}" for k in range(max(1,a.usuarios))]
+    falsos=[f"nadie_{k}_x9q" for k in range(max(1,a.usuarios))]
+
+    informe:Dict[str,Any]={"creado":time.strftime("%Y-%m-%d %H:%M:%S"), "sitios":0, "metodos":0, "etapas":{}}
+    with Granja(metodos) as granja:
+        simulados=granja.reescribir(metodos)
+        informe["sitios"]=len(granja.nombres); informe["metodos"]=len(simulados)
+        modos:Dict[str,int]={}
+        for i in range(len(granja.nombres)): modos[modo_de(i)]=modos.get(modo_de(i),0)+1
+        log("granja", f"{len(granja.nombres)} sitios en {len(granja.direcciones)} host(s) · "+
+                      ", ".join(f"{k}={v}" for k,v in sorted(modos.items())))
+        cuerpos={
+            "evaluar_metodo": lambda: etapa_evaluar_metodo(simulados, [reales[0], falsos[0]], a.muestra, rnd),
+            "barrido":        lambda: etapa_barrido(simulados, [u for par in zip(reales, falsos) for u in par], a.concurrencia, a.por_host, a.procesos),
+            "creador":        lambda: etapa_creador(granja, reales[:2], falsos[:2], a.sitios_creador),
+        }
+        for e in etapas:
+            informe["etapas"][e]=medir(e, granja, cuerpos[e]())
+
+    if a.json:
+        with open(a.json, "w", encoding="utf-8") as f: json.dump(informe, f, indent=2, ensure_ascii=False)
+    if a.guardar_base:
+        with open(a.base, "w", encoding="utf-8") as f: json.dump(informe, f, indent=2, ensure_ascii=False)
+        log("base", f"línea base guardada en {a.base}"); return 0
+    if not os.path.exists(a.base):
+        log("base", "sin línea base (usa --guardar-base para crearla)"); return 0
+    with open(a.base, "r", encoding="utf-8") as f: base=json.load(f)
+    avisos=comparar(informe, base)
+    for av in avisos: log("REGRESIÓN", av)
+    if not avisos: log("base", f"sin regresiones frente a {a.base} ({base.get('creado','?')})")
+    return 1 if avisos else 0
+
+if __name__=="__main__": sys.exit(main())
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Granja de sitios simulados – Ojo de Zeus 2 (banco de rendimiento)
+– Servidores HTTP locales que imitan los sitios de sitios.json: varios "hosts" en 127.0.1.x
+  (así los límites por host del escáner se comportan como con sitios reales).
+– Cada sitio recibe un comportamiento fijo según su posición: normal, lento, redirección a login
+  para inexistentes, 429 con Retry-After, página de CAPTCHA, cuerpo grande o API JSON.
+– Los usuarios cuyo nombre empieza por USUARIO_REAL tienen perfil (con las claves de los métodos
+  del sitio en la página); el resto recibe "no encontrado".
+– Corre en un proceso aparte para no mezclar su CPU/RSS con lo que se mide.
+– /__granja/stats (JSON) y /__granja/reset en cualquier host: peticiones y bytes servidos.
+"""
+
+import json, multiprocessing, socket, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+USUARIO_REAL="realzeus"
+GRANJA_HOSTS=16                  # 127.0.1.1 … 127.0.1.16
+GRANJA_LENTO_MS=250
+GRANJA_GRANDE_BYTES=1_500_000
+MODOS=("normal","normal","normal","normal","lento","redireccion","limite","captcha","grande","normal")
+
+def modo_de(i:int)->str:
+    return MODOS[i%len(MODOS)]
+
+def _claves_sitio(metodos:List[Dict[str,Any]])->Tuple[List[str], List[str]]:
+    """(textos que debe tener un perfil real, claves JSON) de todos los métodos del sitio."""
+    textos:List[str]=[]; claves_json:List[str]=[]
+    for m in metodos:
+        p=m.get("parametros",{}) or {}
+        textos+=[str(k) for k in (p.get("debe_contener") or [])]+[str(k) for k in (p.get("claves") or [])]
+        claves_json+=[str(k) for k in (p.get("claves_presentes") or [])]
+    return textos, claves_json
+
+def pagina_perfil(nombre:str, usuario:str, textos:List[str], grande:bool=False)->bytes:
+    relleno=""
+    if grande:
+        fila="<div class='post'><span>publicación de ejemplo con texto de relleno</span></div>"
+        relleno=fila*(GRANJA_GRANDE_BYTES//len(fila))
+    html=(f"<html><head><title>{usuario} (@{usuario}) • {nombre}</title>"
+          f"<link rel='canonical' href='https://{nombre}.example/{usuario}'>"
+          f"<meta name='description' content='Perfil de {usuario} en {nombre}'>"
+          f"<meta property='og:title' content='{usuario}'><meta property='og:type' content='profile'></head>"
+          f"<body><h1>@{usuario}</h1><p>1,234 followers · 56 following · 78 posts</p>"
+          f"<p>{' '.join(textos)}</p>{relleno}</body></html>")
+    return html.encode("utf-8")
+
+PAGINA_NO_ENCONTRADA=b"<html><head><title>Page not found</title></head><body>Sorry, this page isn't available. User not found.</body></html>"
+PAGINA_LOGIN=b"<html><head><title>Log in</title></head><body><form>login</form></body></html>"
+PAGINA_CAPTCHA=b"<html><head><title>Just a moment...</title></head><body>cf-challenge g-recaptcha</body></html>"
+
+class _Estado:
+    def __init__(self, sitios:List[Tuple[str, List[str], List[str]]]):
+        self.sitios=sitios; self.lock=threading.Lock()
+        self.peticiones=0; self.bytes=0; self.por_modo:Dict[str,int]={}; self.vistos:Dict[str,int]={}
+
+    def contar(self, modo:str, n:int)->None:
+        with self.lock:
+            self.peticiones+=1; self.bytes+=n; self.por_modo[modo]=self.por_modo.get(modo,0)+1
+
+    def primera_vez(self, path:str)->bool:
+        with self.lock:
+            self.vistos[path]=self.vistos.get(path,0)+1
+            return self.vistos[path]==1
+
+def _handler(estado:_Estado):
+    class H(BaseHTTPRequestHandler):
+        protocol_version="HTTP/1.1"
+        def log_message(self, *a): pass
+
+        def _enviar(self, status:int, cuerpo:bytes=b"", ct:str="text/html; charset=utf-8",
+                    extra:Optional[Dict[str,str]]=None, modo:str="-")->None:
+            self.send_response(status)
+            self.send_header("Content-Type", ct); self.send_header("Content-Length", str(len(cuerpo)))
+            for k,v in (extra or {}).items(): self.send_header(k, v)
+            self.end_headers(); self.wfile.write(cuerpo)
+            estado.contar(modo, len(cuerpo))
+
+        def do_GET(self):
+            path=urlsplit(self.path).path
+            if path=="/__granja/stats":
+                with estado.lock:
+                    d={"peticiones":estado.peticiones, "bytes":estado.bytes, "por_modo":dict(estado.por_modo)}
+                return self._enviar(200, json.dumps(d).encode(), "application/json")
+            if path=="/__granja/reset":
+                with estado.lock:
+                    estado.peticiones=0; estado.bytes=0; estado.por_modo={}; estado.vistos={}
+                return self._enviar(200, b"{}", "application/json")
+            if path=="/login": return self._enviar(200, PAGINA_LOGIN)
+            partes=path.strip("/").split("/",1)
+            try: i=int(partes[0])
+            except (ValueError, IndexError): return self._enviar(404, PAGINA_NO_ENCONTRADA)
+            if not 0<=i<len(estado.sitios): return self._enviar(404, PAGINA_NO_ENCONTRADA)
+            nombre, textos, claves_json = estado.sitios[i]
+            modo=modo_de(i); real=USUARIO_REAL in self.path
+            usuario=next((t for t in self.path.replace("?","/").replace("=","/").replace("@","/").split("/") if USUARIO_REAL in t), "")
+
+            if modo=="lento": time.sleep(GRANJA_LENTO_MS/1000.0)
+            if modo=="limite" and estado.primera_vez(self.path):
+                return self._enviar(429, b"Too Many Requests", "text/plain", {"Retry-After":"1"}, modo)
+            if claves_json and ("api" in path or path.endswith(".json")):
+                if real: return self._enviar(200, json.dumps({k:1 for k in claves_json}).encode(), "application/json", modo=modo)
+                return self._enviar(404, b'{"error":"not found"}', "application/json", modo=modo)
+            if real:
+                return self._enviar(200, pagina_perfil(nombre, usuario, textos, modo=="grande"), modo=modo)
+            if modo=="redireccion": return self._enviar(302, b"", extra={"Location":"/login"}, modo=modo)
+            if modo=="captcha": return self._enviar(200, PAGINA_CAPTCHA, modo=modo)
+            return self._enviar(404, PAGINA_NO_ENCONTRADA, modo=modo)
+    return H
+
+def _hosts(n:int)->List[str]:
+    """127.0.1.x si el sistema los enruta (Linux); si no, todo en 127.0.0.1."""
+    try:
+        s=socket.socket(); s.bind(("127.0.1.2",0)); s.close()
+        return [f"127.0.1.{k}" for k in range(1, n+1)]
+    except OSError:
+        return ["127.0.0.1"]
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads=True
+    def handle_error(self, request, client_address)->None:
+        pass        # el cliente cortó (timeout corto, streaming): no es un fallo de la granja
+
+def _servir(sitios, n_hosts:int, cola)->None:
+    estado=_Estado(sitios)
+    direcciones=[]
+    for ip in _hosts(n_hosts):
+        srv=_Servidor((ip,0), _handler(estado))
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        direcciones.append(f"http://{ip}:{srv.server_address[1]}")
+    cola.put(direcciones)
+    threading.Event().wait()
+
+class Granja:
+    """Arranca la granja en otro proceso. `url_de(i)` es la raíz del sitio i."""
+    def __init__(self, sitios:List[Dict[str,Any]], hosts:int=GRANJA_HOSTS):
+        por_nombre:Dict[str,List[Dict[str,Any]]]={}
+        for m in sitios:
+            if isinstance(m, dict): por_nombre.setdefault(m.get("nombre","general"),[]).append(m)
+        self.nombres=list(por_nombre)
+        self._datos=[(n,)+_claves_sitio(ms) for n,ms in por_nombre.items()]
+        self.hosts=hosts; self.direcciones:List[str]=[]; self._proc=None
+
+    def __enter__(self)->"Granja":
+        ctx=multiprocessing.get_context("spawn")
+        cola=ctx.Queue()
+        self._proc=ctx.Process(target=_servir, args=(self._datos, self.hosts, cola), daemon=True)
+        self._proc.start()
+        self.direcciones=cola.get(timeout=30)
+        return self
+
+    def __exit__(self, *exc)->None:
+        if self._proc is not None: self._proc.terminate(); self._proc.join(5)
+
+    def url_de(self, i:int)->str:
+        return f"{self.direcciones[i%len(self.direcciones)]}/{i}"
+
+    def reescribir(self, sitios:List[Dict[str,Any]])->List[Dict[str,Any]]:
+        """Copia de los métodos con url_base apuntando a la granja (misma ruta y query que el original)."""
+        idx={n:i for i,n in enumerate(self.nombres)}; out=[]
+        for m in sitios:
+            if not isinstance(m, dict): continue
+            u=urlsplit(m.get("url_base",""))
+            ruta=(u.path or "/")+("?"+u.query if u.query else "")
+            out.append({**m, "url_base": self.url_de(idx[m.get("nombre","general")])+ruta})
+        return out
+
+    def _get(self, ruta:str)->Dict[str,Any]:
+        from urllib.request import urlopen
+        with urlopen(self.direcciones[0]+ruta, timeout=10) as r: return json.loads(r.read())
+
+    def stats(self)->Dict[str,Any]:
+        return self._get("/__granja/stats")
+
+    def reset(self)->None:
+        self._get("/__granja/reset")
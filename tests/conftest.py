@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Pruebas – Ojo de Zeus 2. Se corren desde la raíz del repositorio: python -m pytest -q"""
+
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
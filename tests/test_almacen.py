@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+import json
+
+from motores import almacen
+from motores.almacen import Almacen
+
+def _m(nombre:str)->dict:
+    return {"nombre":nombre, "metodo":"status_code", "url_base":f"https://{nombre}/{{user}}"}
+
+def test_ids_estables_al_agregar_y_borrar(tmp_path):
+    a=Almacen(str(tmp_path/"sitios.json"))
+    assert a.agregar([_m("a"), _m("b"), _m("c")])==[1, 2, 3]
+    assert a.borrar([2])==1
+    assert a.agregar([_m("d")])==[4]                      # el 2 no se reutiliza
+    assert [(m["nombre"], m["metodo_id"]) for m in a.leer()]==[("a",1), ("c",3), ("d",4)]
+
+def test_compactar_conserva_contador(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, "ALMACEN_COMPACTAR_OPS", 2)
+    ruta=tmp_path/"sitios.json"; a=Almacen(str(ruta))
+    a.agregar([_m("a")]); a.agregar([_m("b")]); a.agregar([_m("c")]); a.borrar([3])
+    assert [m["metodo_id"] for m in json.loads(ruta.read_text(encoding="utf-8"))]==[1, 2, 3]   # foto reescrita; el borrado sigue en el registro
+    assert a.agregar([_m("d")])==[4]
+    assert [m["metodo_id"] for m in Almacen(str(ruta)).leer()]==[1, 2, 4]
+
+def test_actualizar_no_cambia_id(tmp_path):
+    a=Almacen(str(tmp_path/"sitios.json")); a.agregar([_m("a")])
+    assert a.actualizar(1, {"status":"GOOD", "metodo_id":99})
+    assert not a.actualizar(7, {"status":"GOOD"})
+    assert a.leer()[0]["metodo_id"]==1 and a.leer()[0]["status"]=="GOOD"
+
+def test_asegurar_ids_arregla_repetidos(tmp_path):
+    ruta=tmp_path/"sitios.json"
+    ruta.write_text(json.dumps([dict(_m("a"), metodo_id=1), dict(_m("b"), metodo_id=1), _m("c")]), encoding="utf-8")
+    a=Almacen(str(ruta))
+    assert a.asegurar_ids()==2
+    ids=[m["metodo_id"] for m in a.leer()]
+    assert len(set(ids))==3 and ids[0]==1
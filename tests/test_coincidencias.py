@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from motores import coincidencias
+from motores.coincidencias import BuscadorClaves
+
+CLAVES=["followers","following","posts","joined","no encontrado","página","ab","a","","xyz123"]
+
+def _texto(n:int, semilla:int)->str:
+    rnd=random.Random(semilla)
+    trozos=[rnd.choice(["lorem ", "ipsum ", "<div>", "follow", "ers ", "posts", " joined", "págin", "a ", "xyz", "123"]) for _ in range(n)]
+    return "".join(trozos)
+
+@pytest.fixture(params=["automata", "bucle"])
+def modo(request, monkeypatch):
+    if request.param=="automata":
+        if not coincidencias.AC_OK: pytest.skip("pyahocorasick no instalado")
+        monkeypatch.setattr(coincidencias, "AC_MIN_CLAVES", 1)
+    else:
+        monkeypatch.setattr(coincidencias, "AC_OK", False)
+    return request.param
+
+@pytest.mark.parametrize("semilla", range(20))
+def test_igual_que_in(modo, semilla):
+    texto=_texto(200, semilla)
+    b=BuscadorClaves(CLAVES); b.alimentar(texto)
+    assert b.encontradas=={k for k in CLAVES if k in texto}
+
+@pytest.mark.parametrize("corte", [1, 2, 3, 7, 64])
+def test_por_trozos_no_pierde_claves_en_el_corte(modo, corte):
+    texto=_texto(300, corte)
+    b=BuscadorClaves(CLAVES)
+    for i in range(0, len(texto), corte): b.alimentar(texto[i:i+corte])
+    assert b.encontradas=={k for k in CLAVES if k in texto}
+
+def test_completo_y_vacia():
+    b=BuscadorClaves(["", "abc"])
+    assert b.contiene("") and not b.completo
+    b.alimentar("xxabcxx")
+    assert b.completo and b.contiene("abc")
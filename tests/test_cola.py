@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from types import SimpleNamespace as NS
+
+import pytest
+
+from motores.cola import EN_CURSO, FALLIDA, HECHA, PENDIENTE, Cola, shard_de, trabajar
+
+@pytest.fixture
+def cola(tmp_path):
+    c=Cola(str(tmp_path/"cola.sqlite"), max_intentos=2)
+    yield c
+    c.cerrar()
+
+def _vencer(cola:Cola)->None:
+    cola._db.execute("UPDATE tareas SET vence=0 WHERE estado=?", (EN_CURSO,))
+
+def test_encolar_no_duplica_y_reparte_por_usuario(cola):
+    assert cola.encolar(["a", "b"], ["s1", "s2"], shards=4)==4
+    assert cola.encolar(["a", "b", "c"], ["s1", "s2"], shards=4)==2
+    assert cola.estado()[PENDIENTE]==6
+    assert shard_de("a", 4)==shard_de("a", 4) and 0<=shard_de("a", 4)<4
+
+def test_tomar_presta_usuarios_enteros(cola):
+    cola.encolar(["a", "b", "c"], ["s1", "s2", "s3"])
+    t=cola.tomar("w1", n=2, plazo=60)
+    assert sorted({x.usuario for x in t})==["a", "b"] and len(t)==6
+    assert cola.tomar("w2", n=5, plazo=60)[0].usuario=="c"
+    assert cola.tomar("w3", n=5, plazo=60)==[]
+
+def test_plazo_vencido_vuelve_a_la_cola(cola):
+    cola.encolar(["a"], ["s1"])
+    [t]=cola.tomar("w1", plazo=60)
+    assert cola.tomar("w2", plazo=60)==[]
+    _vencer(cola)
+    [t2]=cola.tomar("w2", plazo=60)
+    assert t2.id==t.id and t2.intentos==2
+    cola.completar([(t2.id, {"usuario":"a"})])
+    assert cola.estado()[HECHA]==1 and list(cola.resultados())==['{"usuario": "a"}']
+
+def test_renovar_evita_que_venza(cola):
+    cola.encolar(["a"], ["s1"])
+    [t]=cola.tomar("w1", plazo=0.01)
+    cola.renovar("w1", [t.id], plazo=60)
+    assert cola.tomar("w2", plazo=60)==[]
+    cola.renovar("otro", [t.id], plazo=0)                  # solo el dueño renueva
+    assert cola.tomar("w2", plazo=60)==[]
+
+def test_intentos_agotados_y_reintentar(cola):
+    cola.encolar(["a"], ["s1"])
+    cola.tomar("w1", plazo=60); _vencer(cola)
+    cola.tomar("w2", plazo=60); _vencer(cola)
+    assert cola.tomar("w3", plazo=60)==[]
+    assert cola.estado()[FALLIDA]==1 and cola.fallidas()[0][2]=="plazo vencido"
+    assert cola.reintentar()==1
+    [t]=cola.tomar("w4", plazo=60)
+    assert t.intentos==1
+    cola.fallar([t.id], "error")
+    assert cola.estado()[PENDIENTE]==1
+
+class _Escaner:
+    def __init__(self, fallar:str=""): self.fallar=fallar; self.vistos=[]
+    def abrir(self): pass
+    async def cerrar(self): pass
+    async def escanear(self, usuario, sitios, al_terminar):
+        self.vistos.append(usuario)
+        for s in sitios:
+            if usuario==self.fallar: raise RuntimeError("caído")
+            al_terminar(NS(nombre=s.nombre, decision="No existe", heuristica=False, resultados=[], info={}, detalles=[]))
+
+def test_trabajar_completa_y_devuelve_lo_fallido(cola):
+    cola.encolar(["a", "b"], ["s1", "s2", "fuera"])
+    indice=[NS(nombre="s1"), NS(nombre="s2")]
+    esc=_Escaner(fallar="b")
+    stats=asyncio.run(trabajar(cola, indice, esc, "w1", tanda=1, plazo=60))
+    e=cola.estado()
+    assert e[HECHA]==2 and e[FALLIDA]==4 and e[EN_CURSO]==0     # b: 2 intentos; "fuera" no está en el índice
+    assert stats["usuarios"]>=3 and esc.vistos.count("b")==2
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from motores import cache_disco, limitador
+from motores.escaner import escanear_usuario
+from motores.indice import compilar
+
+@pytest.fixture(scope="module")
+def servidor():
+    pedidas=Counter()
+    class H(BaseHTTPRequestHandler):
+        protocol_version="HTTP/1.1"
+        def log_message(self, *a): pass
+        def do_GET(self):
+            pedidas[self.path]+=1
+            real=self.path.startswith("/u/real")
+            cuerpo=(b"<html><body><p>followers posts</p>"+b"<p>relleno</p>"*5000+b"</body></html>" if real
+                    else b"<html><body><p>no encontrado</p>"+b"<p>relleno</p>"*5000+b"</body></html>")
+            self.send_response(200 if real else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8"); self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers(); self.wfile.write(cuerpo)
+    srv=ThreadingHTTPServer(("127.0.0.1", 0), H)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    cache_disco.configurar(activa=False); limitador.configurar(rps=0)
+    yield f"http://127.0.0.1:{srv.server_address[1]}", pedidas
+    srv.shutdown(); srv.server_close()
+
+def _indice(base:str):
+    url=base+"/u/{user}"
+    return compilar([
+        {"nombre":"a", "metodo":"status_code_y_texto", "url_base":url, "parametros":{"codigo":200, "debe_contener":["followers"]},
+         "outcomes_real":["status_text_hit=True"], "outcomes_fake":["status_text_hit=False"]},
+        {"nombre":"a", "metodo":"palabras_clave", "url_base":url, "parametros":{"claves":["followers"]},
+         "outcomes_real":["kw_hit=True"], "outcomes_fake":["kw_hit=False"]},
+        {"nombre":"b", "metodo":"html_contains", "url_base":url, "parametros":{"claves":["posts"]},
+         "outcomes_real":["html_hit=True"], "outcomes_fake":["html_hit=False"]},
+    ])
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_decide_y_descarga_cada_url_una_vez(servidor, streaming):
+    base, pedidas = servidor
+    indice=_indice(base)
+    for usuario, esperado in [("realana", "Existe"), ("nadie", "No existe")]:
+        pedidas.clear()
+        res=escanear_usuario(usuario, indice, streaming=streaming)
+        assert [(r.nombre, r.decision) for r in res]==[("a", esperado), ("b", esperado)]
+        assert pedidas==Counter({f"/u/{usuario}":1})
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from motores.huellas import (
+    HUELLA_DISTANCIA, coincide, distancia, huella_dom, normalizar_outcome, outcome_url, plantilla_url, solape, usuario_en,
+)
+
+@pytest.mark.parametrize("url, usuario, esperado", [
+    ("https://www.TikTok.com/@pepe", "pepe", "https://www.tiktok.com/@{user}"),
+    ("https://www.tiktok.com/@Pepe/?utm_source=x&fbclid=1#top", "pepe", "https://www.tiktok.com/@{user}"),
+    ("https://sitio.com:443/u/pepe/", "pepe", "https://sitio.com/u/{user}"),
+    ("https://pepe.blog.com/", "pepe", "https://{user}.blog.com/"),
+    ("https://sitio.com/search?q=pepe&b=2&a=1", "pepe", "https://sitio.com/search?a=1&b=2&q={user}"),
+    ("https://sitio.com/login", "log", "https://sitio.com/login"),                     # no dentro de otra palabra
+    ("https://sitio.com/p/1234567890/x", "pepe", "https://sitio.com/p/{n}/x"),
+    ("https://sitio.com/s/0123456789abcdef0123", "pepe", "https://sitio.com/s/{x}"),
+    ("https://sitio.com/u/juan%20p", "juan p", "https://sitio.com/u/{user}"),
+])
+def test_plantilla_url(url, usuario, esperado):
+    assert plantilla_url(url, usuario)==esperado
+
+def test_plantilla_url_vacia():
+    assert plantilla_url("", "pepe")==""
+
+def test_usuario_en_y_outcomes_antiguos():
+    base="https://www.tiktok.com/@{user}"
+    assert usuario_en(base, "https://www.tiktok.com/@kike2011")=="kike2011"
+    assert usuario_en(base, "https://otra.com/@kike")is None
+    antiguo="final_url=https://www.tiktok.com/@kike2011"
+    assert normalizar_outcome(antiguo, base)=="final_url=https://www.tiktok.com/@{user}"
+    assert normalizar_outcome("status=200", base)=="status=200"
+    assert outcome_url("https://www.tiktok.com/@ana?lang=es", "ana")=="final_url=https://www.tiktok.com/@{user}?lang=es"
+
+PERFIL="<html><body><header><nav><a>x</a></nav></header><main><h1>{n}</h1><ul>{li}</ul><p>{t}</p></main></body></html>"
+NO_ENCONTRADO="<html><body><div class='e'><h2>404</h2><p>No existe</p><form><input><button>ir</button></form></div></body></html>"
+
+def test_huella_dom_ignora_texto_y_separa_plantillas():
+    a=huella_dom(PERFIL.format(n="ana", li="<li>1</li><li>2</li>", t="hola"))
+    b=huella_dom(PERFIL.format(n="luis", li="<li>9</li>", t="otro texto"))
+    c=huella_dom(NO_ENCONTRADO)
+    assert a.startswith("dom=") and len(a)==20
+    assert distancia(a, b)<=HUELLA_DISTANCIA
+    assert distancia(a, c)>HUELLA_DISTANCIA
+    assert coincide(b, {a}) and not coincide(c, {a})
+    assert solape({a}, {c})==set()
+
+def test_coincide_exacto_y_no_dom():
+    assert coincide("status=200", frozenset({"status=200"}))
+    assert not coincide("status=404", frozenset({"status=200"}))
+    assert distancia("dom=zz", "dom=00")>64
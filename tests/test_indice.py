@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from motores.indice import compilar
+from motores.planificador import MODO_HTTP, MODO_NAVEGADOR
+
+def _url_check(nombre:str, real, fake)->dict:
+    return {"nombre":nombre, "metodo":"url_check", "url_base":f"https://www.{nombre}.com/@{{user}}",
+            "outcomes_real":real, "outcomes_fake":fake}
+
+def test_outcomes_url_que_colapsan_no_deciden():
+    ind=compilar([
+        _url_check("tiktok", ["final_url=https://www.tiktok.com/@kike"], ["final_url=https://www.tiktok.com/@eoeg2011"]),
+        _url_check("pinterest", ["final_url=https://www.pinterest.com/@ana"], []),
+        _url_check("bien", ["final_url=https://www.bien.com/@ana"], ["final_url=https://www.bien.com/login"]),
+    ])
+    m={s.nombre:s.metodos[0] for s in ind}
+    assert not m["tiktok"].outcomes_real and not m["tiktok"].outcomes_fake and m["tiktok"].recrear
+    assert not m["pinterest"].outcomes_real and "falsos" in m["pinterest"].recrear
+    assert m["bien"].outcomes_real==frozenset({"final_url=https://www.bien.com/@{user}"}) and not m["bien"].recrear
+    assert [s for s,_,_ in ind.por_recrear()]==["tiktok", "pinterest"]
+
+def test_url_check_sin_outcomes_va_por_http():
+    ind=compilar([
+        _url_check("semilla", [], []),
+        _url_check("bien", ["final_url=https://www.bien.com/@ana"], ["final_url=https://www.bien.com/login"]),
+        dict(_url_check("js", [], []), js_renderizado=True),
+    ])
+    assert [s.metodos[0].modo for s in ind]==[MODO_HTTP, MODO_NAVEGADOR, MODO_NAVEGADOR]
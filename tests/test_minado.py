@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from motores.minado import MINADO_MAX_CLAVES, elegir, es_basura, minar, puntuar, terminos
+
+def _perfil(usuario:str, extra:str="")->str:
+    return (f"<html><head><script>var x='zzkqwprt';</script><style>.a{{}}</style></head><body><h1>{usuario}</h1>"
+            f"<p>followers following posts joined</p>{extra}</body></html>")
+
+FALSOS=["<html><body><p>page not found sorry</p><p>posts</p></body></html>"]*3
+USUARIOS=["ana", "luis", "pepe", "marta", "rosa"]
+
+def test_terminos_solo_texto_visible():
+    t=terminos(_perfil("ana"))
+    assert {"followers", "following", "posts", "joined"}<=t
+    assert "zkqwprt" not in " ".join(t) and "script" not in t
+    assert es_basura("bcdfghk") and not es_basura("followers")
+
+def test_umbral_df_real():
+    reales=[terminos(_perfil(u)) for u in USUARIOS[:4]]+[terminos("<p>followers following posts</p>")]
+    p={t.termino:t for t in puntuar(reales, [terminos(f) for f in FALSOS])}
+    assert p["joined"].df_real==0.8                         # 4 de 5: pasa el umbral (≥ 0.8)
+    assert p["followers"].puntuacion==1.0 and p["posts"].puntuacion==0.0
+    reales=[terminos(_perfil(u)) for u in USUARIOS[:3]]+[terminos("<p>followers following</p>")]*2
+    assert "joined" not in {t.termino for t in puntuar(reales, [])}   # 3 de 5 = 0.6
+
+def test_una_pagina_real_rara_no_deja_sin_claves():
+    reales=[_perfil(u) for u in USUARIOS[:4]]+["<html><body>diseño totalmente distinto</body></html>"]
+    assert minar(reales, FALSOS, excluir=USUARIOS)==["followers", "following"]
+
+def test_excluye_usuarios_y_terminos_de_los_falsos():
+    claves=minar([_perfil(u, "<p>anamaria</p>") for u in ["anamaria"]*3], FALSOS, excluir=["anamaria"])
+    assert "anamaria" not in claves and "posts" not in claves and claves
+
+def test_tope_y_redundancia():
+    reales=[terminos(_perfil(u)) for u in USUARIOS]
+    puntuados=puntuar(reales, [])
+    assert len(elegir(puntuados, reales, [], max_claves=3))==3
+    assert len(elegir(puntuados, reales, ["<p>nada</p>"], redundancia=2))==2
+    assert len(elegir(puntuados, reales, [], max_claves=99))<=len(puntuados)
+    assert MINADO_MAX_CLAVES==5
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+import json, multiprocessing
+from types import SimpleNamespace as NS
+
+from motores.puntuacion import Historial
+
+MC=NS(datos={"metodo_id":7}, nombre="s", metodo="status_code", url_base="https://s/{user}")
+
+def _trabajador(ruta:str)->None:
+    h=Historial(ruta)
+    for _ in range(10): h.anotar(MC, "No existe", "No existe", 100)
+    h.guardar()
+
+def test_guardar_suma_lo_de_otros_procesos(tmp_path):
+    ruta=str(tmp_path/"sitios.json.puntos")
+    procs=[multiprocessing.get_context("spawn").Process(target=_trabajador, args=(ruta,)) for _ in range(4)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    h=Historial(ruta); h.anotar(MC, "Existe", "No existe", 0); h.guardar(); h.guardar()
+    d=json.load(open(ruta, encoding="utf-8"))["7"]
+    assert d=={"n":41, "no":40, "decisivos":41, "aciertos":40, "bytes":4000}
+    assert h.cuenta(MC).n==41
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import time
+from types import SimpleNamespace as NS
+
+from motores.resultados import AlmacenResultados
+
+def _res(sitio:str, decision:str)->NS:
+    return NS(nombre=sitio, decision=decision, heuristica=False, info={"titulo":sitio} if decision=="Existe" else {},
+              resultados=[(decision, "status_code", "status=200", f"https://{sitio}/ana")],
+              detalles=[(200, 12, "http", "1")])
+
+def test_existe_cambios_y_filas(tmp_path):
+    bd=AlmacenResultados(str(tmp_path/"r.sqlite"), tanda=1)
+    with bd.escaneo("ana", "lote") as esc:
+        bd.agregar(esc, _res("a", "Existe")); bd.agregar(esc, _res("b", "No existe"))
+    medio=time.time()
+    time.sleep(0.01)
+    with bd.escaneo("ana", "cola") as esc:
+        bd.agregar(esc, _res("a", "No existe")); bd.agregar(esc, _res("b", "No existe"))
+    assert bd.existe("ana")==[]
+    viejo, nuevo, cambios = bd.cambios("ana", medio)
+    assert viejo!=nuevo and [(c.sitio, c.antes, c.ahora) for c in cambios]==[("a", "Existe", "No existe")]
+    filas=list(bd.filas("ana"))
+    assert len(filas)==4 and filas[0]["outcome"]=="status=200"
+    bd.cerrar()
+
+def test_escaneo_sin_cerrar_no_cuenta(tmp_path):
+    bd=AlmacenResultados(str(tmp_path/"r.sqlite"))
+    esc=bd.abrir_escaneo("ana"); bd.agregar(esc, _res("a", "Existe"))
+    assert bd.existe("ana")==[]
+    bd.cerrar_escaneo(esc)
+    assert bd.existe("ana")==[("a", False, {"titulo":"a"})]
+    bd.cerrar()